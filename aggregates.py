@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+Aggregates - Накопительные итоги пользователя
+Доходы, расходы, баланс, число транзакций и суммы по категориям
+обновляются за O(1) при каждом изменении и хранятся в документе
+пользователя: за все время в поле 'totals', по дням и месяцам в 'rollups'
+"""
+
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from timeline import extend_transactions, insert_transaction, transactions_between
+
+
+def empty_totals() -> Dict:
+    """Пустые итоги"""
+    return {
+        'income': 0.0,
+        'expenses': 0.0,
+        'balance': 0.0,
+        'count': 0,
+        'categories': {
+            'income': {},
+            'expense': {}
+        }
+    }
+
+
+def apply_to_totals(totals: Dict, transaction: Dict, sign: int = 1) -> None:
+    """Учесть транзакцию в итогах (sign=-1 - убрать ее из итогов)"""
+    amount = transaction['amount'] * sign
+    t_type = transaction['type']
+    if t_type == 'income':
+        totals['income'] += amount
+        totals['balance'] += amount
+    elif t_type == 'expense':
+        totals['expenses'] += amount
+        totals['balance'] -= amount
+    totals['count'] += sign
+
+    categories = totals['categories'].setdefault(t_type, {})
+    category = transaction['category']
+    total = categories.get(category, 0) + amount
+    if sign < 0 and abs(total) < 1e-9:
+        del categories[category]
+    else:
+        categories[category] = total
+
+
+def build_totals(transactions: Iterable[Dict]) -> Dict:
+    """Пересчитать итоги по всей истории"""
+    totals = empty_totals()
+    for transaction in transactions:
+        apply_to_totals(totals, transaction)
+    return totals
+
+
+def ensure_totals(user_data: Dict) -> Dict:
+    """Итоги пользователя (пересчитываются, если их нет в документе)"""
+    totals = user_data.get('totals')
+    if totals is None:
+        totals = build_totals(user_data.get('transactions', []))
+        user_data['totals'] = totals
+    return totals
+
+
+def empty_rollups() -> Dict:
+    """Пустые итоги по дням и месяцам"""
+    return {'day': {}, 'month': {}}
+
+
+def apply_to_rollups(rollups: Dict, transaction: Dict, sign: int = 1) -> None:
+    """Учесть транзакцию в итогах ее дня и месяца"""
+    moment = datetime.fromtimestamp(transaction['timestamp'])
+    for scale, key in (('day', moment.strftime('%Y-%m-%d')), ('month', moment.strftime('%Y-%m'))):
+        buckets = rollups[scale]
+        bucket = buckets.get(key)
+        if bucket is None:
+            bucket = buckets[key] = empty_totals()
+        apply_to_totals(bucket, transaction, sign)
+        if bucket['count'] <= 0:
+            del buckets[key]
+
+
+def build_rollups(transactions: Iterable[Dict]) -> Dict:
+    """Пересчитать итоги по дням и месяцам по всей истории"""
+    rollups = empty_rollups()
+    for transaction in transactions:
+        apply_to_rollups(rollups, transaction)
+    return rollups
+
+
+def ensure_rollups(user_data: Dict) -> Dict:
+    """Итоги по дням и месяцам (пересчитываются, если их нет в документе)"""
+    rollups = user_data.get('rollups')
+    if rollups is None:
+        rollups = build_rollups(user_data.get('transactions', []))
+        user_data['rollups'] = rollups
+    return rollups
+
+
+def bump_version(user_data: Dict, item: Optional[Dict] = None) -> int:
+    """Отметить изменение документа; измененная запись item получает его версию.
+
+    Версия растет на 1 при каждом изменении, поэтому при воспроизведении
+    журнала записи получают те же номера, что и при исходной записи.
+    """
+    version = user_data.get('version', 0) + 1
+    user_data['version'] = version
+    if item is not None:
+        item['version'] = version
+    return version
+
+
+def _versioned(user_data: Dict) -> Iterator[Dict]:
+    yield from user_data.get('transactions', [])
+    yield from user_data.get('goals', [])
+    yield from user_data.get('budgets', {}).values()
+    yield from user_data.get('deleted', [])
+
+
+def ensure_version(user_data: Dict) -> int:
+    """Версия документа не меньше версий его записей (старые снимки, SQLite)"""
+    version = max(
+        user_data.get('version', 0),
+        max((item.get('version', 0) for item in _versioned(user_data)), default=0)
+    )
+    user_data['version'] = version
+    return version
+
+
+def ensure_next_id(user_data: Dict) -> int:
+    """Следующий свободный id транзакции (пересчитывается, если его нет в документе).
+
+    Счетчик больше id любой транзакции и отметки об удалении, поэтому
+    id удаленной транзакции новой не достается.
+    """
+    next_id = user_data.get('next_id')
+    if next_id is None:
+        ids = [item.get('id') or 0 for item in user_data.get('transactions', [])]
+        ids.extend(item.get('id') or 0 for item in user_data.get('deleted', []))
+        next_id = max(ids, default=0) + 1
+        user_data['next_id'] = next_id
+    return next_id
+
+
+def new_transaction_id(user_data: Dict) -> int:
+    """Выдать id новой транзакции"""
+    transaction_id = ensure_next_id(user_data)
+    user_data['next_id'] = transaction_id + 1
+    return transaction_id
+
+
+def _note_id(user_data: Dict, transaction: Dict) -> None:
+    # При воспроизведении журнала счетчик догоняет записанные id
+    transaction_id = transaction.get('id')
+    if isinstance(transaction_id, int) and transaction_id >= ensure_next_id(user_data):
+        user_data['next_id'] = transaction_id + 1
+
+
+def _track(user_data: Dict, transaction: Dict, sign: int) -> None:
+    apply_to_totals(ensure_totals(user_data), transaction, sign)
+    apply_to_rollups(ensure_rollups(user_data), transaction, sign)
+
+
+def append_transaction(user_data: Dict, transaction: Dict) -> None:
+    """Добавить транзакцию в историю и итоги"""
+    ensure_totals(user_data)
+    ensure_rollups(user_data)
+    _note_id(user_data, transaction)
+    insert_transaction(user_data.setdefault('transactions', []), transaction)
+    _track(user_data, transaction, 1)
+    bump_version(user_data, transaction)
+
+
+def append_transactions(user_data: Dict, transactions: List[Dict]) -> None:
+    """Добавить пачку транзакций: история упорядочивается один раз на пачку"""
+    ensure_totals(user_data)
+    ensure_rollups(user_data)
+    for transaction in transactions:
+        _note_id(user_data, transaction)
+    extend_transactions(user_data.setdefault('transactions', []), transactions)
+    for transaction in transactions:
+        _track(user_data, transaction, 1)
+        # По версии на транзакцию - как при воспроизведении журнала по одной
+        bump_version(user_data, transaction)
+
+
+def remove_transaction(user_data: Dict, transaction_id: int) -> Optional[Dict]:
+    """Удалить транзакцию из истории и итогов.
+
+    Остается отметка об удалении с новой версией документа; в журнал
+    удаление пишется как {'id': ..., 'version': user_data['version']}.
+    """
+    transactions = user_data.get('transactions', [])
+    for i, transaction in enumerate(transactions):
+        if transaction.get('id') == transaction_id:
+            _track(user_data, transaction, -1)
+            del transactions[i]
+            tombstone = {'id': transaction_id}
+            user_data.setdefault('deleted', []).append(tombstone)
+            bump_version(user_data, tombstone)
+            return transaction
+    return None
+
+
+def update_transaction(user_data: Dict, transaction_id: int, changes: Dict) -> Optional[Dict]:
+    """Изменить транзакцию, итоги корректируются на разницу"""
+    transactions = user_data.get('transactions', [])
+    for i, transaction in enumerate(transactions):
+        if transaction.get('id') == transaction_id:
+            _track(user_data, transaction, -1)
+            transaction.update(changes)
+            if 'timestamp' in changes:
+                # Новая дата - новое место в упорядоченной истории
+                del transactions[i]
+                insert_transaction(transactions, transaction)
+            _track(user_data, transaction, 1)
+            bump_version(user_data, transaction)
+            return transaction
+    return None
+
+
+def top_categories(totals: Dict, t_type: str = 'expense', top: int = 5) -> List[List]:
+    """Категории с наибольшими суммами"""
+    categories = totals['categories'].get(t_type, {})
+    return [
+        [category, amount]
+        for category, amount in sorted(categories.items(), key=lambda x: x[1], reverse=True)[:top]
+    ]
+
+
+def totals_statistics(user_data: Dict, top: int = 5) -> Dict:
+    """Статистика за все время из накопительных итогов"""
+    totals = ensure_totals(user_data)
+    return {
+        'total_income': totals['income'],
+        'total_expenses': totals['expenses'],
+        'balance': totals['balance'],
+        'count': totals['count'],
+        'top_expenses': top_categories(totals, 'expense', top)
+    }
+
+
+def period_start(period: str, now: Optional[datetime] = None) -> datetime:
+    """Начало периода week/month/year (по умолчанию - текущий месяц)"""
+    now = now or datetime.now()
+    today = datetime.combine(now.date(), time.min)
+    if period == "week":
+        return today - timedelta(days=7)
+    if period == "year":
+        return today.replace(month=1, day=1)
+    return today.replace(day=1)
+
+
+def _midnight(day: date) -> float:
+    return datetime.combine(day, time.min).timestamp()
+
+
+def _merge(result: Dict, bucket: Dict) -> None:
+    result['income'] += bucket['income']
+    result['expenses'] += bucket['expenses']
+    result['balance'] += bucket['balance']
+    result['count'] += bucket['count']
+    for t_type, categories in bucket['categories'].items():
+        target = result['categories'].setdefault(t_type, {})
+        for category, amount in categories.items():
+            target[category] = target.get(category, 0) + amount
+
+
+def _buckets(rollups: Dict, first_day: date, last_day: date) -> Iterator[Dict]:
+    """Итоги полных дней [first_day, last_day): целые месяцы - одним блоком"""
+    day = first_day
+    while day < last_day:
+        if day.day == 1:
+            next_month = (day + timedelta(days=32)).replace(day=1)
+            if next_month <= last_day:
+                bucket = rollups['month'].get(day.strftime('%Y-%m'))
+                if bucket is not None:
+                    yield bucket
+                day = next_month
+                continue
+        bucket = rollups['day'].get(day.strftime('%Y-%m-%d'))
+        if bucket is not None:
+            yield bucket
+        day += timedelta(days=1)
+
+
+def period_statistics(user_data: Dict, start_ts: float, end_ts: Optional[float] = None,
+                      top: int = 5) -> Dict:
+    """Статистика за [start_ts, end_ts) из итогов по дням и месяцам.
+
+    Полные месяцы и дни берутся из готовых итогов, транзакции
+    неполных первого и последнего дня находятся бинарным поиском.
+    """
+    rollups = ensure_rollups(user_data)
+    result = empty_totals()
+
+    first_day = datetime.fromtimestamp(start_ts).date()
+    if start_ts != _midnight(first_day):
+        edge_end = _midnight(first_day + timedelta(days=1))
+        if end_ts is not None:
+            edge_end = min(edge_end, end_ts)
+        for transaction in transactions_between(user_data, start_ts, edge_end):
+            apply_to_totals(result, transaction)
+        first_day += timedelta(days=1)
+
+    if end_ts is None:
+        # Без правой границы - до последнего дня с транзакциями
+        last_day = first_day
+        if rollups['day']:
+            last_day = max(last_day, date.fromisoformat(max(rollups['day'])) + timedelta(days=1))
+    else:
+        last_day = datetime.fromtimestamp(end_ts).date()
+        if last_day >= first_day and end_ts != _midnight(last_day):
+            for transaction in transactions_between(user_data, max(start_ts, _midnight(last_day)), end_ts):
+                apply_to_totals(result, transaction)
+
+    for bucket in _buckets(rollups, first_day, last_day):
+        _merge(result, bucket)
+
+    return {
+        'total_income': result['income'],
+        'total_expenses': result['expenses'],
+        'balance': result['balance'],
+        'count': result['count'],
+        'top_expenses': top_categories(result, 'expense', top)
+    }
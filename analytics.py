@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Analytics - Аналитика по истории транзакций
+Для длинных историй данные хранятся колонками NumPy (сумма, время,
+коды типа и категории), итоги и группировки считаются векторно
+"""
+
+import os
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # без NumPy работает только расчет на Python
+    np = None
+
+from timeline import transactions_between
+
+TYPE_CODES = {'income': 0, 'expense': 1}
+TYPE_NAMES = ('income', 'expense')
+
+
+def python_summary(transactions: List[Dict], top: int = 5) -> Dict:
+    """Сводка по транзакциям окна - расчет на Python для коротких историй"""
+    categories = {'income': {}, 'expense': {}}
+    for t in transactions:
+        by_category = categories.get(t['type'])
+        if by_category is None:
+            continue
+        amount, count = by_category.get(t['category'], (0.0, 0))
+        by_category[t['category']] = (amount + t['amount'], count + 1)
+
+    expenses = [t for t in transactions if t['type'] == 'expense']
+    largest = sorted(expenses, key=lambda t: t['amount'], reverse=True)[:top]
+    return _summary(
+        {
+            t_type: sorted(
+                ([category, amount, count] for category, (amount, count) in by_category.items()),
+                key=lambda x: x[1], reverse=True
+            )
+            for t_type, by_category in categories.items()
+        },
+        len(transactions), largest, top
+    )
+
+
+def _summary(categories: Dict, count: int, largest: List[Dict], top: int) -> Dict:
+    total_income = float(sum(item[1] for item in categories['income']))
+    total_expenses = float(sum(item[1] for item in categories['expense']))
+    return {
+        'total_income': total_income,
+        'total_expenses': total_expenses,
+        'balance': total_income - total_expenses,
+        'count': count,
+        'categories': categories,
+        'top_expenses': [[category, amount] for category, amount, _ in categories['expense'][:top]],
+        'largest_expenses': largest
+    }
+
+
+def _transaction_key(transaction: Dict) -> Tuple:
+    # id и версия не меняются при перезагрузке документа, в отличие от
+    # адреса объекта
+    return transaction.get('id'), transaction.get('version')
+
+
+class ColumnarHistory:
+    """История пользователя колонками: float64 сумма и время, int8 коды"""
+
+    def __init__(self, transactions: List[Dict], version: int):
+        self.vocabulary: List[str] = []
+        self._codes: Dict[str, int] = {}
+        self.amounts = np.empty(0, dtype=np.float64)
+        self.timestamps = np.empty(0, dtype=np.float64)
+        self.types = np.empty(0, dtype=np.int8)
+        self.categories = np.empty(0, dtype=np.int8)
+        self.size = 0
+        self.version = version
+        self._last = None
+        self.extend(transactions, 0, version)
+
+    def extend(self, transactions: List[Dict], start: int, version: int) -> None:
+        """Дописать в колонки транзакции transactions[start:]"""
+        tail = transactions[start:]
+        n = len(tail)
+        codes = [self._codes.setdefault(t['category'], len(self._codes)) for t in tail]
+        self.vocabulary = list(self._codes)
+        # Больше 127 категорий в int8 не поместится
+        category_dtype = np.int8 if len(self._codes) <= 127 else np.int16
+
+        self.amounts = np.concatenate((
+            self.amounts, np.fromiter((t['amount'] for t in tail), dtype=np.float64, count=n)))
+        self.timestamps = np.concatenate((
+            self.timestamps, np.fromiter((t['timestamp'] for t in tail), dtype=np.float64, count=n)))
+        self.types = np.concatenate((
+            self.types, np.fromiter((TYPE_CODES.get(t['type'], -1) for t in tail), dtype=np.int8, count=n)))
+        self.categories = np.concatenate((
+            self.categories.astype(category_dtype), np.array(codes, dtype=category_dtype)))
+
+        self.size = len(transactions)
+        self.version = version
+        self._last = _transaction_key(transactions[-1]) if transactions else None
+
+    def appended_only(self, transactions: List[Dict], version: int) -> bool:
+        """С момента построения транзакции только дописывались в конец.
+
+        Каждое изменение документа увеличивает версию на 1, поэтому рост
+        версии на число новых транзакций означает, что были только
+        добавления; последняя учтенная транзакция на своем месте - что
+        новые легли после нее.
+        """
+        added = len(transactions) - self.size
+        return (
+            added > 0
+            and version - self.version == added
+            and (self.size == 0 or _transaction_key(transactions[self.size - 1]) == self._last)
+        )
+
+    def summary(self, transactions: List[Dict], start_ts: Optional[float] = None,
+                end_ts: Optional[float] = None, top: int = 5) -> Dict:
+        """Сводка по окну [start_ts, end_ts)"""
+        # История упорядочена по времени - границы окна бинарным поиском
+        lo = 0 if start_ts is None else int(np.searchsorted(self.timestamps, start_ts, side='left'))
+        hi = self.size if end_ts is None else int(np.searchsorted(self.timestamps, end_ts, side='left'))
+        amounts = self.amounts[lo:hi]
+        types = self.types[lo:hi]
+        categories = self.categories[lo:hi]
+        width = len(self.vocabulary)
+
+        grouped = {}
+        for code, t_type in enumerate(TYPE_NAMES):
+            mask = types == code
+            sums = np.bincount(categories[mask], weights=amounts[mask], minlength=width)
+            counts = np.bincount(categories[mask], minlength=width)
+            present = np.flatnonzero(counts)
+            order = present[np.argsort(sums[present])[::-1]]
+            grouped[t_type] = [
+                [self.vocabulary[i], float(sums[i]), int(counts[i])] for i in order
+            ]
+
+        expense_positions = np.flatnonzero(types == TYPE_CODES['expense'])
+        if len(expense_positions) > top:
+            candidates = np.argpartition(amounts[expense_positions], -top)[-top:]
+            expense_positions = expense_positions[candidates]
+        expense_positions = expense_positions[np.argsort(amounts[expense_positions])[::-1]][:top]
+        largest = [transactions[lo + int(i)] for i in expense_positions]
+
+        return _summary(grouped, hi - lo, largest, top)
+
+
+class AnalyticsEngine:
+    """Аналитика с переключением на колонки NumPy для длинных историй.
+
+    Колонки строятся один раз на пользователя и держатся в небольшом
+    LRU-кеше; новые транзакции в конце истории дописываются в колонки,
+    остальные изменения (по версии документа) перестраивают их.
+    """
+
+    def __init__(self, threshold: Optional[int] = None, max_users: Optional[int] = None):
+        if threshold is None:
+            threshold = int(os.getenv('ANALYTICS_THRESHOLD', '5000'))
+        if max_users is None:
+            max_users = int(os.getenv('ANALYTICS_CACHE_USERS', '64'))
+        self.threshold = threshold
+        self.max_users = max_users
+        self._columns: "OrderedDict[str, ColumnarHistory]" = OrderedDict()
+
+    def uses_columns(self, user_data: Dict) -> bool:
+        return np is not None and len(user_data.get('transactions', [])) >= self.threshold
+
+    def summary(self, user_id: str, user_data: Dict, start_ts: Optional[float] = None,
+                end_ts: Optional[float] = None, top: int = 5) -> Dict:
+        """Итоги, группировка по категориям и крупнейшие расходы за окно"""
+        if not self.uses_columns(user_data):
+            return python_summary(transactions_between(user_data, start_ts, end_ts), top)
+        columns = self.columns(user_id, user_data)
+        return columns.summary(user_data['transactions'], start_ts, end_ts, top)
+
+    def columns(self, user_id: str, user_data: Dict) -> ColumnarHistory:
+        """Колонки пользователя (из кеша, дописанные или построенные заново)"""
+        transactions = user_data.get('transactions', [])
+        version = user_data.get('version', 0)
+
+        columns = self._columns.get(user_id)
+        if columns is not None:
+            self._columns.move_to_end(user_id)
+            # Документ, выгруженный из кеша и загруженный заново, - это новые
+            # объекты, поэтому свежесть колонок определяется по версии
+            if columns.version == version and columns.size == len(transactions):
+                return columns
+            if columns.appended_only(transactions, version):
+                columns.extend(transactions, columns.size, version)
+                return columns
+
+        columns = ColumnarHistory(transactions, version)
+        self._columns[user_id] = columns
+        if len(self._columns) > self.max_users:
+            self._columns.popitem(last=False)
+        return columns
@@ -1,340 +1,547 @@
-#!/usr/bin/env python3
-"""
-Telegram App - Полноценное веб-приложение для Telegram
-"""
-
-import asyncio
-import json
-import logging
-import os
-from datetime import datetime
-from typing import Dict, List, Optional
-from dotenv import load_dotenv
-
-from fastapi import FastAPI, Request, HTTPException, Depends
-from fastapi.responses import HTMLResponse, JSONResponse
-from fastapi.staticfiles import StaticFiles
-from fastapi.templating import Jinja2Templates
-from fastapi.middleware.cors import CORSMiddleware
-import uvicorn
-
-# Загружаем переменные окружения
-load_dotenv()
-
-# Настройка логирования
-logging.basicConfig(
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    level=logging.INFO
-)
-logger = logging.getLogger(__name__)
-
-class FinanceApp:
-    def __init__(self):
-        self.app = FastAPI(
-            title="Finance Tracker App",
-            description="Полноценное приложение для учета финансов",
-            version="1.0.0"
-        )
-        
-        # Настройка CORS
-        self.app.add_middleware(
-            CORSMiddleware,
-            allow_origins=["*"],
-            allow_credentials=True,
-            allow_methods=["*"],
-            allow_headers=["*"],
-        )
-        
-        # Подключаем статические файлы
-        self.app.mount("/static", StaticFiles(directory="static"), name="static")
-        
-        # Настройка шаблонов
-        self.templates = Jinja2Templates(directory="templates")
-        
-        # Данные приложения
-        self.data_file = "app_data.json"
-        self.categories = {
-            'expenses': {
-                '🍔 Еда': 'food',
-                '🚗 Транспорт': 'transport',
-                '🏠 Жилье': 'housing',
-                '👕 Одежда': 'clothing',
-                '💊 Здоровье': 'health',
-                '🎮 Развлечения': 'entertainment',
-                '📚 Образование': 'education',
-                '💳 Кредиты': 'loans',
-                '📱 Технологии': 'technology',
-                '🏦 Налоги': 'taxes',
-                '🎁 Подарки': 'gifts',
-                '✈️ Путешествия': 'travel',
-                '💼 Бизнес': 'business',
-                '🔧 Услуги': 'services',
-                '📦 Покупки': 'shopping',
-                '💰 Другое': 'other'
-            },
-            'income': {
-                '💼 Зарплата': 'salary',
-                '🏢 Бизнес': 'business',
-                '📈 Инвестиции': 'investments',
-                '🎁 Подарки': 'gifts',
-                '🏠 Аренда': 'rental',
-                '💻 Фриланс': 'freelance',
-                '🎯 Премии': 'bonuses',
-                '💰 Другое': 'other'
-            }
-        }
-        
-        self.load_data()
-        self.setup_routes()
-    
-    def load_data(self):
-        """Загрузка данных из файла"""
-        if os.path.exists(self.data_file):
-            try:
-                with open(self.data_file, 'r', encoding='utf-8') as f:
-                    self.data = json.load(f)
-            except:
-                self.data = {}
-        else:
-            self.data = {}
-    
-    def save_data(self):
-        """Сохранение данных в файл"""
-        with open(self.data_file, 'w', encoding='utf-8') as f:
-            json.dump(self.data, f, ensure_ascii=False, indent=2)
-    
-    def get_user_data(self, user_id: str) -> Dict:
-        """Получить данные пользователя"""
-        if user_id not in self.data:
-            self.data[user_id] = {
-                'transactions': [],
-                'budgets': {},
-                'goals': [],
-                'currency': 'RUB',
-                'settings': {
-                    'theme': 'light',
-                    'notifications': True,
-                    'language': 'ru'
-                }
-            }
-        return self.data[user_id]
-    
-    def setup_routes(self):
-        """Настройка маршрутов приложения"""
-        
-        @self.app.get("/", response_class=HTMLResponse)
-        async def home(request: Request):
-            """Главная страница приложения"""
-            return self.templates.TemplateResponse("index.html", {
-                "request": request,
-                "title": "Finance Tracker App"
-            })
-        
-        @self.app.get("/app", response_class=HTMLResponse)
-        async def app_main(request: Request):
-            """Основное приложение"""
-            return self.templates.TemplateResponse("app.html", {
-                "request": request,
-                "title": "Finance Tracker",
-                "categories": self.categories
-            })
-        
-        @self.app.get("/api/user/{user_id}")
-        async def get_user_data(user_id: str):
-            """Получить данные пользователя"""
-            user_data = self.get_user_data(user_id)
-            return JSONResponse(content=user_data)
-        
-        @self.app.post("/api/transaction")
-        async def add_transaction(request: Request):
-            """Добавить транзакцию"""
-            try:
-                data = await request.json()
-                user_id = data.get('user_id')
-                transaction_type = data.get('type')
-                category = data.get('category')
-                amount = float(data.get('amount', 0))
-                description = data.get('description', '')
-                
-                if not all([user_id, transaction_type, category, amount > 0]):
-                    raise HTTPException(status_code=400, detail="Неверные данные")
-                
-                user_data = self.get_user_data(user_id)
-                
-                transaction = {
-                    'id': len(user_data['transactions']) + 1,
-                    'type': transaction_type,
-                    'category': category,
-                    'amount': amount,
-                    'description': description,
-                    'date': datetime.now().isoformat(),
-                    'timestamp': datetime.now().timestamp()
-                }
-                
-                user_data['transactions'].append(transaction)
-                self.save_data()
-                
-                return JSONResponse(content={
-                    "success": True,
-                    "transaction": transaction,
-                    "message": "Транзакция добавлена"
-                })
-                
-            except Exception as e:
-                logger.error(f"Ошибка добавления транзакции: {e}")
-                raise HTTPException(status_code=500, detail="Ошибка сервера")
-        
-        @self.app.get("/api/statistics/{user_id}")
-        async def get_statistics(user_id: str, period: str = "month"):
-            """Получить статистику"""
-            try:
-                user_data = self.get_user_data(user_id)
-                
-                # Фильтрация по периоду
-                now = datetime.now()
-                if period == "week":
-                    start_date = now.replace(day=now.day - 7)
-                elif period == "month":
-                    start_date = now.replace(day=1)
-                elif period == "year":
-                    start_date = now.replace(month=1, day=1)
-                else:
-                    start_date = now.replace(day=1)
-                
-                filtered_transactions = [
-                    t for t in user_data['transactions']
-                    if datetime.fromtimestamp(t['timestamp']) >= start_date
-                ]
-                
-                total_income = sum(t['amount'] for t in filtered_transactions if t['type'] == 'income')
-                total_expenses = sum(t['amount'] for t in filtered_transactions if t['type'] == 'expense')
-                balance = total_income - total_expenses
-                
-                # Топ категорий расходов
-                expense_categories = {}
-                for t in filtered_transactions:
-                    if t['type'] == 'expense':
-                        cat = t['category']
-                        expense_categories[cat] = expense_categories.get(cat, 0) + t['amount']
-                
-                top_expenses = sorted(expense_categories.items(), key=lambda x: x[1], reverse=True)[:5]
-                
-                return JSONResponse(content={
-                    "period": period,
-                    "total_income": total_income,
-                    "total_expenses": total_expenses,
-                    "balance": balance,
-                    "top_expenses": top_expenses,
-                    "currency": user_data['currency']
-                })
-                
-            except Exception as e:
-                logger.error(f"Ошибка получения статистики: {e}")
-                raise HTTPException(status_code=500, detail="Ошибка сервера")
-        
-        @self.app.post("/api/goal")
-        async def add_goal(request: Request):
-            """Добавить финансовую цель"""
-            try:
-                data = await request.json()
-                user_id = data.get('user_id')
-                name = data.get('name')
-                target = float(data.get('target', 0))
-                deadline = data.get('deadline')
-                
-                if not all([user_id, name, target > 0]):
-                    raise HTTPException(status_code=400, detail="Неверные данные")
-                
-                user_data = self.get_user_data(user_id)
-                
-                goal = {
-                    'id': len(user_data.get('goals', [])) + 1,
-                    'name': name,
-                    'target': target,
-                    'saved': 0,
-                    'deadline': deadline,
-                    'created_at': datetime.now().isoformat()
-                }
-                
-                if 'goals' not in user_data:
-                    user_data['goals'] = []
-                
-                user_data['goals'].append(goal)
-                self.save_data()
-                
-                return JSONResponse(content={
-                    "success": True,
-                    "goal": goal,
-                    "message": "Цель добавлена"
-                })
-                
-            except Exception as e:
-                logger.error(f"Ошибка добавления цели: {e}")
-                raise HTTPException(status_code=500, detail="Ошибка сервера")
-        
-        @self.app.post("/api/budget")
-        async def add_budget(request: Request):
-            """Добавить бюджет"""
-            try:
-                data = await request.json()
-                user_id = data.get('user_id')
-                category = data.get('category')
-                amount = float(data.get('amount', 0))
-                
-                if not all([user_id, category, amount > 0]):
-                    raise HTTPException(status_code=400, detail="Неверные данные")
-                
-                user_data = self.get_user_data(user_id)
-                
-                if 'budgets' not in user_data:
-                    user_data['budgets'] = {}
-                
-                user_data['budgets'][category] = {
-                    'amount': amount,
-                    'created_at': datetime.now().isoformat()
-                }
-                
-                self.save_data()
-                
-                return JSONResponse(content={
-                    "success": True,
-                    "budget": user_data['budgets'][category],
-                    "message": "Бюджет добавлен"
-                })
-                
-            except Exception as e:
-                logger.error(f"Ошибка добавления бюджета: {e}")
-                raise HTTPException(status_code=500, detail="Ошибка сервера")
-        
-        @self.app.get("/api/categories")
-        async def get_categories():
-            """Получить категории"""
-            return JSONResponse(content=self.categories)
-        
-        @self.app.get("/health")
-        async def health_check():
-            """Проверка здоровья приложения"""
-            return JSONResponse(content={
-                "status": "healthy",
-                "timestamp": datetime.now().isoformat(),
-                "version": "1.0.0"
-            })
-    
-    def run(self, host: str = "0.0.0.0", port: int = 8080):
-        """Запуск приложения"""
-        logger.info(f"🚀 Запуск Finance Tracker App на {host}:{port}")
-        
-        uvicorn.run(
-            self.app,
-            host=host,
-            port=port,
-            log_level="info"
-        )
-
-def main():
-    """Главная функция"""
-    app = FinanceApp()
-    app.run()
-
-if __name__ == "__main__":
-    main()
+#!/usr/bin/env python3
+"""
+Telegram App - Полноценное веб-приложение для Telegram
+"""
+
+import asyncio
+import json
+import logging
+import math
+import os
+from datetime import datetime
+from typing import Dict, List, Optional
+from dotenv import load_dotenv
+
+from fastapi import FastAPI, Request, HTTPException, Depends, Query
+from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse, Response, StreamingResponse
+from fastapi.staticfiles import StaticFiles
+from fastapi.templating import Jinja2Templates
+from fastapi.middleware.cors import CORSMiddleware
+import uvicorn
+
+from storage import create_store, new_user_data
+from persistence import AsyncStorage, CoalescingWriter
+from user_cache import create_user_cache
+from aggregates import (
+    append_transaction, bump_version, ensure_totals, ensure_version, new_transaction_id, period_start,
+    period_statistics
+)
+from timeline import page_transactions, transactions_between
+from analytics import AnalyticsEngine
+from search import SearchEngine
+from categories import CATEGORIES
+from categorizer import Categorizer
+from stats_cache import create_statistics_cache
+from metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, AppMetrics, MetricsMiddleware
+from sync import changes_since, etag_matches, version_etag
+from batch import BATCH_MAX_SIZE, add_batch
+from exporter import EXPORT_FORMATS, EXTENSIONS, MEDIA_TYPES, iter_export
+
+# Загружаем переменные окружения
+load_dotenv()
+
+# Настройка логирования
+logging.basicConfig(
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    level=logging.INFO
+)
+logger = logging.getLogger(__name__)
+
+class FinanceApp:
+    def __init__(self):
+        self.app = FastAPI(
+            title="Finance Tracker App",
+            description="Полноценное приложение для учета финансов",
+            version="1.0.0"
+        )
+        
+        # Метрики запросов для /metrics
+        self.metrics = AppMetrics()
+        self.app.add_middleware(MetricsMiddleware, metrics=self.metrics)
+        
+        # Настройка CORS
+        self.app.add_middleware(
+            CORSMiddleware,
+            allow_origins=["*"],
+            allow_credentials=True,
+            allow_methods=["*"],
+            allow_headers=["*"],
+        )
+        
+        # Подключаем статические файлы
+        self.app.mount("/static", StaticFiles(directory="static"), name="static")
+        
+        # Настройка шаблонов
+        self.templates = Jinja2Templates(directory="templates")
+        
+        # Данные приложения
+        self.data_file = "app_data.json"
+        self.categories = CATEGORIES
+        
+        self.store = create_store(self.data_file)
+        self.storage = AsyncStorage(self.store)
+        self.writer = CoalescingWriter(
+            self.storage, on_flush=lambda seconds: self.metrics.storage.observe(seconds, ('flush',))
+        )
+        self.analytics = AnalyticsEngine()
+        self.search = SearchEngine()
+        self.categorizer = Categorizer(self.categories)
+        self.stats_cache = create_statistics_cache()
+        self.load_data()
+        self.setup_routes()
+        self.setup_events()
+    
+    def load_data(self):
+        """Загрузка данных в кеш пользователей"""
+        self.data = create_user_cache(
+            self.store.lazy_loading,
+            is_dirty=self.writer.is_pending,
+            writeback=self.writer.request_flush
+        )
+        with self.metrics.storage.time(('load',)):
+            self.data.update(self.store.load())
+    
+    def get_user_data(self, user_id: str) -> Dict:
+        """Получить данные пользователя"""
+        user_data = self.data.get(user_id)
+        if user_data is None:
+            with self.metrics.storage.time(('load_user',)):
+                user_data = self.store.load_user(user_id) or new_user_data()
+            self.data[user_id] = user_data
+        return user_data
+    
+    async def fetch_user_data(self, user_id: str) -> Dict:
+        """Получить данные пользователя, не блокируя event loop при загрузке"""
+        user_data = self.data.get(user_id)
+        if user_data is None:
+            async with self.storage.lock(user_id):
+                user_data = self.data.peek(user_id)
+                if user_data is None:
+                    with self.metrics.storage.time(('load_user',)):
+                        user_data = await self.storage.load_user(user_id) or new_user_data()
+                    self.data[user_id] = user_data
+        return user_data
+    
+    def setup_routes(self):
+        """Настройка маршрутов приложения"""
+        
+        @self.app.get("/", response_class=HTMLResponse)
+        async def home(request: Request):
+            """Главная страница приложения"""
+            return self.templates.TemplateResponse("index.html", {
+                "request": request,
+                "title": "Finance Tracker App"
+            })
+        
+        @self.app.get("/app", response_class=HTMLResponse)
+        async def app_main(request: Request):
+            """Основное приложение"""
+            return self.templates.TemplateResponse("app.html", {
+                "request": request,
+                "title": "Finance Tracker",
+                "categories": self.categories
+            })
+        
+        @self.app.get("/api/user/{user_id}")
+        async def get_user_data(user_id: str, request: Request):
+            """Получить данные пользователя (304, если у клиента та же версия)"""
+            user_data = await self.fetch_user_data(user_id)
+            etag = version_etag(ensure_version(user_data))
+            if etag_matches(request.headers.get('if-none-match'), etag):
+                return Response(status_code=304, headers={"ETag": etag})
+            return JSONResponse(content=user_data, headers={"ETag": etag})
+        
+        @self.app.get("/api/sync/{user_id}")
+        async def sync_user_data(user_id: str, since: Optional[int] = None):
+            """Изменения данных пользователя после версии since"""
+            user_data = await self.fetch_user_data(user_id)
+            return JSONResponse(content=changes_since(user_data, since))
+        
+        @self.app.get("/api/user/{user_id}/summary")
+        async def get_user_summary(user_id: str):
+            """Данные пользователя без истории транзакций"""
+            user_data = await self.fetch_user_data(user_id)
+            return JSONResponse(content={
+                "currency": user_data['currency'],
+                "settings": user_data.get('settings', {}),
+                "budgets": user_data.get('budgets', {}),
+                "goals": user_data.get('goals', []),
+                "totals": ensure_totals(user_data)
+            })
+        
+        @self.app.post("/api/transaction")
+        async def add_transaction(request: Request):
+            """Добавить транзакцию"""
+            try:
+                data = await request.json()
+                user_id = data.get('user_id')
+                transaction_type = data.get('type')
+                category = data.get('category')
+                amount = float(data.get('amount', 0))
+                description = data.get('description', '')
+                
+                if not all([user_id, transaction_type, math.isfinite(amount), amount > 0]):
+                    raise HTTPException(status_code=400, detail="Неверные данные")
+                
+                user_data = await self.fetch_user_data(user_id)
+                
+                # Без категории - подбираем по описанию
+                auto_category = not category
+                if auto_category:
+                    category = self.categorizer.categorize(transaction_type, description, user_id, user_data)
+                
+                transaction = {
+                    'id': new_transaction_id(user_data),
+                    'type': transaction_type,
+                    'category': category,
+                    'amount': amount,
+                    'description': description,
+                    'date': datetime.now().isoformat(),
+                    'timestamp': datetime.now().timestamp()
+                }
+                if auto_category:
+                    transaction['auto_category'] = True
+                
+                append_transaction(user_data, transaction)
+                if not auto_category:
+                    self.categorizer.learn(user_id, transaction)
+                self.search.add(user_id, user_data, [transaction])
+                self.stats_cache.invalidate(user_id)
+                await self.writer.write(user_id, 'transaction', transaction, durable=data.get('durable'))
+                
+                return JSONResponse(content={
+                    "success": True,
+                    "transaction": transaction,
+                    "message": "Транзакция добавлена"
+                })
+                
+            except HTTPException:
+                # 400 с причиной отдаем как есть
+                raise
+            except Exception as e:
+                logger.error(f"Ошибка добавления транзакции: {e}")
+                raise HTTPException(status_code=500, detail="Ошибка сервера")
+        
+        @self.app.post("/api/transactions/batch")
+        async def add_transactions_batch(request: Request):
+            """Добавить пачку транзакций.
+            
+            В ответе - результат по каждому элементу; при atomic=true пачка
+            добавляется целиком или не добавляется совсем.
+            """
+            try:
+                data = await request.json()
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Некорректный JSON")
+            if not isinstance(data, dict):
+                raise HTTPException(status_code=400, detail="Неверные данные")
+            user_id = data.get('user_id')
+            items = data.get('transactions')
+            atomic = bool(data.get('atomic', False))
+            
+            if not user_id or not isinstance(items, list):
+                raise HTTPException(status_code=400, detail="Неверные данные")
+            if len(items) > BATCH_MAX_SIZE:
+                raise HTTPException(status_code=413, detail=f"Не больше {BATCH_MAX_SIZE} транзакций за запрос")
+            
+            try:
+                user_data = await self.fetch_user_data(user_id)
+                transactions, results = add_batch(user_data, items, atomic)
+                rejected = len(items) - len(transactions)
+                
+                if transactions:
+                    self.search.add(user_id, user_data, transactions)
+                    self.stats_cache.invalidate(user_id)
+                    await self.writer.write_many(
+                        user_id, [('transaction', t) for t in transactions], durable=data.get('durable')
+                    )
+                
+                return JSONResponse(status_code=400 if atomic and rejected else 200, content={
+                    "success": rejected == 0,
+                    "accepted": len(transactions),
+                    "rejected": rejected,
+                    "results": results,
+                    "version": user_data.get('version', 0)
+                })
+                
+            except Exception as e:
+                logger.error(f"Ошибка пакетного добавления транзакций: {e}")
+                raise HTTPException(status_code=500, detail="Ошибка сервера")
+        
+        @self.app.get("/api/transactions/{user_id}")
+        async def get_transactions(user_id: str,
+                                   cursor: Optional[str] = None,
+                                   limit: int = Query(50, ge=1, le=500),
+                                   from_ts: Optional[float] = Query(None, alias="from"),
+                                   to_ts: Optional[float] = Query(None, alias="to"),
+                                   type: Optional[str] = None,
+                                   category: Optional[str] = None):
+            """Транзакции постранично, от новых к старым.
+            
+            Окно [from, to) и фильтры type/category необязательны; следующая
+            страница запрашивается с курсором next_cursor из ответа.
+            """
+            user_data = await self.fetch_user_data(user_id)
+            try:
+                transactions, next_cursor = page_transactions(
+                    user_data, limit, cursor, from_ts, to_ts, type, category
+                )
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Неверный курсор")
+            
+            return JSONResponse(content={
+                "transactions": transactions,
+                "count": len(transactions),
+                "next_cursor": next_cursor,
+                "currency": user_data['currency']
+            })
+        
+        @self.app.get("/api/export/{user_id}")
+        async def export_transactions(user_id: str, format: str = "csv",
+                                      from_ts: Optional[float] = Query(None, alias="from"),
+                                      to_ts: Optional[float] = Query(None, alias="to")):
+            """Выгрузка транзакций за окно [from, to) в csv, jsonl или columnar"""
+            if format not in EXPORT_FORMATS:
+                raise HTTPException(status_code=400, detail="Неизвестный формат")
+            
+            user_data = await self.fetch_user_data(user_id)
+            # Срез - только список ссылок: новые транзакции не сдвигают выгрузку
+            transactions = transactions_between(user_data, from_ts, to_ts)
+            filename = f"transactions_{user_id}.{EXTENSIONS[format]}"
+            
+            return StreamingResponse(
+                iter_export(transactions, format),
+                media_type=MEDIA_TYPES[format],
+                headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+            )
+        
+        @self.app.get("/api/analytics/{user_id}")
+        async def get_analytics(user_id: str,
+                                from_ts: Optional[float] = Query(None, alias="from"),
+                                to_ts: Optional[float] = Query(None, alias="to"),
+                                top: int = 5):
+            """Аналитика за окно [from, to): категории, топ расходов, крупнейшие траты"""
+            try:
+                user_data = await self.fetch_user_data(user_id)
+                summary = self.analytics.summary(user_id, user_data, from_ts, to_ts, top)
+                summary['currency'] = user_data['currency']
+                return JSONResponse(content=summary)
+                
+            except Exception as e:
+                logger.error(f"Ошибка расчета аналитики: {e}")
+                raise HTTPException(status_code=500, detail="Ошибка сервера")
+        
+        @self.app.get("/api/search/{user_id}")
+        async def search_transactions(user_id: str, q: str,
+                                      cursor: Optional[str] = None,
+                                      limit: int = Query(20, ge=1, le=200)):
+            """Поиск транзакций по словам описания (по префиксу), от новых к старым"""
+            user_data = await self.fetch_user_data(user_id)
+            try:
+                transactions, next_cursor, total = self.search.search(user_id, user_data, q, limit, cursor)
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Неверный курсор")
+            
+            return JSONResponse(content={
+                "query": q,
+                "transactions": transactions,
+                "count": len(transactions),
+                "total": total,
+                "next_cursor": next_cursor,
+                "currency": user_data['currency']
+            })
+        
+        @self.app.get("/api/statistics/{user_id}")
+        async def get_statistics(user_id: str, request: Request, period: str = "month",
+                                 from_ts: Optional[float] = Query(None, alias="from"),
+                                 to_ts: Optional[float] = Query(None, alias="to")):
+            """Получить статистику за период или за произвольное окно from/to"""
+            try:
+                user_data = await self.fetch_user_data(user_id)
+                
+                # Границы периода
+                if from_ts is not None:
+                    period = "custom"
+                    start_ts, end_ts = from_ts, to_ts
+                else:
+                    start_ts, end_ts = period_start(period).timestamp(), None
+                
+                # Готовый ответ, если данные не менялись
+                key = ('statistics', period, start_ts, end_ts)
+                version = ensure_version(user_data)
+                etag = version_etag(version, key)
+                if etag_matches(request.headers.get('if-none-match'), etag):
+                    return Response(status_code=304, headers={"ETag": etag})
+                
+                cached = self.stats_cache.get(user_id, key, version)
+                if cached is None:
+                    # Итоги по дням и месяцам, без просмотра всей истории
+                    with self.metrics.statistics.time():
+                        stats = period_statistics(user_data, start_ts, end_ts)
+                    content = {
+                        "period": period,
+                        "total_income": stats['total_income'],
+                        "total_expenses": stats['total_expenses'],
+                        "balance": stats['balance'],
+                        "top_expenses": stats['top_expenses'],
+                        "currency": user_data['currency']
+                    }
+                    body = JSONResponse(content=content).body
+                    cached = self.stats_cache.put(user_id, key, version, content, body)
+                
+                return Response(content=cached.body, media_type="application/json",
+                                headers={"ETag": etag})
+                
+            except Exception as e:
+                logger.error(f"Ошибка получения статистики: {e}")
+                raise HTTPException(status_code=500, detail="Ошибка сервера")
+        
+        @self.app.post("/api/goal")
+        async def add_goal(request: Request):
+            """Добавить финансовую цель"""
+            try:
+                data = await request.json()
+                user_id = data.get('user_id')
+                name = data.get('name')
+                target = float(data.get('target', 0))
+                deadline = data.get('deadline')
+                
+                if not all([user_id, name, math.isfinite(target), target > 0]):
+                    raise HTTPException(status_code=400, detail="Неверные данные")
+                
+                user_data = await self.fetch_user_data(user_id)
+                
+                goal = {
+                    'id': len(user_data.get('goals', [])) + 1,
+                    'name': name,
+                    'target': target,
+                    'saved': 0,
+                    'deadline': deadline,
+                    'created_at': datetime.now().isoformat()
+                }
+                
+                if 'goals' not in user_data:
+                    user_data['goals'] = []
+                
+                user_data['goals'].append(goal)
+                bump_version(user_data, goal)
+                self.stats_cache.invalidate(user_id)
+                await self.writer.write(user_id, 'goal', goal, durable=data.get('durable'))
+                
+                return JSONResponse(content={
+                    "success": True,
+                    "goal": goal,
+                    "message": "Цель добавлена"
+                })
+                
+            except HTTPException:
+                # 400 с причиной отдаем как есть
+                raise
+            except Exception as e:
+                logger.error(f"Ошибка добавления цели: {e}")
+                raise HTTPException(status_code=500, detail="Ошибка сервера")
+        
+        @self.app.post("/api/budget")
+        async def add_budget(request: Request):
+            """Добавить бюджет"""
+            try:
+                data = await request.json()
+                user_id = data.get('user_id')
+                category = data.get('category')
+                amount = float(data.get('amount', 0))
+                
+                if not all([user_id, category, math.isfinite(amount), amount > 0]):
+                    raise HTTPException(status_code=400, detail="Неверные данные")
+                
+                user_data = await self.fetch_user_data(user_id)
+                
+                if 'budgets' not in user_data:
+                    user_data['budgets'] = {}
+                
+                user_data['budgets'][category] = {
+                    'amount': amount,
+                    'created_at': datetime.now().isoformat()
+                }
+                bump_version(user_data, user_data['budgets'][category])
+                self.stats_cache.invalidate(user_id)
+                
+                await self.writer.write(user_id, 'budget', {
+                    'category': category,
+                    'budget': user_data['budgets'][category]
+                }, durable=data.get('durable'))
+                
+                return JSONResponse(content={
+                    "success": True,
+                    "budget": user_data['budgets'][category],
+                    "message": "Бюджет добавлен"
+                })
+                
+            except HTTPException:
+                # 400 с причиной отдаем как есть
+                raise
+            except Exception as e:
+                logger.error(f"Ошибка добавления бюджета: {e}")
+                raise HTTPException(status_code=500, detail="Ошибка сервера")
+        
+        @self.app.get("/api/categorize")
+        async def categorize(type: str, description: str, user_id: Optional[str] = None):
+            """Подобрать категорию по описанию (с учетом выбора пользователя, если указан user_id)"""
+            user_data = await self.fetch_user_data(user_id) if user_id else None
+            return JSONResponse(content={
+                "type": type,
+                "category": self.categorizer.categorize(type, description, user_id, user_data)
+            })
+        
+        @self.app.get("/api/categories")
+        async def get_categories():
+            """Получить категории"""
+            return JSONResponse(content=self.categories)
+        
+        @self.app.get("/metrics")
+        async def get_metrics():
+            """Метрики в текстовом формате Prometheus"""
+            return PlainTextResponse(self.metrics.render(), media_type=METRICS_CONTENT_TYPE)
+        
+        @self.app.get("/health")
+        async def health_check():
+            """Проверка здоровья приложения"""
+            return JSONResponse(content={
+                "status": "healthy",
+                "timestamp": datetime.now().isoformat(),
+                "version": "1.0.0",
+                "user_cache": self.data.stats(),
+                "statistics_cache": self.stats_cache.stats()
+            })
+    
+    def setup_events(self):
+        """Запуск и остановка фоновых задач"""
+        
+        @self.app.on_event("startup")
+        async def start_background_tasks():
+            """Запуск отложенной записи данных"""
+            self.writer.start()
+        
+        @self.app.on_event("shutdown")
+        async def stop_background_tasks():
+            """Сброс накопленных изменений при остановке"""
+            await self.writer.stop()
+    
+    def run(self, host: str = "0.0.0.0", port: int = 8080):
+        """Запуск приложения"""
+        logger.info(f"🚀 Запуск Finance Tracker App на {host}:{port}")
+        
+        uvicorn.run(
+            self.app,
+            host=host,
+            port=port,
+            log_level="info"
+        )
+        self.storage.close()
+
+def main():
+    """Главная функция"""
+    app = FinanceApp()
+    app.run()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Batch - Пакетное добавление транзакций
+Проверка всей пачки за один проход, id выдаются подряд, итоги
+обновляются один раз на пачку, запись в хранилище - одним сбросом
+"""
+
+import math
+import os
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+from aggregates import append_transactions, new_transaction_id
+
+TRANSACTION_TYPES = ('income', 'expense')
+BATCH_MAX_SIZE = int(os.getenv('BATCH_MAX_SIZE', '10000'))
+
+
+def parse_transaction(item: Dict, now: datetime) -> Dict:
+    """Транзакция из элемента пачки (ValueError с причиной, если элемент неверный)"""
+    if not isinstance(item, dict):
+        raise ValueError("Ожидается объект")
+    transaction_type = item.get('type')
+    if transaction_type not in TRANSACTION_TYPES:
+        raise ValueError("Неверный тип")
+    category = item.get('category')
+    if not category or not isinstance(category, str):
+        raise ValueError("Не указана категория")
+    try:
+        amount = float(item.get('amount', 0))
+    except (TypeError, ValueError):
+        raise ValueError("Неверная сумма")
+    # inf и nan не записать в журнал JSON, и они портят итоги
+    if not math.isfinite(amount) or amount <= 0:
+        raise ValueError("Неверная сумма")
+
+    # Клиенты, копившие записи без сети, передают время создания
+    moment = now
+    if item.get('timestamp') is not None:
+        try:
+            moment = datetime.fromtimestamp(float(item['timestamp']))
+        except (TypeError, ValueError, OverflowError, OSError):
+            raise ValueError("Неверное время")
+
+    return {
+        'id': None,
+        'type': transaction_type,
+        'category': category,
+        'amount': amount,
+        'description': str(item.get('description', '')),
+        'date': moment.isoformat(),
+        'timestamp': moment.timestamp()
+    }
+
+
+def add_batch(user_data: Dict, items: List, atomic: bool = False) -> Tuple[List[Dict], List[Dict]]:
+    """Проверить и добавить пачку.
+
+    Возвращает добавленные транзакции и результаты по каждому элементу.
+    В режиме atomic при любой ошибке не добавляется ничего.
+    """
+    now = datetime.now()
+    accepted = []
+    results = []
+    for index, item in enumerate(items):
+        try:
+            accepted.append(parse_transaction(item, now))
+            results.append({'index': index, 'success': True})
+        except ValueError as e:
+            results.append({'index': index, 'success': False, 'error': str(e)})
+
+    if atomic and len(accepted) != len(items):
+        return [], results
+
+    # id подряд из счетчика пользователя, как у одиночного добавления
+    accepted_results = (result for result in results if result['success'])
+    for transaction, result in zip(accepted, accepted_results):
+        transaction['id'] = result['id'] = new_transaction_id(user_data)
+
+    append_transactions(user_data, accepted)
+    return accepted, results
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Categories - Общий справочник категорий транзакций
+Одна таблица категорий для веб-приложений и ботов; обратный словарь
+(код -> название) строится один раз при импорте. Без зависимостей -
+клавиатуры ботов собирает keyboards.py
+"""
+
+from typing import Dict, Tuple
+
+CATEGORIES = {
+    'expenses': {
+        '🍔 Еда': 'food',
+        '🚗 Транспорт': 'transport',
+        '🏠 Жилье': 'housing',
+        '👕 Одежда': 'clothing',
+        '💊 Здоровье': 'health',
+        '🎮 Развлечения': 'entertainment',
+        '📚 Образование': 'education',
+        '💳 Кредиты': 'loans',
+        '📱 Технологии': 'technology',
+        '🏦 Налоги': 'taxes',
+        '🎁 Подарки': 'gifts',
+        '✈️ Путешествия': 'travel',
+        '💼 Бизнес': 'business',
+        '🔧 Услуги': 'services',
+        '📦 Покупки': 'shopping',
+        '💰 Другое': 'other'
+    },
+    'income': {
+        '💼 Зарплата': 'salary',
+        '🏢 Бизнес': 'business',
+        '📈 Инвестиции': 'investments',
+        '🎁 Подарки': 'gifts',
+        '🏠 Аренда': 'rental',
+        '💻 Фриланс': 'freelance',
+        '🎯 Премии': 'bonuses',
+        '💰 Другое': 'other'
+    }
+}
+
+# Тип транзакции ('expense', 'income') -> раздел таблицы категорий
+SECTIONS = {'expense': 'expenses', 'expenses': 'expenses', 'income': 'income'}
+
+
+class CategoryRegistry:
+    """Категории с поиском названия по коду за O(1)"""
+
+    def __init__(self, categories: Dict[str, Dict[str, str]] = CATEGORIES):
+        self.categories = categories
+        # (раздел, код) -> название; при повторе кода остается первое название
+        self._names: Dict[Tuple[str, str], str] = {}
+        for section, items in categories.items():
+            for name, code in items.items():
+                self._names.setdefault((section, code), name)
+
+    def name(self, code: str, transaction_type: str) -> str:
+        """Название категории по коду (сам код, если категория неизвестна)"""
+        section = SECTIONS.get(transaction_type, transaction_type)
+        return self._names.get((section, code), code)
+
+    def items(self, transaction_type: str) -> Dict[str, str]:
+        """Категории типа транзакции: название -> код"""
+        return self.categories[SECTIONS[transaction_type]]
+
+
+registry = CategoryRegistry()
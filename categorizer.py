@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Categorizer - Автоматический выбор категории по описанию
+Ключевые слова всех категорий собраны в автомат Ахо-Корасик, поэтому
+описание любой длины проверяется за один проход. Категории, которые
+пользователь сам выбирал для похожих описаний, важнее словаря
+"""
+
+import os
+from collections import OrderedDict, deque
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from search import tokenize
+
+DEFAULT_CATEGORY = 'other'
+
+# Начала слов (основы), по которым узнается категория
+KEYWORDS = {
+    'expense': {
+        'food': ('еда', 'продукт', 'обед', 'ужин', 'завтрак', 'кафе', 'ресторан', 'столов', 'пицц',
+                 'суши', 'роллы', 'бургер', 'шаурм', 'кофе', 'магнит', 'пятерочк', 'перекресток',
+                 'ашан', 'лента', 'вкусвилл', 'макдональдс', 'kfc', 'food'),
+        'transport': ('такси', 'метро', 'автобус', 'трамва', 'троллейбус', 'электричк', 'бензин',
+                      'заправк', 'азс', 'топливо', 'парковк', 'каршеринг', 'проезд', 'транспорт',
+                      'taxi', 'uber'),
+        'housing': ('квартплат', 'жкх', 'коммунал', 'электроэнерг', 'водоснаб', 'жилье', 'квартир'),
+        'clothing': ('одежд', 'обув', 'кроссовк', 'куртк', 'джинс', 'футболк', 'плать', 'рубашк'),
+        'health': ('аптек', 'лекарств', 'таблетк', 'врач', 'стоматолог', 'клиник', 'анализ',
+                   'больниц', 'здоров', 'медицин'),
+        'entertainment': ('кино', 'театр', 'концерт', 'музей', 'игр', 'боулинг', 'караоке', 'бар',
+                          'клуб', 'развлеч', 'steam'),
+        'education': ('курс', 'книг', 'учеб', 'обучени', 'образован', 'школ', 'универ', 'репетитор'),
+        'loans': ('кредит', 'ипотек', 'займ', 'долг', 'рассрочк'),
+        'technology': ('телефон', 'смартфон', 'ноутбук', 'компьютер', 'наушник', 'гаджет', 'планшет',
+                       'iphone', 'apple'),
+        'taxes': ('налог', 'ндфл', 'пошлин', 'штраф'),
+        'gifts': ('подар', 'цвет', 'букет'),
+        'travel': ('отел', 'гостиниц', 'хостел', 'билет', 'авиа', 'самолет', 'поезд', 'тур',
+                   'отпуск', 'путешеств', 'виза'),
+        'business': ('реклам', 'хостинг', 'офис', 'бизнес'),
+        'services': ('связь', 'мобильн', 'интернет', 'подписк', 'парикмахер', 'барбер', 'стрижк',
+                     'химчистк', 'ремонт', 'услуг'),
+        'shopping': ('покупк', 'магазин', 'маркетплейс', 'озон', 'ozon', 'вайлдберриз', 'wildberries',
+                     'алиэкспресс', 'шопинг')
+    },
+    'income': {
+        'salary': ('зарплат', 'зп', 'аванс', 'оклад', 'получк'),
+        'business': ('выручк', 'бизнес', 'продаж'),
+        'investments': ('дивиденд', 'купон', 'вклад', 'процент', 'акци', 'инвест', 'кэшбэк', 'кешбэк'),
+        'gifts': ('подар',),
+        'rental': ('аренд', 'квартирант', 'жилец'),
+        'freelance': ('фриланс', 'заказ', 'проект', 'подработк'),
+        'bonuses': ('преми', 'бонус')
+    }
+}
+
+
+class KeywordMatcher:
+    """Автомат Ахо-Корасик над ключевыми словами.
+
+    Ключевое слово засчитывается, только если оно начинается с начала
+    слова текста: 'такси' найдется в 'такси домой' и 'таксист', но не
+    в 'фитакси'.
+    """
+
+    def __init__(self, keywords: Iterable[Tuple[str, str]]):
+        # Состояние автомата: переходы, ссылка неудачи, слова, заканчивающиеся здесь
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[Tuple[str, str]]] = [[]]
+
+        for keyword, value in keywords:
+            state = 0
+            for char in keyword:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                state = next_state
+            self._output[state].append((keyword, value))
+
+        # Ссылки неудачи обходом в ширину
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                if self._fail[next_state] == next_state:
+                    self._fail[next_state] = 0
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def find(self, text: str) -> List[Tuple[int, str, str]]:
+        """Найденные ключевые слова: (позиция начала, слово, значение)"""
+        found = []
+        state = 0
+        for position, char in enumerate(text):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for keyword, value in self._output[state]:
+                start = position - len(keyword) + 1
+                if start == 0 or not text[start - 1].isalnum():
+                    found.append((start, keyword, value))
+        return found
+
+    def best(self, text: str) -> Optional[str]:
+        """Значение самого длинного (при равенстве - первого) найденного слова"""
+        found = self.find(text)
+        if not found:
+            return None
+        _, _, value = min(found, key=lambda match: (-len(match[1]), match[0]))
+        return value
+
+
+def normalize(text: str) -> str:
+    return (text or '').lower().replace('ё', 'е')
+
+
+class Categorizer:
+    """Выбор категории по описанию: правила пользователя, затем словарь.
+
+    Правила пользователя - слова из описаний транзакций, которым он сам
+    выбрал категорию (транзакции без отметки auto_category). Они
+    собираются из истории при первом обращении и пополняются через learn.
+    """
+
+    def __init__(self, categories: Dict, max_users: Optional[int] = None):
+        if max_users is None:
+            max_users = int(os.getenv('CATEGORIZER_CACHE_USERS', '1024'))
+        self.max_users = max_users
+        self._matchers: Dict[str, KeywordMatcher] = {}
+        for group, t_type in (('expenses', 'expense'), ('income', 'income')):
+            codes = set(categories.get(group, {}).values())
+            keywords = [
+                (normalize(keyword), code)
+                for code, words in KEYWORDS.get(t_type, {}).items() if code in codes
+                for keyword in words
+            ]
+            # Подписи категорий без эмодзи: "🍔 Еда" -> "еда"
+            keywords += [
+                (normalize(label.split(' ', 1)[-1]), code)
+                for label, code in categories.get(group, {}).items() if code != DEFAULT_CATEGORY
+            ]
+            self._matchers[t_type] = KeywordMatcher(keywords)
+        self._rules: "OrderedDict[str, Dict[str, Dict[str, str]]]" = OrderedDict()
+
+    def categorize(self, transaction_type: str, description: str,
+                   user_id: Optional[str] = None, user_data: Optional[Dict] = None) -> str:
+        """Код категории для описания (DEFAULT_CATEGORY, если ничего не подошло)"""
+        text = normalize(description)
+        if not text:
+            return DEFAULT_CATEGORY
+
+        if user_id is not None and user_data is not None:
+            rules = self._user_rules(user_id, user_data).get(transaction_type, {})
+            for token in tokenize(text):
+                category = rules.get(token)
+                if category is not None:
+                    return category
+
+        matcher = self._matchers.get(transaction_type)
+        category = matcher.best(text) if matcher is not None else None
+        return category or DEFAULT_CATEGORY
+
+    def learn(self, user_id: str, transaction: Dict) -> None:
+        """Запомнить выбор пользователя (если его правила уже в памяти)"""
+        rules = self._rules.get(user_id)
+        if rules is not None:
+            self._add_rule(rules, transaction)
+
+    def _user_rules(self, user_id: str, user_data: Dict) -> Dict[str, Dict[str, str]]:
+        rules = self._rules.get(user_id)
+        if rules is not None:
+            self._rules.move_to_end(user_id)
+            return rules
+
+        rules = {}
+        for transaction in user_data.get('transactions', []):
+            self._add_rule(rules, transaction)
+        self._rules[user_id] = rules
+        if len(self._rules) > self.max_users:
+            self._rules.popitem(last=False)
+        return rules
+
+    @staticmethod
+    def _add_rule(rules: Dict[str, Dict[str, str]], transaction: Dict) -> None:
+        if transaction.get('auto_category') or transaction.get('category') == DEFAULT_CATEGORY:
+            return
+        by_word = rules.setdefault(transaction['type'], {})
+        for token in tokenize(transaction.get('description', '')):
+            # Короткие слова ("в", "на") ничего не говорят о категории
+            if len(token) >= 3:
+                by_word[token] = transaction['category']
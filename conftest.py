@@ -0,0 +1,15 @@
+#!/usr/bin/env python3
+"""
+Общие фикстуры тестов
+"""
+
+import pytest
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """Пустой рабочий каталог приложения: файлы данных создаются в нем"""
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'static').mkdir()
+    (tmp_path / 'templates').mkdir()
+    return tmp_path
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Dispatcher - Параллельная обработка обновлений бота
+Обновления разных пользователей обрабатываются одновременно (не больше
+UPDATE_CONCURRENCY), обновления одного пользователя - строго по очереди,
+в порядке поступления. Поэтому медленный запрос одного пользователя не
+задерживает остальных, а сценарии через context.user_data (например,
+pending_transaction) не перемешиваются
+
+Принятых, но еще не обработанных обновлений не больше UPDATE_MAX_PENDING:
+лимит проверяет очередь обновлений (update_queue()), до того как
+Application создаст задачу на обновление. Места обновлений, которые
+остались в очереди при остановке, освобождаются в shutdown()
+"""
+
+import asyncio
+import logging
+import os
+from collections import deque
+from typing import Any, Awaitable, Dict, Hashable, Optional, Set
+
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+
+logger = logging.getLogger(__name__)
+
+
+class PerUserUpdateProcessor(BaseUpdateProcessor):
+    """Обработчик обновлений для Application.builder().concurrent_updates.
+
+    Application создает задачу на каждое обновление в порядке очереди;
+    задача занимает место в очереди пользователя и ждет, пока закончится
+    обработка его предыдущих обновлений, затем - свободного слота из
+    max_concurrent. Задачи создаются сразу, как только обновление взято
+    из очереди, поэтому число принятых обновлений ограничивает сама
+    очередь из update_queue(): обновление занимает одно из max_pending
+    мест с момента постановки в очередь до конца обработки.
+    """
+
+    def __init__(self, max_concurrent: Optional[int] = None, max_pending: Optional[int] = None):
+        if max_concurrent is None:
+            max_concurrent = int(os.getenv('UPDATE_CONCURRENCY', '16'))
+        if max_pending is None:
+            max_pending = int(os.getenv('UPDATE_MAX_PENDING', '10000'))
+        # Семафор базового класса не ограничивает ничего сверх max_pending
+        super().__init__(max(max_pending, max_concurrent))
+        self.max_concurrent = max_concurrent
+        self.max_pending = max_pending
+        # id принятых в очередь и еще не обработанных обновлений
+        self._admitted: Set[int] = set()
+        self._has_room = asyncio.Event()
+        self._has_room.set()
+        self.rejected = 0
+        self._queue: Optional[AdmissionQueue] = None
+        self._slots = asyncio.Semaphore(max_concurrent)
+        # Ожидающие своей очереди обновления каждого пользователя
+        self._queues: Dict[Hashable, deque] = {}
+        self.pending = 0
+        self.active = 0
+        self.processed = 0
+        self.max_user_depth = 0
+
+    @staticmethod
+    def user_key(update: object) -> Optional[Hashable]:
+        """Чьи это обновления (None - порядок не важен)"""
+        if isinstance(update, Update):
+            if update.effective_user is not None:
+                return update.effective_user.id
+            if update.effective_chat is not None:
+                return ('chat', update.effective_chat.id)
+        return None
+
+    def update_queue(self) -> asyncio.Queue:
+        """Очередь для Application.builder().update_queue с лимитом max_pending"""
+        self._queue = AdmissionQueue(self)
+        return self._queue
+
+    def try_admit(self, update: object) -> bool:
+        """Занять место для обновления (False - лимит исчерпан)"""
+        if len(self._admitted) >= self.max_pending:
+            self._has_room.clear()
+            self.rejected += 1
+            return False
+        self._admitted.add(id(update))
+        return True
+
+    async def admit(self, update: object) -> None:
+        """Дождаться места для обновления"""
+        while len(self._admitted) >= self.max_pending:
+            self._has_room.clear()
+            await self._has_room.wait()
+        self._admitted.add(id(update))
+
+    def _release(self, update: object) -> None:
+        if id(update) in self._admitted:
+            self._admitted.discard(id(update))
+            self._has_room.set()
+
+    async def do_process_update(self, update: object, coroutine: Awaitable[Any]) -> None:
+        # Место освобождается при любом исходе: обработка, ошибка, отмена
+        try:
+            self.pending += 1
+            try:
+                await self._process(update, coroutine)
+            finally:
+                self.pending -= 1
+        finally:
+            self._release(update)
+
+    async def _process(self, update: object, coroutine: Awaitable[Any]) -> None:
+        key = self.user_key(update)
+        if key is not None:
+            await self._wait_turn(key, coroutine)
+        try:
+            async with self._slots:
+                self.active += 1
+                try:
+                    await coroutine
+                finally:
+                    self.active -= 1
+                    self.processed += 1
+        finally:
+            if key is not None:
+                self._next_turn(key)
+
+    async def _wait_turn(self, key: Hashable, coroutine: Awaitable[Any]) -> None:
+        waiters = self._queues.get(key)
+        if waiters is None:
+            # Пользователь свободен - очередь создается пустой, обработка сразу
+            self._queues[key] = deque()
+            return
+
+        turn = asyncio.get_running_loop().create_future()
+        waiters.append(turn)
+        self.max_user_depth = max(self.max_user_depth, len(waiters) + 1)
+        try:
+            await turn
+        except asyncio.CancelledError:
+            if turn.done() and not turn.cancelled():
+                # Очередь уже передана нам - передаем дальше
+                self._next_turn(key)
+            else:
+                waiters.remove(turn)
+            coroutine.close()
+            raise
+
+    def _next_turn(self, key: Hashable) -> None:
+        waiters = self._queues[key]
+        while waiters:
+            turn = waiters.popleft()
+            if not turn.done():
+                turn.set_result(None)
+                return
+        del self._queues[key]
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        """Освободить места обновлений, которые уже не будут обработаны.
+
+        Application.stop() не забирает из очереди обновления, пришедшие
+        после сигнала остановки, а отмененные задачи не доходят до
+        do_process_update - без сброса лимит остался бы занят навсегда.
+        """
+        if self._queue is not None:
+            dropped = 0
+            while not self._queue.empty():
+                if isinstance(self._queue.get_nowait(), Update):
+                    dropped += 1
+            if dropped:
+                logger.warning(f"Не обработано обновлений при остановке: {dropped}")
+        self._admitted.clear()
+        self._has_room.set()
+
+    def stats(self) -> Dict:
+        return {
+            'max_concurrent': self.max_concurrent,
+            'max_pending': self.max_pending,
+            'admitted': len(self._admitted),
+            'rejected': self.rejected,
+            'active': self.active,
+            'pending': self.pending,
+            'users': len(self._queues),
+            'waiting': sum(len(waiters) for waiters in self._queues.values()),
+            'max_user_depth': self.max_user_depth,
+            'processed': self.processed
+        }
+
+
+class AdmissionQueue(asyncio.Queue):
+    """Очередь обновлений, которая принимает не больше, чем ждет обработки.
+
+    Application сразу забирает обновления из очереди, так что ее размер
+    ничего не ограничивает; место занимается у processor и освобождается
+    после обработки. put_nowait (webhook) при нехватке мест бросает
+    QueueFull, put (polling) ждет места - новые обновления остаются у
+    Telegram. Прочие объекты (сигнал остановки Application) проходят без
+    лимита.
+    """
+
+    def __init__(self, processor: PerUserUpdateProcessor):
+        super().__init__()
+        self.processor = processor
+
+    def put_nowait(self, item: object) -> None:
+        if isinstance(item, Update) and not self.processor.try_admit(item):
+            raise asyncio.QueueFull
+        super().put_nowait(item)
+
+    async def put(self, item: object) -> None:
+        if isinstance(item, Update):
+            await self.processor.admit(item)
+        super().put_nowait(item)
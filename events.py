@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Events - Шина событий об изменениях данных пользователей
+Запись публикует событие один раз, подписчики (WebSocket/SSE) получают
+уже сериализованное сообщение. Очередь подписчика ограничена: если
+клиент не успевает читать, старые события отбрасываются и клиенту
+приходит resync - догнать изменения через /api/sync
+"""
+
+import asyncio
+import json
+import logging
+import os
+from collections import deque
+from typing import Dict, List, Optional, Set
+
+from aggregates import ensure_totals
+
+logger = logging.getLogger(__name__)
+
+# Больше транзакций в одном событии не шлем - клиенту проще синхронизироваться
+MAX_EVENT_TRANSACTIONS = 50
+
+
+class Subscription:
+    """Подписка одного соединения на события пользователя"""
+
+    def __init__(self, user_id: str, max_queue: int):
+        self.user_id = user_id
+        self.max_queue = max_queue
+        self._queue: deque = deque()
+        self._ready = asyncio.Event()
+        self.overflowed = False
+        self.dropped = 0
+        self.closed = False
+
+    def push(self, message: str) -> None:
+        """Положить сообщение в очередь (без ожидания)"""
+        if len(self._queue) >= self.max_queue:
+            # Клиент отстал - вместо хвоста событий он получит resync
+            self._queue.clear()
+            self.overflowed = True
+            self.dropped += 1
+        self._queue.append(message)
+        self._ready.set()
+
+    def close(self) -> None:
+        """Соединение закрыто - разбудить ожидающего get"""
+        self.closed = True
+        self._ready.set()
+
+    async def get(self, timeout: float) -> Optional[List[str]]:
+        """Накопленные сообщения или None, если за timeout ничего не пришло"""
+        if not self._queue and not self.closed:
+            self._ready.clear()
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        messages = list(self._queue)
+        self._queue.clear()
+        if self.overflowed:
+            self.overflowed = False
+            messages = [json.dumps({'type': 'resync'})]
+        return messages
+
+
+class EventBus:
+    """Публикация событий подписчикам в пределах процесса"""
+
+    def __init__(self, max_queue: Optional[int] = None, heartbeat: Optional[float] = None):
+        if max_queue is None:
+            max_queue = int(os.getenv('EVENTS_QUEUE_SIZE', '100'))
+        if heartbeat is None:
+            heartbeat = float(os.getenv('EVENTS_HEARTBEAT_SECONDS', '25'))
+        self.max_queue = max_queue
+        self.heartbeat = heartbeat
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+        self.published = 0
+
+    def subscribe(self, user_id: str) -> Subscription:
+        subscription = Subscription(user_id, self.max_queue)
+        self._subscribers.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscribers = self._subscribers.get(subscription.user_id)
+        if subscribers is None:
+            return
+        subscribers.discard(subscription)
+        if subscription.dropped:
+            logger.info(f"Подписчик {subscription.user_id} отставал, переполнений очереди: {subscription.dropped}")
+        if not subscribers:
+            del self._subscribers[subscription.user_id]
+
+    def has_subscribers(self, user_id: str) -> bool:
+        return user_id in self._subscribers
+
+    def publish(self, user_id: str, event: Dict) -> None:
+        """Разослать событие всем подпискам пользователя"""
+        subscribers = self._subscribers.get(user_id)
+        if not subscribers:
+            return
+        message = json.dumps(event, ensure_ascii=False)
+        for subscription in subscribers:
+            subscription.push(message)
+        self.published += 1
+
+    def publish_transactions(self, user_id: str, user_data: Dict, transactions: List[Dict]) -> None:
+        """Новые транзакции и обновленные итоги"""
+        if not self.has_subscribers(user_id):
+            return
+        if len(transactions) > MAX_EVENT_TRANSACTIONS:
+            self.publish(user_id, {'type': 'resync', 'version': user_data.get('version', 0)})
+            return
+        totals = ensure_totals(user_data)
+        delta = {key: value for key, value in totals.items() if key != 'categories'}
+        # Из итогов по категориям - только затронутые
+        delta['categories'] = {}
+        for transaction in transactions:
+            t_type, category = transaction['type'], transaction['category']
+            by_type = totals['categories'].get(t_type, {})
+            if category in by_type:
+                delta['categories'].setdefault(t_type, {})[category] = by_type[category]
+        self.publish(user_id, {
+            'type': 'transactions',
+            'version': user_data.get('version', 0),
+            'transactions': transactions,
+            'totals': delta
+        })
+
+    def stats(self) -> Dict:
+        return {
+            'users': len(self._subscribers),
+            'connections': sum(len(subscribers) for subscribers in self._subscribers.values()),
+            'published': self.published
+        }
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Exporter - Потоковая выгрузка транзакций
+Ответ собирается генератором по EXPORT_CHUNK_ROWS строк, поэтому память
+на запрос не зависит от длины истории
+
+Форматы:
+    csv      - заголовок и строка на транзакцию
+    jsonl    - JSON-объект транзакции на строку
+    columnar - двоичный колоночный формат для аналитики:
+        b'FTCOL1\\n'
+        uint32 (little-endian) - длина заголовка
+        заголовок JSON: count, columns [{name, dtype}], types, categories
+        колонки подряд, по count значений каждая:
+            id <i8 (-1 - без id), timestamp <f8, amount <f8,
+            type |i1 (индекс в types), category <u2 (индекс в categories)
+        Колонку читает, например, numpy.frombuffer(data, dtype, count, offset)
+"""
+
+import csv
+import io
+import json
+import os
+import struct
+import sys
+from array import array
+from typing import Dict, Iterator, List
+
+EXPORT_FORMATS = ('csv', 'jsonl', 'columnar')
+EXPORT_CHUNK_ROWS = int(os.getenv('EXPORT_CHUNK_ROWS', '1000'))
+
+CSV_COLUMNS = ('id', 'date', 'timestamp', 'type', 'category', 'amount', 'description')
+COLUMNAR_MAGIC = b'FTCOL1\n'
+COLUMNAR_TYPES = ('income', 'expense')
+# Колонки: имя, код array и dtype для читателя
+COLUMNAR_COLUMNS = (
+    ('id', 'q', '<i8'),
+    ('timestamp', 'd', '<f8'),
+    ('amount', 'd', '<f8'),
+    ('type', 'b', '|i1'),
+    ('category', 'H', '<u2')
+)
+
+MEDIA_TYPES = {
+    'csv': 'text/csv',
+    'jsonl': 'application/x-ndjson',
+    'columnar': 'application/octet-stream'
+}
+EXTENSIONS = {'csv': 'csv', 'jsonl': 'jsonl', 'columnar': 'ftcol'}
+
+
+def iter_csv(transactions: List[Dict], chunk_rows: int = EXPORT_CHUNK_ROWS) -> Iterator[bytes]:
+    """CSV по chunk_rows строк за раз"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_COLUMNS)
+    for i, transaction in enumerate(transactions, 1):
+        writer.writerow([transaction.get(column, '') for column in CSV_COLUMNS])
+        if i % chunk_rows == 0:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode('utf-8')
+
+
+def iter_jsonl(transactions: List[Dict], chunk_rows: int = EXPORT_CHUNK_ROWS) -> Iterator[bytes]:
+    """JSON Lines по chunk_rows строк за раз"""
+    for start in range(0, len(transactions), chunk_rows):
+        lines = [
+            json.dumps(transaction, ensure_ascii=False)
+            for transaction in transactions[start:start + chunk_rows]
+        ]
+        yield ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+def _column_values(transaction: Dict, name: str, codes: Dict[str, int]):
+    if name == 'id':
+        transaction_id = transaction.get('id')
+        return transaction_id if isinstance(transaction_id, int) else -1
+    if name == 'type':
+        return COLUMNAR_TYPES.index(transaction['type']) if transaction['type'] in COLUMNAR_TYPES else -1
+    if name == 'category':
+        return codes[transaction['category']]
+    return transaction[name]
+
+
+def iter_columnar(transactions: List[Dict], chunk_rows: int = EXPORT_CHUNK_ROWS * 64) -> Iterator[bytes]:
+    """Колоночный двоичный формат: каждая колонка выгружается целиком, по частям"""
+    # Словарь категорий нужен до данных - отдельный проход без копирования
+    codes: Dict[str, int] = {}
+    for transaction in transactions:
+        codes.setdefault(transaction['category'], len(codes))
+
+    header = json.dumps({
+        'count': len(transactions),
+        'columns': [{'name': name, 'dtype': dtype} for name, _, dtype in COLUMNAR_COLUMNS],
+        'types': list(COLUMNAR_TYPES),
+        'categories': list(codes)
+    }, ensure_ascii=False).encode('utf-8')
+    yield COLUMNAR_MAGIC + struct.pack('<I', len(header)) + header
+
+    for name, typecode, _ in COLUMNAR_COLUMNS:
+        for start in range(0, len(transactions), chunk_rows):
+            values = array(typecode, (
+                _column_values(transaction, name, codes)
+                for transaction in transactions[start:start + chunk_rows]
+            ))
+            if sys.byteorder == 'big':
+                values.byteswap()
+            yield values.tobytes()
+
+
+def iter_export(transactions: List[Dict], fmt: str) -> Iterator[bytes]:
+    """Части ответа выгрузки в формате fmt"""
+    if fmt == 'csv':
+        return iter_csv(transactions)
+    if fmt == 'jsonl':
+        return iter_jsonl(transactions)
+    if fmt == 'columnar':
+        return iter_columnar(transactions)
+    raise ValueError(f"Неизвестный формат: {fmt}")
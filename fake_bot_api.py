@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Fake Bot API - Локальная замена api.telegram.org для нагрузочных тестов
+Поддерживает getMe, getUpdates (long polling), setWebhook/deleteWebhook,
+sendMessage, editMessageText и answerCallbackQuery; остальные методы
+отвечают успехом. Бот подключается через BOT_API_BASE_URL:
+    BOT_API_BASE_URL=http://localhost:8081 python integrated_bot.py
+
+Обновления в бота отправляет inject(); ответ бота в чат (сообщение или
+правка) ждет future из expect_reply(). Нагрузку создает loadtest.py
+"""
+
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from webhook import SECRET_HEADER
+
+logger = logging.getLogger(__name__)
+
+BOT_USER = {
+    'id': 1000000001,
+    'is_bot': True,
+    'first_name': 'Fake Finance Bot',
+    'username': 'fake_finance_bot',
+    'can_join_groups': False,
+    'can_read_all_group_messages': False,
+    'supports_inline_queries': False
+}
+
+
+def _parse_value(value: Any) -> Any:
+    """Параметры PTB приходят формой: числа строкой, объекты - JSON"""
+    if not isinstance(value, str):
+        return value
+    try:
+        return json.loads(value)
+    except ValueError:
+        return value
+
+
+class FakeBotAPI:
+    """Состояние поддельного Bot API и приложение FastAPI для него"""
+
+    def __init__(self):
+        self.app = FastAPI(title="Fake Telegram Bot API")
+        self._updates: List[Dict] = []
+        self._has_updates = asyncio.Event()
+        self._replies: Dict[int, deque] = {}
+        self._message_ids: Dict[int, int] = {}
+        self.webhook_url: Optional[str] = None
+        self.webhook_secret: Optional[str] = None
+        self._session = None
+        self.connected = asyncio.Event()
+        self.calls: Dict[str, int] = {}
+        self.setup_routes()
+
+    def setup_routes(self):
+        """Маршрут /bot<token>/<method>"""
+
+        @self.app.post("/bot{token}/{method}")
+        @self.app.get("/bot{token}/{method}")
+        async def bot_method(token: str, method: str, request: Request):
+            if request.headers.get('content-type', '').startswith('application/json'):
+                params = await request.json()
+            else:
+                params = {key: _parse_value(value) for key, value in (await request.form()).items()}
+            self.calls[method] = self.calls.get(method, 0) + 1
+
+            handler = getattr(self, f"api_{method.lower()}", None)
+            result = await handler(params) if handler is not None else True
+            return JSONResponse(content={'ok': True, 'result': result})
+
+    # Методы Bot API
+
+    async def api_getme(self, params: Dict) -> Dict:
+        return BOT_USER
+
+    async def api_getupdates(self, params: Dict) -> List[Dict]:
+        self.connected.set()
+        offset = int(params.get('offset') or 0)
+        if offset:
+            # Все, что до offset, бот уже получил
+            self._updates = [update for update in self._updates if update['update_id'] >= offset]
+        if not self._updates:
+            self._has_updates.clear()
+            try:
+                await asyncio.wait_for(self._has_updates.wait(), float(params.get('timeout') or 0))
+            except asyncio.TimeoutError:
+                return []
+        return self._updates[:int(params.get('limit') or 100)]
+
+    async def api_setwebhook(self, params: Dict) -> bool:
+        self.webhook_url = params.get('url') or None
+        self.webhook_secret = params.get('secret_token') or None
+        if self.webhook_url:
+            self.connected.set()
+        return True
+
+    async def api_deletewebhook(self, params: Dict) -> bool:
+        self.webhook_url = None
+        return True
+
+    async def api_sendmessage(self, params: Dict) -> Dict:
+        chat_id = int(params['chat_id'])
+        message_id = self._message_ids.get(chat_id, 0) + 1
+        self._message_ids[chat_id] = message_id
+        message = self._message(chat_id, message_id, params)
+        self._reply(chat_id, message)
+        return message
+
+    async def api_editmessagetext(self, params: Dict) -> Dict:
+        chat_id = int(params['chat_id'])
+        message = self._message(chat_id, int(params['message_id']), params)
+        self._reply(chat_id, message)
+        return message
+
+    async def api_answercallbackquery(self, params: Dict) -> bool:
+        return True
+
+    # Взаимодействие с тестом
+
+    @staticmethod
+    def _message(chat_id: int, message_id: int, params: Dict) -> Dict:
+        message = {
+            'message_id': message_id,
+            'date': int(time.time()),
+            'chat': {'id': chat_id, 'type': 'private'},
+            'from': BOT_USER,
+            'text': str(params.get('text', ''))
+        }
+        if params.get('reply_markup'):
+            message['reply_markup'] = params['reply_markup']
+        return message
+
+    def _reply(self, chat_id: int, message: Dict) -> None:
+        waiters = self._replies.get(chat_id)
+        while waiters:
+            waiter = waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(message)
+                return
+
+    async def inject(self, update: Dict) -> None:
+        """Передать обновление боту (через webhook, если он задан)"""
+        if self.webhook_url is None:
+            self._updates.append(update)
+            self._has_updates.set()
+            return
+
+        import aiohttp
+
+        if self._session is None:
+            self._session = aiohttp.ClientSession()
+        headers = {SECRET_HEADER: self.webhook_secret} if self.webhook_secret else {}
+        async with self._session.post(self.webhook_url, json=update, headers=headers) as response:
+            if response.status != 200:
+                logger.warning(f"Webhook ответил {response.status}")
+
+    def expect_reply(self, chat_id: int) -> asyncio.Future:
+        """Future со следующим ответом бота в чат (создавать до inject)"""
+        waiter = asyncio.get_running_loop().create_future()
+        self._replies.setdefault(chat_id, deque()).append(waiter)
+        return waiter
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
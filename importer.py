@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Importer - Импорт банковских выписок из CSV и JSON Lines
+Файл читается построчно и обрабатывается пачками по IMPORT_CHUNK_SIZE
+строк, поэтому память не зависит от размера файла; каждая пачка
+добавляется и записывается в хранилище целиком
+
+Запуск из командной строки:
+    python importer.py statement.csv --user 123456789
+    python importer.py export.jsonl --user 123456789 --format jsonl --data-file app_data.json
+"""
+
+import argparse
+import csv
+import json
+import logging
+import os
+import re
+from datetime import datetime
+from itertools import chain
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from dotenv import load_dotenv
+
+from batch import add_batch
+from storage import create_store, new_user_data
+
+logger = logging.getLogger(__name__)
+
+IMPORT_FORMATS = ('csv', 'jsonl')
+IMPORT_CHUNK_SIZE = int(os.getenv('IMPORT_CHUNK_SIZE', '5000'))
+# Сколько ошибок по строкам возвращать в отчете
+MAX_REPORTED_ERRORS = 100
+
+# Названия колонок в выписках разных банков
+COLUMN_ALIASES = {
+    'timestamp': ('timestamp', 'date', 'datetime', 'time', 'дата', 'дата операции', 'время'),
+    'amount': ('amount', 'sum', 'сумма', 'сумма операции'),
+    'type': ('type', 'тип', 'тип операции'),
+    'category': ('category', 'категория'),
+    'description': ('description', 'описание', 'comment', 'комментарий', 'назначение', 'назначение платежа')
+}
+
+DATE_FORMATS = ('%d.%m.%Y %H:%M:%S', '%d.%m.%Y %H:%M', '%d.%m.%Y', '%Y-%m-%d %H:%M:%S', '%Y-%m-%d')
+
+TYPE_ALIASES = {
+    'income': 'income', 'доход': 'income', 'пополнение': 'income', 'зачисление': 'income',
+    'expense': 'expense', 'расход': 'expense', 'списание': 'expense', 'покупка': 'expense'
+}
+
+
+def category_lookup(categories: Dict) -> Dict[str, Dict[str, str]]:
+    """Поиск кода категории по коду, подписи или подписи без эмодзи"""
+    lookup = {}
+    for group, t_type in (('expenses', 'expense'), ('income', 'income')):
+        names = lookup.setdefault(t_type, {})
+        for label, code in categories.get(group, {}).items():
+            names[code.lower()] = code
+            names[label.lower()] = code
+            # "🍔 Еда" -> "еда"
+            names[label.split(' ', 1)[-1].lower()] = code
+    return lookup
+
+
+def parse_amount(value) -> Optional[float]:
+    """Сумма из выписки: "1 234,56", "-500.00", 42"""
+    if isinstance(value, (int, float)):
+        return float(value)
+    if not value:
+        return None
+    text = re.sub(r'\s', '', str(value)).replace(',', '.')
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+
+def parse_timestamp(value):
+    """Время операции: unix-время, ISO 8601 или дд.мм.гггг [чч:мм[:сс]]"""
+    if value is None or value == '':
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    text = str(value).strip()
+    try:
+        return float(text)
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(text).timestamp()
+    except ValueError:
+        pass
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, date_format).timestamp()
+        except ValueError:
+            continue
+    # Неразобранное время отклонит проверка пачки
+    return text
+
+
+def map_row(row: Dict, lookup: Dict[str, Dict[str, str]]) -> Dict:
+    """Строка выписки -> элемент пачки для add_batch.
+
+    Тип берется из колонки type, иначе по знаку суммы (минус - расход);
+    неизвестная категория становится 'other'.
+    """
+    fields = {}
+    for key, value in row.items():
+        if key is None:
+            continue
+        name = key.strip().lower()
+        for field, aliases in COLUMN_ALIASES.items():
+            if name in aliases and field not in fields:
+                fields[field] = value
+
+    amount = parse_amount(fields.get('amount'))
+    t_type = TYPE_ALIASES.get(str(fields.get('type') or '').strip().lower())
+    if t_type is None and amount is not None:
+        t_type = 'expense' if amount < 0 else 'income'
+    if amount is not None:
+        amount = abs(amount)
+
+    category = str(fields.get('category') or '').strip().lower()
+    category = lookup.get(t_type, {}).get(category, 'other')
+
+    return {
+        'type': t_type,
+        'category': category,
+        'amount': amount,
+        'description': fields.get('description') or '',
+        'timestamp': parse_timestamp(fields.get('timestamp'))
+    }
+
+
+def read_rows(lines: Iterable[str], fmt: str) -> Iterator:
+    """Записи файла по одной (строка CSV - словарь по заголовку)"""
+    if fmt == 'csv':
+        lines = iter(lines)
+        header = next(lines, '')
+        # Разделитель определяем по заголовку: банки пишут и ",", и ";"
+        try:
+            dialect = csv.Sniffer().sniff(header, delimiters=',;\t')
+        except csv.Error:
+            dialect = csv.excel
+        yield from csv.DictReader(chain([header], lines), dialect=dialect)
+    elif fmt == 'jsonl':
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                # Такую строку отклонит проверка пачки
+                yield None
+    else:
+        raise ValueError(f"Неизвестный формат: {fmt}")
+
+
+def iter_chunks(lines: Iterable[str], fmt: str, lookup: Dict[str, Dict[str, str]],
+                chunk_size: int = IMPORT_CHUNK_SIZE) -> Iterator[List]:
+    """Элементы пачек для add_batch по chunk_size строк"""
+    chunk = []
+    for row in read_rows(lines, fmt):
+        chunk.append(map_row(row, lookup) if isinstance(row, dict) else row)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class ImportReport:
+    """Итоги импорта: число строк, добавленных, отклоненных и первые ошибки"""
+
+    def __init__(self):
+        self.rows = 0
+        self.imported = 0
+        self.rejected = 0
+        self.errors: List[Dict] = []
+
+    def add(self, results: List[Dict]) -> None:
+        """Учесть результаты очередной пачки"""
+        for result in results:
+            if result['success']:
+                self.imported += 1
+                continue
+            self.rejected += 1
+            if len(self.errors) < MAX_REPORTED_ERRORS:
+                # Номер строки данных в файле, начиная с 1
+                self.errors.append({'row': self.rows + result['index'] + 1, 'error': result['error']})
+        self.rows += len(results)
+
+    def to_dict(self) -> Dict:
+        return {
+            'rows': self.rows,
+            'imported': self.imported,
+            'rejected': self.rejected,
+            'errors': self.errors
+        }
+
+
+def import_file(store, user_id: str, path: str, fmt: str, categories: Dict,
+                chunk_size: int = IMPORT_CHUNK_SIZE) -> ImportReport:
+    """Импорт файла напрямую в хранилище (приложение при этом должно быть остановлено)"""
+    user_data = store.load().get(user_id) or store.load_user(user_id) or new_user_data()
+    lookup = category_lookup(categories)
+    report = ImportReport()
+
+    with open(path, encoding='utf-8-sig', newline='') as f:
+        for items in iter_chunks(f, fmt, lookup, chunk_size):
+            transactions, results = add_batch(user_data, items)
+            if transactions:
+                store.append_many([(user_id, 'transaction', t) for t in transactions])
+            report.add(results)
+            logger.info(f"Импорт {path}: обработано {report.rows} строк, добавлено {report.imported}")
+    return report
+
+
+def main():
+    """Импорт выписки из командной строки"""
+    from categories import CATEGORIES
+
+    load_dotenv()
+    logging.basicConfig(
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        level=logging.INFO
+    )
+
+    parser = argparse.ArgumentParser(description="Импорт банковской выписки в финансовый трекер")
+    parser.add_argument('path', help="Файл CSV или JSON Lines")
+    parser.add_argument('--user', required=True, help="ID пользователя")
+    parser.add_argument('--format', choices=IMPORT_FORMATS,
+                        help="Формат файла (по умолчанию - по расширению)")
+    parser.add_argument('--data-file', default='telegram_app_data.json', help="Файл данных приложения")
+    parser.add_argument('--chunk-size', type=int, default=IMPORT_CHUNK_SIZE, help="Строк в одной пачке")
+    args = parser.parse_args()
+
+    fmt = args.format or ('jsonl' if args.path.endswith(('.jsonl', '.ndjson')) else 'csv')
+    store = create_store(args.data_file)
+    try:
+        report = import_file(store, args.user, args.path, fmt, CATEGORIES, args.chunk_size)
+    finally:
+        store.close()
+
+    print(json.dumps(report.to_dict(), ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,598 +1,688 @@
-#!/usr/bin/env python3
-"""
-Интегрированный Telegram Bot с поддержкой Telegram App
-Объединяет функционал бота и веб-приложения
-"""
-
-import asyncio
-import json
-import logging
-import os
-from datetime import datetime
-from typing import Dict, List, Optional
-from dotenv import load_dotenv
-
-from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup, WebAppInfo
-from telegram.ext import Application, CommandHandler, MessageHandler, CallbackQueryHandler, ContextTypes, filters
-from telegram.constants import ParseMode
-
-# Загружаем переменные окружения
-load_dotenv()
-
-# Настройка логирования
-logging.basicConfig(
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    level=logging.INFO
-)
-logger = logging.getLogger(__name__)
-
-class IntegratedFinanceBot:
-    def __init__(self):
-        self.bot_token = os.getenv('BOT_TOKEN')
-        self.webapp_url = os.getenv('WEBAPP_URL', 'http://localhost:3000')
-        self.data_file = "integrated_bot_data.json"
-        self.categories = {
-            'expenses': {
-                '🍔 Еда': 'food',
-                '🚗 Транспорт': 'transport',
-                '🏠 Жилье': 'housing',
-                '👕 Одежда': 'clothing',
-                '💊 Здоровье': 'health',
-                '🎮 Развлечения': 'entertainment',
-                '📚 Образование': 'education',
-                '💳 Кредиты': 'loans',
-                '📱 Технологии': 'technology',
-                '🏦 Налоги': 'taxes',
-                '🎁 Подарки': 'gifts',
-                '✈️ Путешествия': 'travel',
-                '💼 Бизнес': 'business',
-                '🔧 Услуги': 'services',
-                '📦 Покупки': 'shopping',
-                '💰 Другое': 'other'
-            },
-            'income': {
-                '💼 Зарплата': 'salary',
-                '🏢 Бизнес': 'business',
-                '📈 Инвестиции': 'investments',
-                '🎁 Подарки': 'gifts',
-                '🏠 Аренда': 'rental',
-                '💻 Фриланс': 'freelance',
-                '🎯 Премии': 'bonuses',
-                '💰 Другое': 'other'
-            }
-        }
-        
-        self.load_data()
-        self.setup_handlers()
-    
-    def load_data(self):
-        """Загрузка данных из файла"""
-        if os.path.exists(self.data_file):
-            try:
-                with open(self.data_file, 'r', encoding='utf-8') as f:
-                    self.data = json.load(f)
-            except:
-                self.data = {}
-        else:
-            self.data = {}
-    
-    def save_data(self):
-        """Сохранение данных в файл"""
-        with open(self.data_file, 'w', encoding='utf-8') as f:
-            json.dump(self.data, f, ensure_ascii=False, indent=2)
-    
-    def get_user_data(self, user_id: int) -> Dict:
-        """Получить данные пользователя"""
-        user_id_str = str(user_id)
-        if user_id_str not in self.data:
-            self.data[user_id_str] = {
-                'transactions': [],
-                'budgets': {},
-                'goals': [],
-                'currency': 'RUB',
-                'settings': {
-                    'theme': 'light',
-                    'notifications': True,
-                    'language': 'ru'
-                }
-            }
-        return self.data[user_id_str]
-    
-    def setup_handlers(self):
-        """Настройка обработчиков команд"""
-        self.application = Application.builder().token(self.bot_token).build()
-        
-        # Команды
-        self.application.add_handler(CommandHandler("start", self.start_command))
-        self.application.add_handler(CommandHandler("help", self.help_command))
-        self.application.add_handler(CommandHandler("finance", self.finance_command))
-        self.application.add_handler(CommandHandler("app", self.app_command))
-        self.application.add_handler(CommandHandler("stats", self.stats_command))
-        self.application.add_handler(CommandHandler("balance", self.balance_command))
-        
-        # Обработка callback запросов
-        self.application.add_handler(CallbackQueryHandler(self.handle_callback))
-        
-        # Обработка сообщений
-        self.application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, self.handle_message))
-        
-        # Обработка WebApp данных
-        self.application.add_handler(MessageHandler(filters.StatusUpdate.WEB_APP_DATA, self.handle_webapp_data))
-    
-    async def start_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        """Обработка команды /start"""
-        user = update.effective_user
-        welcome_text = f"""
-🎉 Привет, {user.first_name}!
-
-Я ваш персональный финансовый помощник! 💰
-
-📱 **Доступные функции:**
-• /app - Открыть веб-приложение
-• /finance - Быстрый учет финансов
-• /stats - Статистика
-• /balance - Текущий баланс
-• /help - Помощь
-
-Выберите действие:
-        """
-        
-        keyboard = [
-            [
-                InlineKeyboardButton("📱 Открыть приложение", web_app=WebAppInfo(url=self.webapp_url)),
-                InlineKeyboardButton("💰 Финансы", callback_data="finance_menu")
-            ],
-            [
-                InlineKeyboardButton("📊 Статистика", callback_data="show_stats"),
-                InlineKeyboardButton("⚙️ Настройки", callback_data="settings")
-            ]
-        ]
-        
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        
-        await update.message.reply_text(
-            welcome_text,
-            reply_markup=reply_markup,
-            parse_mode=ParseMode.MARKDOWN
-        )
-    
-    async def help_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        """Обработка команды /help"""
-        help_text = """
-📖 **Справка по командам:**
-
-🔹 **Основные команды:**
-• /start - Главное меню
-• /app - Открыть веб-приложение
-• /finance - Быстрый учет финансов
-• /stats - Показать статистику
-• /balance - Текущий баланс
-
-🔹 **Быстрые действия:**
-• Напишите сумму с + для дохода: `+5000`
-• Напишите сумму с - для расхода: `-1500`
-• Добавьте описание: `+5000 зарплата`
-
-🔹 **Примеры:**
-• `+50000` - добавить доход 50000₽
-• `-1500 еда` - добавить расход 1500₽ на еду
-• `+100000 зарплата` - доход 100000₽ с описанием
-
-💡 **Совет:** Используйте веб-приложение для более удобной работы!
-        """
-        
-        keyboard = [
-            [InlineKeyboardButton("📱 Открыть приложение", web_app=WebAppInfo(url=self.webapp_url))],
-            [InlineKeyboardButton("🔙 Назад", callback_data="main_menu")]
-        ]
-        
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        
-        await update.message.reply_text(
-            help_text,
-            reply_markup=reply_markup,
-            parse_mode=ParseMode.MARKDOWN
-        )
-    
-    async def app_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        """Обработка команды /app - открытие веб-приложения"""
-        keyboard = [
-            [InlineKeyboardButton("📱 Открыть Finance Tracker", web_app=WebAppInfo(url=self.webapp_url))],
-            [InlineKeyboardButton("🔙 Назад", callback_data="main_menu")]
-        ]
-        
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        
-        await update.message.reply_text(
-            "🚀 **Finance Tracker App**\n\n"
-            "Откройте полноценное веб-приложение для управления финансами:\n"
-            "• 📊 Дашборд со статистикой\n"
-            "• 💰 Управление транзакциями\n"
-            "• 🎯 Финансовые цели\n"
-            "• ⚙️ Настройки и персонализация\n\n"
-            "Нажмите кнопку ниже, чтобы открыть приложение:",
-            reply_markup=reply_markup,
-            parse_mode=ParseMode.MARKDOWN
-        )
-    
-    async def finance_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        """Обработка команды /finance"""
-        await self.show_finance_menu(update, context)
-    
-    async def stats_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        """Обработка команды /stats"""
-        await self.show_statistics(update, context)
-    
-    async def balance_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        """Обработка команды /balance"""
-        await self.show_balance(update, context)
-    
-    async def show_finance_menu(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        """Показать меню финансов"""
-        keyboard = [
-            [
-                InlineKeyboardButton("➕ Доход", callback_data="add_income"),
-                InlineKeyboardButton("➖ Расход", callback_data="add_expense")
-            ],
-            [
-                InlineKeyboardButton("📊 Статистика", callback_data="show_stats"),
-                InlineKeyboardButton("📋 История", callback_data="show_history")
-            ],
-            [
-                InlineKeyboardButton("📱 Веб-приложение", web_app=WebAppInfo(url=self.webapp_url))
-            ],
-            [
-                InlineKeyboardButton("🔙 Назад", callback_data="main_menu")
-            ]
-        ]
-        
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        
-        text = "💰 **Управление финансами**\n\nВыберите действие:"
-        
-        if update.callback_query:
-            await update.callback_query.edit_message_text(
-                text,
-                reply_markup=reply_markup,
-                parse_mode=ParseMode.MARKDOWN
-            )
-        else:
-            await update.message.reply_text(
-                text,
-                reply_markup=reply_markup,
-                parse_mode=ParseMode.MARKDOWN
-            )
-    
-    async def show_statistics(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        """Показать статистику"""
-        user_id = update.effective_user.id
-        user_data = self.get_user_data(user_id)
-        
-        # Расчет статистики
-        transactions = user_data.get('transactions', [])
-        total_income = sum(t['amount'] for t in transactions if t['type'] == 'income')
-        total_expenses = sum(t['amount'] for t in transactions if t['type'] == 'expense')
-        balance = total_income - total_expenses
-        
-        # Топ категорий расходов
-        expense_categories = {}
-        for t in transactions:
-            if t['type'] == 'expense':
-                cat = t['category']
-                expense_categories[cat] = expense_categories.get(cat, 0) + t['amount']
-        
-        top_expenses = sorted(expense_categories.items(), key=lambda x: x[1], reverse=True)[:3]
-        
-        stats_text = f"""
-📊 **Статистика финансов**
-
-💰 **Общий баланс:** {balance:,.0f}₽
-📈 **Доходы:** {total_income:,.0f}₽
-📉 **Расходы:** {total_expenses:,.0f}₽
-
-📋 **Всего транзакций:** {len(transactions)}
-
-🔝 **Топ расходов:**
-"""
-        
-        for i, (category, amount) in enumerate(top_expenses, 1):
-            category_name = self.get_category_name(category, 'expenses')
-            stats_text += f"{i}. {category_name}: {amount:,.0f}₽\n"
-        
-        if not top_expenses:
-            stats_text += "Нет данных о расходах\n"
-        
-        keyboard = [
-            [InlineKeyboardButton("📱 Подробная статистика", web_app=WebAppInfo(url=self.webapp_url))],
-            [InlineKeyboardButton("🔙 Назад", callback_data="finance_menu")]
-        ]
-        
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        
-        if update.callback_query:
-            await update.callback_query.edit_message_text(
-                stats_text,
-                reply_markup=reply_markup,
-                parse_mode=ParseMode.MARKDOWN
-            )
-        else:
-            await update.message.reply_text(
-                stats_text,
-                reply_markup=reply_markup,
-                parse_mode=ParseMode.MARKDOWN
-            )
-    
-    async def show_balance(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        """Показать текущий баланс"""
-        user_id = update.effective_user.id
-        user_data = self.get_user_data(user_id)
-        
-        transactions = user_data.get('transactions', [])
-        total_income = sum(t['amount'] for t in transactions if t['type'] == 'income')
-        total_expenses = sum(t['amount'] for t in transactions if t['type'] == 'expense')
-        balance = total_income - total_expenses
-        
-        balance_text = f"""
-💰 **Текущий баланс**
-
-💵 **Баланс:** {balance:,.0f}₽
-📈 **Доходы:** {total_income:,.0f}₽
-📉 **Расходы:** {total_expenses:,.0f}₽
-
-{'🎉 Отличная работа!' if balance > 0 else '⚠️ Внимание к расходам!' if balance < 0 else '⚖️ Баланс сбалансирован!'}
-        """
-        
-        keyboard = [
-            [InlineKeyboardButton("📱 Детальная аналитика", web_app=WebAppInfo(url=self.webapp_url))],
-            [InlineKeyboardButton("🔙 Назад", callback_data="main_menu")]
-        ]
-        
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        
-        await update.message.reply_text(
-            balance_text,
-            reply_markup=reply_markup,
-            parse_mode=ParseMode.MARKDOWN
-        )
-    
-    async def handle_callback(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        """Обработка callback запросов"""
-        query = update.callback_query
-        await query.answer()
-        
-        if query.data == "main_menu":
-            await self.start_command(update, context)
-        elif query.data == "finance_menu":
-            await self.show_finance_menu(update, context)
-        elif query.data == "show_stats":
-            await self.show_statistics(update, context)
-        elif query.data == "add_income":
-            await self.show_category_selection(update, context, "income")
-        elif query.data == "add_expense":
-            await self.show_category_selection(update, context, "expense")
-        elif query.data.startswith("category_"):
-            parts = query.data.split("_")
-            if len(parts) >= 3:
-                transaction_type = parts[1]
-                category = parts[2]
-                await self.request_amount(update, context, transaction_type, category)
-        elif query.data == "settings":
-            await self.show_settings(update, context)
-    
-    async def show_category_selection(self, update: Update, context: ContextTypes.DEFAULT_TYPE, transaction_type: str):
-        """Показать выбор категории"""
-        categories = self.categories[transaction_type]
-        
-        keyboard = []
-        row = []
-        for name, code in categories.items():
-            row.append(InlineKeyboardButton(name, callback_data=f"category_{transaction_type}_{code}"))
-            if len(row) == 2:
-                keyboard.append(row)
-                row = []
-        
-        if row:
-            keyboard.append(row)
-        
-        keyboard.append([InlineKeyboardButton("🔙 Назад", callback_data="finance_menu")])
-        
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        
-        type_text = "доход" if transaction_type == "income" else "расход"
-        
-        await update.callback_query.edit_message_text(
-            f"Выберите категорию для {type_text}:",
-            reply_markup=reply_markup
-        )
-    
-    async def request_amount(self, update: Update, context: ContextTypes.DEFAULT_TYPE, transaction_type: str, category: str):
-        """Запросить сумму транзакции"""
-        context.user_data['pending_transaction'] = {
-            'type': transaction_type,
-            'category': category
-        }
-        
-        type_text = "дохода" if transaction_type == "income" else "расхода"
-        category_name = self.get_category_name(category, transaction_type)
-        
-        await update.callback_query.edit_message_text(
-            f"💰 Введите сумму {type_text} для категории '{category_name}':\n\n"
-            f"Примеры:\n"
-            f"• 5000\n"
-            f"• 5000 зарплата\n"
-            f"• 1500.50 обед",
-            reply_markup=InlineKeyboardMarkup([[
-                InlineKeyboardButton("🔙 Отмена", callback_data="finance_menu")
-            ]])
-        )
-    
-    async def handle_message(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        """Обработка текстовых сообщений"""
-        text = update.message.text.strip()
-        user_id = update.effective_user.id
-        
-        # Проверяем, есть ли ожидающая транзакция
-        if 'pending_transaction' in context.user_data:
-            await self.process_transaction_input(update, context, text)
-            return
-        
-        # Быстрый ввод транзакций
-        if text.startswith('+') or text.startswith('-'):
-            await self.process_quick_transaction(update, context, text)
-            return
-        
-        # Обычные сообщения
-        await update.message.reply_text(
-            "💡 Используйте команды:\n"
-            "• /start - главное меню\n"
-            "• /app - открыть приложение\n"
-            "• /finance - управление финансами\n"
-            "• /help - справка\n\n"
-            "Или введите сумму с + или - для быстрого добавления транзакции!"
-        )
-    
-    async def process_transaction_input(self, update: Update, context: ContextTypes.DEFAULT_TYPE, text: str):
-        """Обработка ввода транзакции"""
-        try:
-            parts = text.split(' ', 1)
-            amount = float(parts[0])
-            description = parts[1] if len(parts) > 1 else ""
-            
-            if amount <= 0:
-                await update.message.reply_text("❌ Сумма должна быть больше 0!")
-                return
-            
-            pending = context.user_data['pending_transaction']
-            user_id = update.effective_user.id
-            user_data = self.get_user_data(user_id)
-            
-            transaction = {
-                'id': len(user_data['transactions']) + 1,
-                'type': pending['type'],
-                'category': pending['category'],
-                'amount': amount,
-                'description': description,
-                'date': datetime.now().isoformat(),
-                'timestamp': datetime.now().timestamp()
-            }
-            
-            user_data['transactions'].append(transaction)
-            self.save_data()
-            
-            type_text = "доход" if pending['type'] == 'income' else "расход"
-            category_name = self.get_category_name(pending['category'], pending['type'])
-            
-            await update.message.reply_text(
-                f"✅ {type_text.title()} добавлен!\n\n"
-                f"💰 Сумма: {amount:,.0f}₽\n"
-                f"📂 Категория: {category_name}\n"
-                f"📝 Описание: {description or 'Не указано'}\n\n"
-                f"Используйте /stats для просмотра статистики!"
-            )
-            
-            del context.user_data['pending_transaction']
-            
-        except ValueError:
-            await update.message.reply_text("❌ Неверный формат суммы! Введите число.")
-        except Exception as e:
-            await update.message.reply_text("❌ Ошибка при добавлении транзакции!")
-            logger.error(f"Ошибка добавления транзакции: {e}")
-    
-    async def process_quick_transaction(self, update: Update, context: ContextTypes.DEFAULT_TYPE, text: str):
-        """Обработка быстрой транзакции"""
-        try:
-            parts = text.split(' ', 1)
-            amount_str = parts[0][1:]  # Убираем + или -
-            amount = float(amount_str)
-            description = parts[1] if len(parts) > 1 else ""
-            
-            if amount <= 0:
-                await update.message.reply_text("❌ Сумма должна быть больше 0!")
-                return
-            
-            transaction_type = 'income' if text.startswith('+') else 'expense'
-            category = 'other'  # По умолчанию
-            
-            user_id = update.effective_user.id
-            user_data = self.get_user_data(user_id)
-            
-            transaction = {
-                'id': len(user_data['transactions']) + 1,
-                'type': transaction_type,
-                'category': category,
-                'amount': amount,
-                'description': description,
-                'date': datetime.now().isoformat(),
-                'timestamp': datetime.now().timestamp()
-            }
-            
-            user_data['transactions'].append(transaction)
-            self.save_data()
-            
-            type_text = "доход" if transaction_type == 'income' else "расход"
-            
-            await update.message.reply_text(
-                f"✅ {type_text.title()} добавлен!\n\n"
-                f"💰 Сумма: {amount:,.0f}₽\n"
-                f"📝 Описание: {description or 'Не указано'}\n\n"
-                f"💡 Для более детального учета используйте /finance или /app!"
-            )
-            
-        except ValueError:
-            await update.message.reply_text("❌ Неверный формат суммы! Пример: +5000 или -1500")
-        except Exception as e:
-            await update.message.reply_text("❌ Ошибка при добавлении транзакции!")
-            logger.error(f"Ошибка быстрой транзакции: {e}")
-    
-    async def handle_webapp_data(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        """Обработка данных из WebApp"""
-        try:
-            data = update.message.web_app_data.data
-            # Здесь можно обработать данные, отправленные из WebApp
-            await update.message.reply_text(
-                "✅ Данные получены из приложения!\n"
-                "Используйте /stats для просмотра обновленной статистики."
-            )
-        except Exception as e:
-            logger.error(f"Ошибка обработки WebApp данных: {e}")
-    
-    async def show_settings(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        """Показать настройки"""
-        keyboard = [
-            [InlineKeyboardButton("📱 Открыть приложение", web_app=WebAppInfo(url=self.webapp_url))],
-            [InlineKeyboardButton("🔙 Назад", callback_data="main_menu")]
-        ]
-        
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        
-        await update.callback_query.edit_message_text(
-            "⚙️ **Настройки**\n\n"
-            "Для изменения настроек используйте веб-приложение:\n"
-            "• 💱 Валюта\n"
-            "• 🎨 Тема оформления\n"
-            "• 🔔 Уведомления\n"
-            "• 🌍 Язык",
-            reply_markup=reply_markup,
-            parse_mode=ParseMode.MARKDOWN
-        )
-    
-    def get_category_name(self, category_code: str, transaction_type: str) -> str:
-        """Получить название категории по коду"""
-        categories = self.categories[transaction_type]
-        for name, code in categories.items():
-            if code == category_code:
-                return name
-        return category_code
-    
-    async def run(self):
-        """Запуск бота"""
-        logger.info("🚀 Запуск интегрированного Finance Bot")
-        await self.application.run_polling()
-
-def main():
-    """Главная функция"""
-    bot = IntegratedFinanceBot()
-    asyncio.run(bot.run())
-
-if __name__ == "__main__":
-    main()
+#!/usr/bin/env python3
+"""
+Интегрированный Telegram Bot с поддержкой Telegram App
+Объединяет функционал бота и веб-приложения
+"""
+
+import asyncio
+import json
+import logging
+import math
+import os
+from datetime import datetime
+from typing import Dict, List, Optional
+from dotenv import load_dotenv
+
+from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup, WebAppInfo
+from telegram.ext import Application, CommandHandler, MessageHandler, CallbackQueryHandler, ContextTypes, filters
+from telegram.constants import ParseMode
+
+from storage import create_store, new_user_data
+from persistence import AsyncStorage, CoalescingWriter
+from user_cache import create_user_cache
+from aggregates import append_transaction, new_transaction_id, totals_statistics
+from search import SearchEngine
+from categories import CATEGORIES, registry as category_registry
+from keyboards import category_keyboard
+from categorizer import Categorizer
+from dispatcher import PerUserUpdateProcessor
+from outbox import SendScheduler
+
+# Загружаем переменные окружения
+load_dotenv()
+
+# Настройка логирования
+logging.basicConfig(
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    level=logging.INFO
+)
+logger = logging.getLogger(__name__)
+
+class IntegratedFinanceBot:
+    def __init__(self, app=None):
+        """app - приложение (TelegramFinanceApp), с которым бот делит
+        хранилище и кеш пользователей в режиме webhook"""
+        self.bot_token = os.getenv('BOT_TOKEN')
+        self.webapp_url = os.getenv('WEBAPP_URL', 'http://localhost:3000')
+        # Адрес Bot API (для тестов - fake_bot_api.py)
+        self.api_base_url = os.getenv('BOT_API_BASE_URL', 'https://api.telegram.org').rstrip('/')
+        self.data_file = "integrated_bot_data.json"
+        self.categories = CATEGORIES
+        self.category_registry = category_registry
+        self.keyboards = self.build_keyboards()
+        
+        self.shared = app is not None
+        if self.shared:
+            # Записи бота сразу видны приложению и его подписчикам /ws
+            self.store = app.store
+            self.storage = app.storage
+            self.writer = app.writer
+            self.data = app.data
+            self.events = getattr(app, 'events', None)
+            # Правила категорий и поиск общие: выученное в боте видно в /api/categorize
+            self.categorizer = app.categorizer
+            self.search = app.search
+        else:
+            self.store = create_store(self.data_file)
+            self.storage = AsyncStorage(self.store)
+            self.writer = CoalescingWriter(self.storage)
+            self.events = None
+            self.categorizer = Categorizer(self.categories)
+            self.search = SearchEngine()
+        if not self.shared:
+            self.load_data()
+        self.setup_handlers()
+    
+    def load_data(self):
+        """Загрузка данных в кеш пользователей"""
+        self.data = create_user_cache(
+            self.store.lazy_loading,
+            is_dirty=self.writer.is_pending,
+            writeback=self.writer.request_flush
+        )
+        self.data.update(self.store.load())
+    
+    def get_user_data(self, user_id: int) -> Dict:
+        """Получить данные пользователя"""
+        user_id_str = str(user_id)
+        user_data = self.data.get(user_id_str)
+        if user_data is None:
+            user_data = self.store.load_user(user_id_str) or new_user_data()
+            self.data[user_id_str] = user_data
+        return user_data
+    
+    async def fetch_user_data(self, user_id: int) -> Dict:
+        """Получить данные пользователя, не блокируя event loop при загрузке"""
+        user_id_str = str(user_id)
+        user_data = self.data.get(user_id_str)
+        if user_data is None:
+            async with self.storage.lock(user_id_str):
+                user_data = self.data.peek(user_id_str)
+                if user_data is None:
+                    user_data = await self.storage.load_user(user_id_str) or new_user_data()
+                    self.data[user_id_str] = user_data
+        return user_data
+    
+    def setup_handlers(self):
+        """Настройка обработчиков команд"""
+        # Разные пользователи - параллельно, один пользователь - по порядку
+        self.dispatcher = PerUserUpdateProcessor()
+        # Все отправки - с учетом лимитов Telegram
+        self.send_scheduler = SendScheduler()
+        self.application = (
+            Application.builder()
+            .token(self.bot_token)
+            .base_url(f"{self.api_base_url}/bot")
+            .base_file_url(f"{self.api_base_url}/file/bot")
+            .update_queue(self.dispatcher.update_queue())
+            .concurrent_updates(self.dispatcher)
+            .rate_limiter(self.send_scheduler)
+            .build()
+        )
+        
+        # Команды
+        self.application.add_handler(CommandHandler("start", self.start_command))
+        self.application.add_handler(CommandHandler("help", self.help_command))
+        self.application.add_handler(CommandHandler("finance", self.finance_command))
+        self.application.add_handler(CommandHandler("app", self.app_command))
+        self.application.add_handler(CommandHandler("stats", self.stats_command))
+        self.application.add_handler(CommandHandler("balance", self.balance_command))
+        self.application.add_handler(CommandHandler("search", self.search_command))
+        
+        # Обработка callback запросов
+        self.application.add_handler(CallbackQueryHandler(self.handle_callback))
+        
+        # Обработка сообщений
+        self.application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, self.handle_message))
+        
+        # Обработка WebApp данных
+        self.application.add_handler(MessageHandler(filters.StatusUpdate.WEB_APP_DATA, self.handle_webapp_data))
+    
+    def build_keyboards(self) -> Dict[str, InlineKeyboardMarkup]:
+        """Неизменяемые меню бота - собираются один раз при запуске"""
+        return {
+            'main': InlineKeyboardMarkup([
+                [
+                    InlineKeyboardButton("📱 Открыть приложение", web_app=WebAppInfo(url=self.webapp_url)),
+                    InlineKeyboardButton("💰 Финансы", callback_data="finance_menu")
+                ],
+                [
+                    InlineKeyboardButton("📊 Статистика", callback_data="show_stats"),
+                    InlineKeyboardButton("⚙️ Настройки", callback_data="settings")
+                ]
+            ]),
+            'help': InlineKeyboardMarkup([
+                [InlineKeyboardButton("📱 Открыть приложение", web_app=WebAppInfo(url=self.webapp_url))],
+                [InlineKeyboardButton("🔙 Назад", callback_data="main_menu")]
+            ]),
+            'app': InlineKeyboardMarkup([
+                [InlineKeyboardButton("📱 Открыть Finance Tracker", web_app=WebAppInfo(url=self.webapp_url))],
+                [InlineKeyboardButton("🔙 Назад", callback_data="main_menu")]
+            ]),
+            'finance': InlineKeyboardMarkup([
+                [
+                    InlineKeyboardButton("➕ Доход", callback_data="add_income"),
+                    InlineKeyboardButton("➖ Расход", callback_data="add_expense")
+                ],
+                [
+                    InlineKeyboardButton("📊 Статистика", callback_data="show_stats"),
+                    InlineKeyboardButton("📋 История", callback_data="show_history")
+                ],
+                [
+                    InlineKeyboardButton("📱 Веб-приложение", web_app=WebAppInfo(url=self.webapp_url))
+                ],
+                [
+                    InlineKeyboardButton("🔙 Назад", callback_data="main_menu")
+                ]
+            ]),
+            'stats': InlineKeyboardMarkup([
+                [InlineKeyboardButton("📱 Подробная статистика", web_app=WebAppInfo(url=self.webapp_url))],
+                [InlineKeyboardButton("🔙 Назад", callback_data="finance_menu")]
+            ]),
+            'balance': InlineKeyboardMarkup([
+                [InlineKeyboardButton("📱 Детальная аналитика", web_app=WebAppInfo(url=self.webapp_url))],
+                [InlineKeyboardButton("🔙 Назад", callback_data="main_menu")]
+            ]),
+            'settings': InlineKeyboardMarkup([
+                [InlineKeyboardButton("📱 Открыть приложение", web_app=WebAppInfo(url=self.webapp_url))],
+                [InlineKeyboardButton("🔙 Назад", callback_data="main_menu")]
+            ]),
+            'cancel': InlineKeyboardMarkup([[
+                InlineKeyboardButton("🔙 Отмена", callback_data="finance_menu")
+            ]])
+        }
+    
+    async def start_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Обработка команды /start"""
+        user = update.effective_user
+        welcome_text = f"""
+🎉 Привет, {user.first_name}!
+
+Я ваш персональный финансовый помощник! 💰
+
+📱 **Доступные функции:**
+• /app - Открыть веб-приложение
+• /finance - Быстрый учет финансов
+• /stats - Статистика
+• /balance - Текущий баланс
+• /help - Помощь
+
+Выберите действие:
+        """
+        
+        reply_markup = self.keyboards['main']
+        
+        await update.message.reply_text(
+            welcome_text,
+            reply_markup=reply_markup,
+            parse_mode=ParseMode.MARKDOWN
+        )
+    
+    async def help_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Обработка команды /help"""
+        help_text = """
+📖 **Справка по командам:**
+
+🔹 **Основные команды:**
+• /start - Главное меню
+• /app - Открыть веб-приложение
+• /finance - Быстрый учет финансов
+• /stats - Показать статистику
+• /balance - Текущий баланс
+• /search слово - Поиск по описаниям
+
+🔹 **Быстрые действия:**
+• Напишите сумму с + для дохода: `+5000`
+• Напишите сумму с - для расхода: `-1500`
+• Добавьте описание: `+5000 зарплата`
+
+🔹 **Примеры:**
+• `+50000` - добавить доход 50000₽
+• `-1500 еда` - добавить расход 1500₽ на еду
+• `+100000 зарплата` - доход 100000₽ с описанием
+
+💡 **Совет:** Используйте веб-приложение для более удобной работы!
+        """
+        
+        reply_markup = self.keyboards['help']
+        
+        await update.message.reply_text(
+            help_text,
+            reply_markup=reply_markup,
+            parse_mode=ParseMode.MARKDOWN
+        )
+    
+    async def app_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Обработка команды /app - открытие веб-приложения"""
+        reply_markup = self.keyboards['app']
+        
+        await update.message.reply_text(
+            "🚀 **Finance Tracker App**\n\n"
+            "Откройте полноценное веб-приложение для управления финансами:\n"
+            "• 📊 Дашборд со статистикой\n"
+            "• 💰 Управление транзакциями\n"
+            "• 🎯 Финансовые цели\n"
+            "• ⚙️ Настройки и персонализация\n\n"
+            "Нажмите кнопку ниже, чтобы открыть приложение:",
+            reply_markup=reply_markup,
+            parse_mode=ParseMode.MARKDOWN
+        )
+    
+    async def finance_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Обработка команды /finance"""
+        await self.show_finance_menu(update, context)
+    
+    async def stats_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Обработка команды /stats"""
+        await self.show_statistics(update, context)
+    
+    async def balance_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Обработка команды /balance"""
+        await self.show_balance(update, context)
+    
+    async def search_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Обработка команды /search"""
+        query = ' '.join(context.args or [])
+        if not query:
+            await update.message.reply_text(
+                "🔍 Укажите, что искать в описаниях транзакций.\n\n"
+                "Примеры:\n"
+                "• /search обед\n"
+                "• /search такси"
+            )
+            return
+        await self.show_search_results(update, context, query)
+    
+    async def show_search_results(self, update: Update, context: ContextTypes.DEFAULT_TYPE,
+                                  query: str, cursor: Optional[str] = None):
+        """Показать страницу результатов поиска"""
+        user_id = update.effective_user.id
+        user_data = await self.fetch_user_data(user_id)
+        
+        transactions, next_cursor, total = self.search.search(
+            str(user_id), user_data, query, limit=10, cursor=cursor
+        )
+        
+        if not transactions:
+            await update.effective_message.reply_text(f"🔍 По запросу «{query}» ничего не найдено")
+            return
+        
+        lines = [f"🔍 Найдено по запросу «{query}»: {total}\n"]
+        for t in transactions:
+            sign = '+' if t['type'] == 'income' else '-'
+            day = datetime.fromtimestamp(t['timestamp']).strftime('%d.%m.%Y')
+            lines.append(f"{day} {sign}{t['amount']:,.0f}₽ {t.get('description', '')}")
+        
+        keyboard = []
+        if next_cursor:
+            # Курсор не помещается в callback_data - храним его у пользователя
+            context.user_data['search'] = {'query': query, 'cursor': next_cursor}
+            keyboard.append([InlineKeyboardButton("➡️ Еще", callback_data="search_more")])
+        keyboard.append([InlineKeyboardButton("🔙 Назад", callback_data="main_menu")])
+        
+        await update.effective_message.reply_text(
+            "\n".join(lines),
+            reply_markup=InlineKeyboardMarkup(keyboard)
+        )
+    
+    async def show_finance_menu(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Показать меню финансов"""
+        reply_markup = self.keyboards['finance']
+        
+        text = "💰 **Управление финансами**\n\nВыберите действие:"
+        
+        if update.callback_query:
+            await update.callback_query.edit_message_text(
+                text,
+                reply_markup=reply_markup,
+                parse_mode=ParseMode.MARKDOWN
+            )
+        else:
+            await update.message.reply_text(
+                text,
+                reply_markup=reply_markup,
+                parse_mode=ParseMode.MARKDOWN
+            )
+    
+    async def show_statistics(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Показать статистику"""
+        user_id = update.effective_user.id
+        user_data = await self.fetch_user_data(user_id)
+        
+        # Расчет статистики
+        stats = totals_statistics(user_data, top=3)
+        total_income = stats['total_income']
+        total_expenses = stats['total_expenses']
+        balance = stats['balance']
+        top_expenses = stats['top_expenses']
+        
+        stats_text = f"""
+📊 **Статистика финансов**
+
+💰 **Общий баланс:** {balance:,.0f}₽
+📈 **Доходы:** {total_income:,.0f}₽
+📉 **Расходы:** {total_expenses:,.0f}₽
+
+📋 **Всего транзакций:** {stats['count']}
+
+🔝 **Топ расходов:**
+"""
+        
+        for i, (category, amount) in enumerate(top_expenses, 1):
+            category_name = self.get_category_name(category, 'expenses')
+            stats_text += f"{i}. {category_name}: {amount:,.0f}₽\n"
+        
+        if not top_expenses:
+            stats_text += "Нет данных о расходах\n"
+        
+        reply_markup = self.keyboards['stats']
+        
+        if update.callback_query:
+            await update.callback_query.edit_message_text(
+                stats_text,
+                reply_markup=reply_markup,
+                parse_mode=ParseMode.MARKDOWN
+            )
+        else:
+            await update.message.reply_text(
+                stats_text,
+                reply_markup=reply_markup,
+                parse_mode=ParseMode.MARKDOWN
+            )
+    
+    async def show_balance(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Показать текущий баланс"""
+        user_id = update.effective_user.id
+        user_data = await self.fetch_user_data(user_id)
+        
+        stats = totals_statistics(user_data, top=0)
+        total_income = stats['total_income']
+        total_expenses = stats['total_expenses']
+        balance = stats['balance']
+        
+        balance_text = f"""
+💰 **Текущий баланс**
+
+💵 **Баланс:** {balance:,.0f}₽
+📈 **Доходы:** {total_income:,.0f}₽
+📉 **Расходы:** {total_expenses:,.0f}₽
+
+{'🎉 Отличная работа!' if balance > 0 else '⚠️ Внимание к расходам!' if balance < 0 else '⚖️ Баланс сбалансирован!'}
+        """
+        
+        reply_markup = self.keyboards['balance']
+        
+        await update.message.reply_text(
+            balance_text,
+            reply_markup=reply_markup,
+            parse_mode=ParseMode.MARKDOWN
+        )
+    
+    async def handle_callback(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Обработка callback запросов"""
+        query = update.callback_query
+        await query.answer()
+        
+        if query.data == "main_menu":
+            await self.start_command(update, context)
+        elif query.data == "finance_menu":
+            await self.show_finance_menu(update, context)
+        elif query.data == "show_stats":
+            await self.show_statistics(update, context)
+        elif query.data == "add_income":
+            await self.show_category_selection(update, context, "income")
+        elif query.data == "add_expense":
+            await self.show_category_selection(update, context, "expense")
+        elif query.data.startswith("category_"):
+            parts = query.data.split("_")
+            if len(parts) >= 3:
+                transaction_type = parts[1]
+                category = parts[2]
+                await self.request_amount(update, context, transaction_type, category)
+        elif query.data == "settings":
+            await self.show_settings(update, context)
+        elif query.data == "search_more":
+            search = context.user_data.pop('search', None)
+            if search:
+                await self.show_search_results(update, context, search['query'], search['cursor'])
+    
+    async def show_category_selection(self, update: Update, context: ContextTypes.DEFAULT_TYPE, transaction_type: str):
+        """Показать выбор категории"""
+        reply_markup = category_keyboard(transaction_type)
+        
+        type_text = "доход" if transaction_type == "income" else "расход"
+        
+        await update.callback_query.edit_message_text(
+            f"Выберите категорию для {type_text}:",
+            reply_markup=reply_markup
+        )
+    
+    async def request_amount(self, update: Update, context: ContextTypes.DEFAULT_TYPE, transaction_type: str, category: str):
+        """Запросить сумму транзакции"""
+        context.user_data['pending_transaction'] = {
+            'type': transaction_type,
+            'category': category
+        }
+        
+        type_text = "дохода" if transaction_type == "income" else "расхода"
+        category_name = self.get_category_name(category, transaction_type)
+        
+        await update.callback_query.edit_message_text(
+            f"💰 Введите сумму {type_text} для категории '{category_name}':\n\n"
+            f"Примеры:\n"
+            f"• 5000\n"
+            f"• 5000 зарплата\n"
+            f"• 1500.50 обед",
+            reply_markup=self.keyboards['cancel']
+        )
+    
+    async def handle_message(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Обработка текстовых сообщений"""
+        text = update.message.text.strip()
+        user_id = update.effective_user.id
+        
+        # Проверяем, есть ли ожидающая транзакция
+        if 'pending_transaction' in context.user_data:
+            await self.process_transaction_input(update, context, text)
+            return
+        
+        # Быстрый ввод транзакций
+        if text.startswith('+') or text.startswith('-'):
+            await self.process_quick_transaction(update, context, text)
+            return
+        
+        # Обычные сообщения
+        await update.message.reply_text(
+            "💡 Используйте команды:\n"
+            "• /start - главное меню\n"
+            "• /app - открыть приложение\n"
+            "• /finance - управление финансами\n"
+            "• /help - справка\n\n"
+            "Или введите сумму с + или - для быстрого добавления транзакции!"
+        )
+    
+    async def process_transaction_input(self, update: Update, context: ContextTypes.DEFAULT_TYPE, text: str):
+        """Обработка ввода транзакции"""
+        try:
+            parts = text.split(' ', 1)
+            amount = float(parts[0])
+            if not math.isfinite(amount):
+                raise ValueError(parts[0])
+            description = parts[1] if len(parts) > 1 else ""
+            
+            if amount <= 0:
+                await update.message.reply_text("❌ Сумма должна быть больше 0!")
+                return
+            
+            pending = context.user_data['pending_transaction']
+            user_id = update.effective_user.id
+            user_data = await self.fetch_user_data(user_id)
+            
+            transaction = {
+                'id': new_transaction_id(user_data),
+                'type': pending['type'],
+                'category': pending['category'],
+                'amount': amount,
+                'description': description,
+                'date': datetime.now().isoformat(),
+                'timestamp': datetime.now().timestamp()
+            }
+            
+            append_transaction(user_data, transaction)
+            self.categorizer.learn(str(user_id), transaction)
+            self.search.add(str(user_id), user_data, [transaction])
+            await self.writer.write(str(user_id), 'transaction', transaction)
+            if self.events is not None:
+                self.events.publish_transactions(str(user_id), user_data, [transaction])
+            
+            type_text = "доход" if pending['type'] == 'income' else "расход"
+            category_name = self.get_category_name(pending['category'], pending['type'])
+            
+            await update.message.reply_text(
+                f"✅ {type_text.title()} добавлен!\n\n"
+                f"💰 Сумма: {amount:,.0f}₽\n"
+                f"📂 Категория: {category_name}\n"
+                f"📝 Описание: {description or 'Не указано'}\n\n"
+                f"Используйте /stats для просмотра статистики!"
+            )
+            
+            del context.user_data['pending_transaction']
+            
+        except ValueError:
+            await update.message.reply_text("❌ Неверный формат суммы! Введите число.")
+        except Exception as e:
+            await update.message.reply_text("❌ Ошибка при добавлении транзакции!")
+            logger.error(f"Ошибка добавления транзакции: {e}")
+    
+    async def process_quick_transaction(self, update: Update, context: ContextTypes.DEFAULT_TYPE, text: str):
+        """Обработка быстрой транзакции"""
+        try:
+            parts = text.split(' ', 1)
+            amount_str = parts[0][1:]  # Убираем + или -
+            amount = float(amount_str)
+            if not math.isfinite(amount):
+                raise ValueError(amount_str)
+            description = parts[1] if len(parts) > 1 else ""
+            
+            if amount <= 0:
+                await update.message.reply_text("❌ Сумма должна быть больше 0!")
+                return
+            
+            transaction_type = 'income' if text.startswith('+') else 'expense'
+            
+            user_id = update.effective_user.id
+            user_data = await self.fetch_user_data(user_id)
+            
+            # Категория по описанию: сначала прошлый выбор пользователя, затем словарь
+            category = self.categorizer.categorize(transaction_type, description, str(user_id), user_data)
+            
+            transaction = {
+                'id': new_transaction_id(user_data),
+                'type': transaction_type,
+                'category': category,
+                'amount': amount,
+                'description': description,
+                'date': datetime.now().isoformat(),
+                'timestamp': datetime.now().timestamp(),
+                'auto_category': True
+            }
+            
+            append_transaction(user_data, transaction)
+            self.search.add(str(user_id), user_data, [transaction])
+            await self.writer.write(str(user_id), 'transaction', transaction)
+            if self.events is not None:
+                self.events.publish_transactions(str(user_id), user_data, [transaction])
+            
+            type_text = "доход" if transaction_type == 'income' else "расход"
+            category_name = self.get_category_name(category, transaction_type)
+            
+            await update.message.reply_text(
+                f"✅ {type_text.title()} добавлен!\n\n"
+                f"💰 Сумма: {amount:,.0f}₽\n"
+                f"📂 Категория: {category_name}\n"
+                f"📝 Описание: {description or 'Не указано'}\n\n"
+                f"💡 Для более детального учета используйте /finance или /app!"
+            )
+            
+        except ValueError:
+            await update.message.reply_text("❌ Неверный формат суммы! Пример: +5000 или -1500")
+        except Exception as e:
+            await update.message.reply_text("❌ Ошибка при добавлении транзакции!")
+            logger.error(f"Ошибка быстрой транзакции: {e}")
+    
+    async def handle_webapp_data(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Обработка данных из WebApp"""
+        try:
+            data = update.message.web_app_data.data
+            # Здесь можно обработать данные, отправленные из WebApp
+            await update.message.reply_text(
+                "✅ Данные получены из приложения!\n"
+                "Используйте /stats для просмотра обновленной статистики."
+            )
+        except Exception as e:
+            logger.error(f"Ошибка обработки WebApp данных: {e}")
+    
+    async def show_settings(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Показать настройки"""
+        reply_markup = self.keyboards['settings']
+        
+        await update.callback_query.edit_message_text(
+            "⚙️ **Настройки**\n\n"
+            "Для изменения настроек используйте веб-приложение:\n"
+            "• 💱 Валюта\n"
+            "• 🎨 Тема оформления\n"
+            "• 🔔 Уведомления\n"
+            "• 🌍 Язык",
+            reply_markup=reply_markup,
+            parse_mode=ParseMode.MARKDOWN
+        )
+    
+    def get_category_name(self, category_code: str, transaction_type: str) -> str:
+        """Получить название категории по коду"""
+        return self.category_registry.name(category_code, transaction_type)
+    
+    async def start(self):
+        """Запуск обработки обновлений (источник - polling или webhook)"""
+        await self.application.initialize()
+        await self.application.start()
+        if not self.shared:
+            self.writer.start()
+    
+    async def stop(self):
+        """Остановка бота"""
+        if self.application.updater.running:
+            await self.application.updater.stop()
+        await self.application.stop()
+        if not self.shared:
+            # Сброс накопленных изменений перед выходом
+            await self.writer.stop()
+        await self.application.shutdown()
+        logger.info(f"Обработка обновлений: {self.dispatcher.stats()}")
+        logger.info(f"Отправка сообщений: {self.send_scheduler.stats()}")
+        if not self.shared:
+            self.storage.close()
+            logger.info(f"Кеш пользователей: {self.data.stats()}")
+        logger.info("👋 Бот остановлен")
+    
+    async def run(self):
+        """Запуск бота (long polling)"""
+        logger.info("🚀 Запуск интегрированного Finance Bot")
+        
+        await self.start()
+        await self.application.updater.start_polling()
+        
+        # Ожидание завершения
+        try:
+            await asyncio.Event().wait()
+        except (KeyboardInterrupt, asyncio.CancelledError):
+            logger.info("🛑 Получен сигнал остановки...")
+        finally:
+            await self.stop()
+
+def main():
+    """Главная функция"""
+    bot = IntegratedFinanceBot()
+    asyncio.run(bot.run())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""
+Keyboards - Клавиатуры выбора категории для ботов
+Собираются по справочнику categories.py один раз на тип транзакции;
+объекты InlineKeyboardMarkup в PTB неизменяемы, поэтому одна клавиатура
+отправляется всем пользователям. Модуль импортируют только боты -
+веб-приложениям python-telegram-bot не нужен
+"""
+
+from functools import lru_cache
+
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+
+from categories import registry
+
+
+@lru_cache(maxsize=None)
+def category_keyboard(transaction_type: str, back: str = 'finance_menu') -> InlineKeyboardMarkup:
+    """Кнопки category_<тип>_<код> по две в ряд и кнопка "Назад" на back"""
+    keyboard = []
+    row = []
+    for name, code in registry.items(transaction_type).items():
+        row.append(InlineKeyboardButton(name, callback_data=f"category_{transaction_type}_{code}"))
+        if len(row) == 2:
+            keyboard.append(row)
+            row = []
+
+    if row:
+        keyboard.append(row)
+
+    keyboard.append([InlineKeyboardButton("🔙 Назад", callback_data=back)])
+    return InlineKeyboardMarkup(keyboard)
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Loadtest - Нагрузочный тест бота на поддельном Bot API
+Виртуальные пользователи по кругу отправляют /stats, быстрый ввод
+(+5000 зарплата) и проходят выбор категории кнопками; для каждого шага
+меряется время от отправки обновления до ответа бота
+
+Бот в этом же процессе (данные пишутся в файл бота в текущей папке):
+    python loadtest.py --bot integrated --users 1000 --duration 60
+Бот в отдельном процессе:
+    python loadtest.py --port 8081 --users 1000 --duration 60
+    BOT_API_BASE_URL=http://localhost:8081 python integrated_bot.py
+
+Лимиты отправки бота (SEND_*) действуют и здесь; чтобы мерить сам бот,
+а не лимиты Telegram, их можно поднять: --send-rate 100000
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import random
+import time
+from typing import Dict, List, Optional
+
+import uvicorn
+
+from fake_bot_api import FakeBotAPI
+from webhook import FakeTelegramSender
+
+logger = logging.getLogger(__name__)
+
+
+class StepStats:
+    """Время ответа бота по шагам сценариев"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+
+    def record(self, step: str, seconds: float) -> None:
+        self.latencies.setdefault(step, []).append(seconds)
+
+    def error(self, step: str) -> None:
+        self.errors[step] = self.errors.get(step, 0) + 1
+
+    @staticmethod
+    def percentile(values: List[float], q: float) -> float:
+        return values[int(round(q * (len(values) - 1)))] if values else 0.0
+
+    def report(self, duration: float) -> str:
+        lines = [f"{'шаг':<20}{'ответов':>9}{'ошибок':>8}{'в сек':>9}{'p50, мс':>10}{'p99, мс':>10}"]
+        for step in sorted(set(self.latencies) | set(self.errors)):
+            values = sorted(self.latencies.get(step, []))
+            lines.append(
+                f"{step:<20}{len(values):>9}{self.errors.get(step, 0):>8}"
+                f"{len(values) / duration:>9.1f}"
+                f"{self.percentile(values, 0.5) * 1000:>10.1f}"
+                f"{self.percentile(values, 0.99) * 1000:>10.1f}"
+            )
+        return '\n'.join(lines)
+
+
+class LoadTest:
+    """Виртуальные пользователи бота"""
+
+    def __init__(self, api: FakeBotAPI, users: int, first_user: int, timeout: float):
+        self.api = api
+        self.sender = FakeTelegramSender()
+        self.users = users
+        self.first_user = first_user
+        self.timeout = timeout
+        self.stats = StepStats()
+
+    async def step(self, name: str, user_id: int, update: Dict) -> Optional[Dict]:
+        """Отправить обновление и дождаться ответа бота в чат"""
+        waiter = self.api.expect_reply(user_id)
+        start = time.perf_counter()
+        await self.api.inject(update)
+        try:
+            message = await asyncio.wait_for(waiter, self.timeout)
+        except asyncio.TimeoutError:
+            self.stats.error(name)
+            return None
+        self.stats.record(name, time.perf_counter() - start)
+        return message
+
+    async def scenario_stats(self, user_id: int) -> None:
+        await self.step('/stats', user_id, self.sender.build_message(user_id, '/stats'))
+
+    async def scenario_quick(self, user_id: int) -> None:
+        text = random.choice((f"+{random.randint(1000, 90000)} зарплата", f"-{random.randint(50, 5000)} кофе"))
+        await self.step('quick', user_id, self.sender.build_message(user_id, text))
+
+    async def scenario_category(self, user_id: int) -> None:
+        menu = await self.step('/start', user_id, self.sender.build_message(user_id, '/start'))
+        if menu is None:
+            return
+        message_id = menu['message_id']
+        for name, data in (('callback:add', 'add_income'), ('callback:category', 'category_income_salary')):
+            if await self.step(name, user_id, self.sender.build_callback(user_id, data, message_id)) is None:
+                return
+        await self.step('amount', user_id, self.sender.build_message(user_id, f"{random.randint(1000, 90000)}"))
+
+    async def run_user(self, user_id: int, deadline: float, ramp: float) -> None:
+        await asyncio.sleep(random.random() * ramp)
+        scenarios = (self.scenario_stats, self.scenario_quick, self.scenario_category)
+        while time.monotonic() < deadline:
+            await random.choice(scenarios)(user_id)
+
+    async def run(self, duration: float, ramp: float) -> float:
+        start = time.monotonic()
+        deadline = start + ramp + duration
+        await asyncio.gather(*(
+            self.run_user(self.first_user + i, deadline, ramp) for i in range(self.users)
+        ))
+        return time.monotonic() - start
+
+
+async def run(args) -> None:
+    api = FakeBotAPI()
+    server = uvicorn.Server(uvicorn.Config(api.app, host=args.host, port=args.port, log_level='warning'))
+    server_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+    base_url = f"http://{args.host}:{args.port}"
+    logger.info(f"Fake Bot API: {base_url}")
+
+    bot = None
+    if args.bot:
+        os.environ['BOT_API_BASE_URL'] = base_url
+        os.environ.setdefault('BOT_TOKEN', '123456:fake')
+        if args.send_rate:
+            os.environ['SEND_GLOBAL_RATE'] = str(args.send_rate)
+            os.environ['SEND_CHAT_RATE'] = str(args.send_rate)
+        if args.bot == 'simple':
+            from simple_bot import SimpleFinanceBot as bot_class
+        else:
+            from integrated_bot import IntegratedFinanceBot as bot_class
+        bot = bot_class()
+        await bot.start()
+        await bot.application.updater.start_polling(timeout=10)
+    else:
+        logger.info(f"Жду подключения бота: BOT_API_BASE_URL={base_url}")
+    await api.connected.wait()
+
+    test = LoadTest(api, args.users, args.first_user, args.timeout)
+    logger.info(f"Старт: {args.users} пользователей, {args.duration} с")
+    elapsed = await test.run(args.duration, args.ramp)
+
+    print(test.stats.report(elapsed))
+    print(f"Вызовы Bot API: {api.calls}")
+    if bot is not None:
+        for name in ('dispatcher', 'send_scheduler'):
+            component = getattr(bot, name, None)
+            if component is not None:
+                print(f"{name}: {component.stats()}")
+        await bot.stop()
+
+    await api.close()
+    server.should_exit = True
+    await server_task
+
+
+def main():
+    """Нагрузочный тест из командной строки"""
+    logging.basicConfig(
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        level=logging.INFO
+    )
+    parser = argparse.ArgumentParser(description="Нагрузочный тест бота на поддельном Bot API")
+    parser.add_argument('--bot', choices=('integrated', 'simple'), help="Запустить бота в этом процессе")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8081)
+    parser.add_argument('--users', type=int, default=100, help="Число виртуальных пользователей")
+    parser.add_argument('--duration', type=float, default=30, help="Длительность, с")
+    parser.add_argument('--ramp', type=float, default=5, help="Время подключения пользователей, с")
+    parser.add_argument('--timeout', type=float, default=10, help="Ожидание ответа бота, с")
+    parser.add_argument('--first-user', type=int, default=900000000, help="ID первого пользователя")
+    parser.add_argument('--send-rate', type=float, help="Поднять лимиты отправки бота (сообщений в секунду)")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Metrics - Метрики приложения в текстовом формате Prometheus
+Счетчики, гистограммы и gauge без сторонних зависимостей. Значения
+меняются только из event loop, поэтому блокировки не нужны; на запрос
+приходится несколько обращений к словарям и bisect по границам корзин
+"""
+
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, List, Tuple
+
+# Границы корзин: время в секундах и размер в байтах
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (100, 1000, 10000, 100000, 1000000, 10000000)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4'
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple, extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    """Метрика с набором меток; значения хранятся по кортежу значений меток"""
+
+    kind = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple, object] = {}
+
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+        for labels, value in self._values.items():
+            lines.append(f'{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}')
+        return lines
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, labels: Tuple = (), amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+
+class Gauge(Metric):
+    kind = 'gauge'
+
+    def inc(self, labels: Tuple = (), amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, labels: Tuple = (), amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) - amount
+
+    def set(self, labels: Tuple = (), value: float = 0) -> None:
+        self._values[labels] = value
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, labels: Tuple = ()) -> None:
+        state = self._values.get(labels)
+        if state is None:
+            # Счетчики корзин (последняя - +Inf), сумма и количество
+            state = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        state[0][bisect_left(self.buckets, value)] += 1
+        state[1] += value
+        state[2] += 1
+
+    @contextmanager
+    def time(self, labels: Tuple = ()):
+        """Замерить время выполнения блока"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, labels)
+
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+        bounds = self.buckets + (float('inf'),)
+        for labels, (counts, total, count) in self._values.items():
+            cumulative = 0
+            for bound, bucket_count in zip(bounds, counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f'{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}')
+            lines.append(f'{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(total)}')
+            lines.append(f'{self.name}_count{_format_labels(self.labelnames, labels)} {count}')
+        return lines
+
+
+class AppMetrics:
+    """Метрики приложения: HTTP-запросы, хранилище, расчет статистики"""
+
+    def __init__(self):
+        self.requests = Counter(
+            'http_requests_total', 'Количество HTTP-запросов', ('method', 'route', 'status'))
+        self.errors = Counter(
+            'http_request_errors_total', 'Запросы, завершившиеся ошибкой сервера', ('method', 'route'))
+        self.latency = Histogram(
+            'http_request_duration_seconds', 'Время обработки HTTP-запроса', ('method', 'route'))
+        self.in_progress = Gauge(
+            'http_requests_in_progress', 'HTTP-запросы в обработке', ('method',))
+        self.request_size = Histogram(
+            'http_request_size_bytes', 'Размер тела запроса', ('method', 'route'), SIZE_BUCKETS)
+        self.response_size = Histogram(
+            'http_response_size_bytes', 'Размер тела ответа', ('method', 'route'), SIZE_BUCKETS)
+        self.storage = Histogram(
+            'storage_operation_duration_seconds', 'Время операций с хранилищем', ('operation',))
+        self.statistics = Histogram(
+            'statistics_computation_duration_seconds', 'Время расчета статистики')
+
+    def collect(self) -> List[Metric]:
+        return [
+            self.requests, self.errors, self.latency, self.in_progress,
+            self.request_size, self.response_size, self.storage, self.statistics
+        ]
+
+    def render(self) -> str:
+        """Все метрики в текстовом формате Prometheus"""
+        lines = []
+        for metric in self.collect():
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+class MetricsMiddleware:
+    """ASGI-middleware, собирающее метрики HTTP-запросов.
+
+    Метка route - шаблон пути маршрута (/api/user/{user_id}), а не сам
+    путь, чтобы число рядов не росло с числом пользователей. Запросы,
+    не попавшие ни в один маршрут, учитываются как route="other".
+    """
+
+    def __init__(self, app, metrics: AppMetrics):
+        self.app = app
+        self.metrics = metrics
+        # endpoint -> шаблон пути; словарь дополняется при первом запросе
+        # к новому endpoint, а не перестраивается на каждом промахе
+        self._routes: Dict = {}
+
+    def _route(self, scope) -> str:
+        endpoint = scope.get('endpoint')
+        if endpoint is None:
+            return 'other'
+        route = self._routes.get(endpoint)
+        if route is None:
+            self._routes.update(
+                (route.endpoint, route.path)
+                for route in scope['app'].routes if hasattr(route, 'endpoint')
+            )
+            # Endpoint без шаблона пути (StaticFiles и т.п.) запоминается как
+            # other, чтобы не просматривать маршруты при каждом обращении
+            route = self._routes.setdefault(endpoint, 'other')
+        return route
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        metrics = self.metrics
+        method = scope['method']
+        response = {'status': 500, 'size': 0}
+
+        async def send_with_metrics(message):
+            if message['type'] == 'http.response.start':
+                response['status'] = message['status']
+            elif message['type'] == 'http.response.body':
+                response['size'] += len(message.get('body', b''))
+            await send(message)
+
+        metrics.in_progress.inc((method,))
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        except Exception:
+            response['status'] = 500
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            metrics.in_progress.dec((method,))
+            labels = (method, self._route(scope))
+            status = response['status']
+            metrics.requests.inc(labels + (str(status),))
+            metrics.latency.observe(elapsed, labels)
+            metrics.response_size.observe(response['size'], labels)
+            if status >= 500:
+                metrics.errors.inc(labels)
+            for name, value in scope['headers']:
+                if name == b'content-length':
+                    # Неверный заголовок не должен подменять ответ или исключение
+                    try:
+                        metrics.request_size.observe(int(value), labels)
+                    except ValueError:
+                        pass
+                    break
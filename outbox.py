@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Outbox - Очередь исходящих сообщений бота с учетом лимитов Telegram
+Все запросы бота к Bot API с chat_id (reply_text, edit_message_text,
+send_message...) проходят через общий token bucket на бота и отдельный
+на каждый чат. Ответы пользователю (interactive) идут раньше рассылок
+(bulk); при RetryAfter все отправки приостанавливаются на указанное
+Telegram время и запрос повторяется
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Callable, Coroutine, Dict, Optional, Union
+
+from telegram.error import RetryAfter
+from telegram.ext import BaseRateLimiter
+
+logger = logging.getLogger(__name__)
+
+INTERACTIVE = 'interactive'
+BULK = 'bulk'
+# rate_limit_args для рассылок: bot.send_message(..., rate_limit_args=BULK_ARGS)
+BULK_ARGS = {'priority': BULK}
+
+
+class TokenBucket:
+    """Token bucket: rate токенов в секунду, не больше burst про запас"""
+
+    __slots__ = ('rate', 'burst', 'tokens', 'updated')
+
+    def __init__(self, rate: float, burst: float, now: Optional[float] = None):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic() if now is None else now
+
+    def _refill(self, now: float) -> None:
+        if now > self.updated:
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def available(self, now: float) -> float:
+        self._refill(now)
+        return self.tokens
+
+    def delay(self, now: float) -> float:
+        """Через сколько секунд будет доступен токен"""
+        self._refill(now)
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self, now: float) -> None:
+        self._refill(now)
+        self.tokens -= 1
+
+
+class SendScheduler(BaseRateLimiter[Dict[str, Any]]):
+    """Планировщик отправки для Application.builder().rate_limiter.
+
+    Лимиты по умолчанию - рекомендации Telegram: около 30 сообщений в
+    секунду на бота, одно в секунду в личный чат (с небольшим запасом) и
+    20 в минуту в группу. Рассылки не тратят последние SEND_BULK_RESERVE
+    токенов общего лимита, поэтому при нагрузке ответы идут первыми.
+    """
+
+    def __init__(self, global_rate: Optional[float] = None, chat_rate: Optional[float] = None,
+                 chat_burst: Optional[float] = None, group_rate: Optional[float] = None,
+                 max_retries: Optional[int] = None, bulk_reserve: Optional[float] = None):
+        if global_rate is None:
+            global_rate = float(os.getenv('SEND_GLOBAL_RATE', '30'))
+        if chat_rate is None:
+            chat_rate = float(os.getenv('SEND_CHAT_RATE', '1'))
+        if chat_burst is None:
+            chat_burst = float(os.getenv('SEND_CHAT_BURST', '3'))
+        if group_rate is None:
+            group_rate = float(os.getenv('SEND_GROUP_RATE_PER_MIN', '20')) / 60
+        if max_retries is None:
+            max_retries = int(os.getenv('SEND_MAX_RETRIES', '3'))
+        if bulk_reserve is None:
+            bulk_reserve = float(os.getenv('SEND_BULK_RESERVE', '5'))
+        self.global_bucket = TokenBucket(global_rate, global_rate)
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.group_rate = group_rate
+        self.max_retries = max_retries
+        self.bulk_reserve = bulk_reserve
+        self._chats: Dict[Union[int, str], TokenBucket] = {}
+        self._paused_until = 0.0
+        self._waiting = {INTERACTIVE: 0, BULK: 0}
+        self.sent = {INTERACTIVE: 0, BULK: 0}
+        self.throttled = 0
+        self.wait_seconds = 0.0
+        self.retry_after = 0
+        self.failed = 0
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
+
+    def _chat_bucket(self, chat_id: Union[int, str], now: float) -> TokenBucket:
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            if len(self._chats) >= 10000:
+                # Полные ведра ничего не помнят - их можно забыть
+                self._chats = {
+                    key: value for key, value in self._chats.items() if value.available(now) < value.burst
+                }
+            # Отрицательный id или @username - группа/канал
+            try:
+                is_group = int(chat_id) < 0
+            except ValueError:
+                is_group = True
+            if is_group:
+                bucket = TokenBucket(self.group_rate, 1, now)
+            else:
+                bucket = TokenBucket(self.chat_rate, self.chat_burst, now)
+            self._chats[chat_id] = bucket
+        return bucket
+
+    async def _acquire(self, chat_id: Union[int, str], priority: str) -> None:
+        """Дождаться разрешения на отправку в чат"""
+        started = None
+        self._waiting[priority] += 1
+        try:
+            while True:
+                now = time.monotonic()
+                if self._paused_until > now:
+                    delay = self._paused_until - now
+                elif priority == BULK and self.global_bucket.available(now) < self.bulk_reserve + 1:
+                    # Запас общего лимита - только для ответов
+                    delay = (self.bulk_reserve + 1 - self.global_bucket.tokens) / self.global_bucket.rate
+                else:
+                    chat_bucket = self._chat_bucket(chat_id, now)
+                    delay = max(self.global_bucket.delay(now), chat_bucket.delay(now))
+                    if delay <= 0:
+                        self.global_bucket.take(now)
+                        chat_bucket.take(now)
+                        break
+                if started is None:
+                    started = now
+                    self.throttled += 1
+                await asyncio.sleep(delay)
+        finally:
+            self._waiting[priority] -= 1
+        if started is not None:
+            self.wait_seconds += time.monotonic() - started
+
+    async def process_request(
+        self,
+        callback: Callable[..., Coroutine[Any, Any, Any]],
+        args: Any,
+        kwargs: Dict[str, Any],
+        endpoint: str,
+        data: Dict[str, Any],
+        rate_limit_args: Optional[Dict[str, Any]],
+    ):
+        chat_id = data.get('chat_id')
+        if chat_id is None:
+            # answerCallbackQuery, getMe и т.п. - без лимита
+            return await callback(*args, **kwargs)
+
+        priority = (rate_limit_args or {}).get('priority', INTERACTIVE)
+        if priority not in self._waiting:
+            priority = INTERACTIVE
+        for attempt in range(self.max_retries + 1):
+            await self._acquire(chat_id, priority)
+            try:
+                result = await callback(*args, **kwargs)
+            except RetryAfter as e:
+                self.retry_after += 1
+                if attempt == self.max_retries:
+                    self.failed += 1
+                    raise
+                # Лимит бота общий - паузу соблюдают все отправки
+                self._paused_until = max(self._paused_until, time.monotonic() + float(e.retry_after))
+                logger.warning(f"Telegram просит подождать {e.retry_after} с ({endpoint}, чат {chat_id})")
+                continue
+            self.sent[priority] += 1
+            return result
+
+    def stats(self) -> Dict:
+        return {
+            'sent': dict(self.sent),
+            'waiting': dict(self._waiting),
+            'throttled': self.throttled,
+            'wait_seconds': round(self.wait_seconds, 3),
+            'retry_after': self.retry_after,
+            'failed': self.failed,
+            'paused_for': round(max(0.0, self._paused_until - time.monotonic()), 3),
+            'chats': len(self._chats)
+        }
+
+
+def notify(application, chat_id: Union[int, str], text: str, **kwargs) -> asyncio.Task:
+    """Отправить уведомление рассылкой, не дожидаясь отправки"""
+    return application.create_task(
+        application.bot.send_message(chat_id, text, rate_limit_args=BULK_ARGS, **kwargs)
+    )
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Persistence - Асинхронная работа с хранилищем
+Дисковые операции выполняются в отдельном пуле потоков, изменения
+копятся в памяти и сбрасываются в хранилище фоновой задачей
+"""
+
+import asyncio
+import logging
+import os
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from storage import BaseStore
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncStorage:
+    """Асинхронный фасад хранилища.
+
+    Сериализация и запись на диск выполняются в выделенном пуле потоков,
+    чтобы не блокировать event loop. Записи одного пользователя идут
+    строго по очереди под его блокировкой, записи разных пользователей
+    выполняются параллельно.
+    """
+
+    def __init__(self, store: BaseStore, max_workers: Optional[int] = None):
+        self.store = store
+        if max_workers is None:
+            max_workers = int(os.getenv('STORAGE_IO_WORKERS', '4'))
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='storage')
+        # Блокировка живет, пока ее кто-то ждет или держит
+        self._locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+    def lock(self, user_id: str) -> asyncio.Lock:
+        """Блокировка пользователя"""
+        lock = self._locks.get(user_id)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._locks[user_id] = lock
+        return lock
+
+    async def run(self, func, *args):
+        """Выполнить блокирующую функцию в пуле хранилища"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    async def load(self) -> Dict:
+        return await self.run(self.store.load)
+
+    async def load_user(self, user_id: str) -> Optional[Dict]:
+        return await self.run(self.store.load_user, user_id)
+
+    async def append_many(self, user_id: str, changes: List[Tuple[str, Any]]) -> None:
+        """Записать изменения одного пользователя (op, payload) по порядку"""
+        async with self.lock(user_id):
+            await self.run(self.store.append_many, [(user_id, op, payload) for op, payload in changes])
+
+    async def save(self, data: Dict) -> None:
+        await self.run(self.store.save, data)
+
+    def close(self) -> None:
+        """Дождаться операций в пуле и закрыть хранилище"""
+        self._executor.shutdown(wait=True)
+        self.store.close()
+
+
+class CoalescingWriter:
+    """Объединение записей в хранилище.
+
+    Изменение помечает хранилище "грязным", а фоновая asyncio-задача
+    сбрасывает накопленное не чаще, чем раз в flush_interval_ms, или
+    сразу, когда накопилось max_pending изменений. В режиме durable
+    запрос дожидается ближайшего сброса на диск. on_flush получает
+    длительность каждого сброса в секундах (для метрик).
+    """
+
+    def __init__(self, storage: AsyncStorage, flush_interval_ms: Optional[int] = None,
+                 max_pending: Optional[int] = None, durable: Optional[bool] = None,
+                 on_flush: Optional[Callable[[float], None]] = None):
+        self.storage = storage
+        self.on_flush = on_flush
+        if flush_interval_ms is None:
+            flush_interval_ms = int(os.getenv('STORAGE_FLUSH_INTERVAL_MS', '200'))
+        if max_pending is None:
+            max_pending = int(os.getenv('STORAGE_FLUSH_MAX_PENDING', '500'))
+        if durable is None:
+            durable = os.getenv('STORAGE_DURABLE', 'false').lower() in ('1', 'true', 'yes')
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_pending = max_pending
+        self.durable = durable
+
+        self._pending: List[Tuple[str, str, Any]] = []
+        self._pending_users: Set[str] = set()
+        # Пользователи, чьи изменения пишутся прямо сейчас
+        self._inflight_users: Set[str] = set()
+        # durable-запросы по пользователям: ответ зависит только от записи
+        # изменений своего пользователя
+        self._waiters: Dict[str, List[asyncio.Future]] = {}
+        self._dirty: Optional[asyncio.Event] = None
+        self._full: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    def start(self) -> None:
+        """Запуск фоновой задачи (из работающего event loop)"""
+        if self._task is not None:
+            return
+        self._dirty = asyncio.Event()
+        self._full = asyncio.Event()
+        if self._pending:
+            self._dirty.set()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Остановка фоновой задачи с финальным сбросом"""
+        if self._task is not None:
+            # Не отменяем задачу посреди записи, а просим ее завершиться
+            self._stopping = True
+            self._dirty.set()
+            self._full.set()
+            await self._task
+            self._task = None
+            self._stopping = False
+        await self.flush()
+
+    async def write(self, user_id: str, op: str, payload, durable: Optional[bool] = None) -> None:
+        """Записать изменение (в режиме durable - дождаться сброса на диск)"""
+        await self.write_many(user_id, [(op, payload)], durable)
+
+    async def write_many(self, user_id: str, changes: List[Tuple[str, Any]],
+                         durable: Optional[bool] = None) -> None:
+        """Записать пачку изменений пользователя (op, payload) - попадет в один сброс"""
+        if not changes:
+            return
+        if self._task is None:
+            # Фоновая задача не запущена - пишем сразу
+            await self.storage.append_many(user_id, changes)
+            return
+
+        self._pending.extend((user_id, op, payload) for op, payload in changes)
+        self._pending_users.add(user_id)
+        self._dirty.set()
+        if len(self._pending) >= self.max_pending:
+            self._full.set()
+
+        if durable if durable is not None else self.durable:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.setdefault(user_id, []).append(waiter)
+            await waiter
+
+    def is_pending(self, user_id: str) -> bool:
+        """Есть ли у пользователя изменения, еще не записанные в хранилище"""
+        return user_id in self._pending_users or user_id in self._inflight_users
+
+    def request_flush(self) -> None:
+        """Попросить фоновую задачу сбросить изменения, не дожидаясь интервала"""
+        if self._task is not None:
+            self._full.set()
+
+    async def flush(self) -> None:
+        """Сбросить накопленные изменения в хранилище"""
+        # Пока изменения пользователя пишет другой сброс, новые ждут в
+        # очереди: при ошибке он вернет свои в ее начало, и порядок записей
+        # пользователя в журнале совпадет с порядком изменений
+        deferred = [change for change in self._pending if change[0] in self._inflight_users]
+        if deferred:
+            batch = [change for change in self._pending if change[0] not in self._inflight_users]
+        else:
+            batch = self._pending
+        self._pending = deferred
+        self._pending_users = {user_id for user_id, _, _ in deferred}
+        # durable-запросы пользователей с отложенными изменениями дождутся
+        # их сброса
+        waiters = {
+            user_id: user_waiters for user_id, user_waiters in self._waiters.items()
+            if user_id not in self._pending_users
+        }
+        self._waiters = {
+            user_id: user_waiters for user_id, user_waiters in self._waiters.items()
+            if user_id in self._pending_users
+        }
+        if self._dirty is not None:
+            self._dirty.clear()
+            self._full.clear()
+            if deferred:
+                self._dirty.set()
+
+        errors: Dict[str, Exception] = {}
+        if batch:
+            # Пачки разных пользователей пишутся параллельно, порядок внутри
+            # пользователя сохраняется его блокировкой
+            by_user: Dict[str, List[Tuple[str, Any]]] = {}
+            for user_id, op, payload in batch:
+                by_user.setdefault(user_id, []).append((op, payload))
+            self._inflight_users.update(by_user)
+            start = time.perf_counter()
+            try:
+                results = await asyncio.gather(*(
+                    self.storage.append_many(user_id, changes)
+                    for user_id, changes in by_user.items()
+                ), return_exceptions=True)
+            finally:
+                self._inflight_users.difference_update(by_user)
+            if self.on_flush is not None:
+                self.on_flush(time.perf_counter() - start)
+
+            errors = {
+                user_id: error for user_id, error in zip(by_user, results)
+                if isinstance(error, Exception)
+            }
+            if errors:
+                logger.error(f"Ошибка записи изменений пользователей {sorted(errors)}: "
+                             f"{next(iter(errors.values()))}")
+                # Вернем несохраненные изменения в очередь, следующий сброс повторит попытку
+                self._pending = [change for change in batch if change[0] in errors] + self._pending
+                self._pending_users.update(errors)
+                if self._dirty is not None:
+                    self._dirty.set()
+
+        # Ошибку получают только запросы пользователей, чья запись не удалась
+        for user_id, user_waiters in waiters.items():
+            error = errors.get(user_id)
+            for waiter in user_waiters:
+                if waiter.done():
+                    continue
+                if error is not None:
+                    waiter.set_exception(error)
+                else:
+                    waiter.set_result(None)
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            await self._dirty.wait()
+            try:
+                await asyncio.wait_for(self._full.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            await self.flush()
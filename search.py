@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Search - Полнотекстовый поиск по описаниям транзакций
+Для пользователя строится обратный индекс: слово -> транзакции, где
+оно встречается. Слова запроса ищутся по префиксу в упорядоченном
+словаре, результаты - от новых к старым, постранично
+"""
+
+import os
+import re
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from timeline import decode_cursor, encode_cursor
+
+# \w в Python учитывает кириллицу
+TOKEN_RE = re.compile(r'\w+')
+
+
+def tokenize(text: str) -> List[str]:
+    """Слова текста в нижнем регистре, ё -> е"""
+    return TOKEN_RE.findall((text or '').lower().replace('ё', 'е'))
+
+
+def _order_key(transaction: Dict) -> Tuple[float, int]:
+    transaction_id = transaction.get('id')
+    return transaction['timestamp'], transaction_id if isinstance(transaction_id, int) else -1
+
+
+class SearchIndex:
+    """Обратный индекс описаний транзакций одного пользователя"""
+
+    def __init__(self, transactions: List[Dict], version: int = 0):
+        self.postings: Dict[str, List[Dict]] = {}
+        # Упорядоченный словарь для поиска по префиксу
+        self.vocabulary: List[str] = []
+        # Версия документа пользователя, по которой построен индекс
+        self.version = version
+        self.size = 0
+        for transaction in transactions:
+            self.add(transaction)
+
+    def add(self, transaction: Dict) -> None:
+        """Добавить транзакцию в индекс"""
+        for token in set(tokenize(transaction.get('description', ''))):
+            posting = self.postings.get(token)
+            if posting is None:
+                posting = self.postings[token] = []
+                insort(self.vocabulary, token)
+            posting.append(transaction)
+        self.size += 1
+
+    def matches(self, prefix: str) -> Dict[int, Dict]:
+        """Транзакции со словами, начинающимися на prefix"""
+        found = {}
+        i = bisect_left(self.vocabulary, prefix)
+        while i < len(self.vocabulary) and self.vocabulary[i].startswith(prefix):
+            for transaction in self.postings[self.vocabulary[i]]:
+                found[id(transaction)] = transaction
+            i += 1
+        return found
+
+    def search(self, query: str) -> List[Dict]:
+        """Транзакции, где есть все слова запроса (по префиксу), от новых к старым"""
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        # Начинаем с самого редкого слова, дальше только пересечение
+        candidate_sets = sorted((self.matches(token) for token in set(tokens)), key=len)
+        result = candidate_sets[0]
+        for candidates in candidate_sets[1:]:
+            result = {key: t for key, t in result.items() if key in candidates}
+            if not result:
+                break
+        return sorted(result.values(), key=_order_key, reverse=True)
+
+
+def page_results(results: List[Dict], limit: int = 20,
+                 cursor: Optional[str] = None) -> Tuple[List[Dict], Optional[str]]:
+    """Страница результатов и курсор следующей (курсор - как у /api/transactions)"""
+    start = 0
+    if cursor:
+        timestamp, transaction_id = decode_cursor(cursor)
+        position = (timestamp, transaction_id if isinstance(transaction_id, int) else -1)
+        # Результаты упорядочены по убыванию - ищем первый после курсора
+        lo, hi = 0, len(results)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if _order_key(results[mid]) >= position:
+                lo = mid + 1
+            else:
+                hi = mid
+        start = lo
+    page = results[start:start + limit]
+    next_cursor = encode_cursor(page[-1]) if start + limit < len(results) and page else None
+    return page, next_cursor
+
+
+class SearchEngine:
+    """Индексы пользователей в LRU-кеше на SEARCH_CACHE_USERS пользователей.
+
+    Индекс строится при первом поиске и дополняется при добавлении
+    транзакций (add). Свежесть индекса определяется по версии документа:
+    если история изменилась в обход add, индекс перестраивается при
+    следующем поиске.
+    """
+
+    def __init__(self, max_users: Optional[int] = None):
+        if max_users is None:
+            max_users = int(os.getenv('SEARCH_CACHE_USERS', '256'))
+        self.max_users = max_users
+        self._indexes: "OrderedDict[str, SearchIndex]" = OrderedDict()
+
+    def add(self, user_id: str, user_data: Dict, transactions: List[Dict]) -> None:
+        """Учесть новые транзакции пользователя, если его индекс уже построен.
+
+        Вызывается после добавления транзакций в документ: каждая подняла
+        версию на 1. Если версия выросла на другое число, были изменения
+        в обход add, и индекс сбрасывается.
+        """
+        index = self._indexes.get(user_id)
+        if index is None:
+            return
+        version = user_data.get('version', 0)
+        if version - index.version != len(transactions):
+            del self._indexes[user_id]
+            return
+        for transaction in transactions:
+            index.add(transaction)
+        index.version = version
+
+    def index(self, user_id: str, user_data: Dict) -> SearchIndex:
+        """Индекс пользователя (из кеша или построенный заново)"""
+        transactions = user_data.get('transactions', [])
+        version = user_data.get('version', 0)
+        index = self._indexes.get(user_id)
+        # Документ, загруженный заново после вытеснения, - новые объекты с
+        # той же версией: индекс по ним по-прежнему верен
+        if index is not None and index.version == version and index.size == len(transactions):
+            self._indexes.move_to_end(user_id)
+            return index
+
+        index = SearchIndex(transactions, version)
+        self._indexes[user_id] = index
+        self._indexes.move_to_end(user_id)
+        if len(self._indexes) > self.max_users:
+            self._indexes.popitem(last=False)
+        return index
+
+    def search(self, user_id: str, user_data: Dict, query: str, limit: int = 20,
+               cursor: Optional[str] = None) -> Tuple[List[Dict], Optional[str], int]:
+        """Страница результатов, курсор следующей и общее число найденных"""
+        results = self.index(user_id, user_data).search(query)
+        page, next_cursor = page_results(results, limit, cursor)
+        return page, next_cursor, len(results)
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Stats Cache - Кеш готовых ответов статистики
+Ответ хранится вместе с версией документа пользователя: любое изменение
+данных меняет версию, и старый ответ больше не отдается
+"""
+
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional, Set, Tuple
+
+
+class CachedResponse:
+    """Готовый ответ: данные и уже сериализованное тело"""
+
+    __slots__ = ('version', 'expires_at', 'content', 'body')
+
+    def __init__(self, version: int, expires_at: float, content: Dict, body: bytes):
+        self.version = version
+        self.expires_at = expires_at
+        self.content = content
+        self.body = body
+
+
+class StatisticsCache:
+    """LRU-кеш ответов статистики по (user_id, запрос) с версией и TTL.
+
+    Запись действительна, пока версия документа пользователя совпадает
+    с версией, при которой она была посчитана, и не истек ttl секунд.
+    max_entries ограничивает число записей, 0 - кеш выключен.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 60.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+
+        self._entries: "OrderedDict[Tuple[str, Hashable], CachedResponse]" = OrderedDict()
+        self._keys_by_user: Dict[str, Set[Hashable]] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.expired = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, user_id: str, key: Hashable, version: int) -> Optional[CachedResponse]:
+        """Ответ для текущей версии данных или None"""
+        entry = self._entries.get((user_id, key))
+        if entry is not None:
+            if entry.version != version:
+                self.stale += 1
+                self._discard(user_id, key)
+            elif entry.expires_at <= time.monotonic():
+                self.expired += 1
+                self._discard(user_id, key)
+            else:
+                self.hits += 1
+                self._entries.move_to_end((user_id, key))
+                return entry
+        self.misses += 1
+        return None
+
+    def put(self, user_id: str, key: Hashable, version: int,
+            content: Dict, body: bytes) -> CachedResponse:
+        """Запомнить ответ, посчитанный при версии version"""
+        entry = CachedResponse(version, time.monotonic() + self.ttl, content, body)
+        if not self.max_entries:
+            return entry
+        self._entries[(user_id, key)] = entry
+        self._entries.move_to_end((user_id, key))
+        self._keys_by_user.setdefault(user_id, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            (old_user, old_key), _ = self._entries.popitem(last=False)
+            self._forget(old_user, old_key)
+            self.evictions += 1
+        return entry
+
+    def invalidate(self, user_id: str) -> None:
+        """Сбросить все ответы пользователя"""
+        keys = self._keys_by_user.pop(user_id, None)
+        if not keys:
+            return
+        for key in keys:
+            self._entries.pop((user_id, key), None)
+        self.invalidations += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._keys_by_user.clear()
+
+    def stats(self) -> Dict:
+        """Счетчики для мониторинга"""
+        requests = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'ttl': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / requests, 4) if requests else 0.0,
+            'stale': self.stale,
+            'expired': self.expired,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations
+        }
+
+    def _discard(self, user_id: str, key: Hashable) -> None:
+        self._entries.pop((user_id, key), None)
+        self._forget(user_id, key)
+
+    def _forget(self, user_id: str, key: Hashable) -> None:
+        keys = self._keys_by_user.get(user_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_user[user_id]
+
+
+def create_statistics_cache() -> StatisticsCache:
+    """Кеш с настройками из STATS_CACHE_MAX_ENTRIES / STATS_CACHE_TTL"""
+    max_entries = int(os.getenv('STATS_CACHE_MAX_ENTRIES', '1024'))
+    ttl = float(os.getenv('STATS_CACHE_TTL', '60'))
+    return StatisticsCache(max_entries, ttl)
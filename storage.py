@@ -0,0 +1,616 @@
+#!/usr/bin/env python3
+"""
+Storage - Хранилище данных финансового трекера
+JSON: снимок данных + журнал изменений (append-only, JSON Lines)
+SQLite: таблицы с индексами по пользователю (STORAGE_BACKEND=sqlite)
+Sharded: отдельный файл на пользователя + индекс (STORAGE_BACKEND=sharded)
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from aggregates import (
+    append_transaction, build_rollups, build_totals, bump_version, empty_rollups, empty_totals,
+    ensure_next_id, ensure_rollups, ensure_totals, ensure_version, remove_transaction,
+    update_transaction
+)
+from timeline import ensure_sorted
+
+logger = logging.getLogger(__name__)
+
+
+def new_user_data() -> Dict:
+    """Данные нового пользователя"""
+    return {
+        'transactions': [],
+        'budgets': {},
+        'goals': [],
+        'currency': 'RUB',
+        'settings': {
+            'theme': 'light',
+            'notifications': True,
+            'language': 'ru'
+        },
+        'totals': empty_totals(),
+        'rollups': empty_rollups()
+    }
+
+
+def change_version(op: str, payload) -> Optional[int]:
+    """Версия документа после изменения (None - в записи ее нет)"""
+    if not isinstance(payload, dict):
+        return None
+    if op == 'budget':
+        payload = payload.get('budget') or {}
+    return payload.get('version')
+
+
+def apply_change(data: Dict, user_id: str, op: str, payload) -> bool:
+    """Применить одно изменение из журнала к данным.
+
+    Изменение, версия которого не больше версии документа, уже есть в
+    нем (например, журнал .compacting, свернутый в снимок перед
+    падением) и пропускается; возвращается False.
+    """
+    if user_id not in data:
+        data[user_id] = new_user_data()
+    user_data = data[user_id]
+
+    version = change_version(op, payload)
+    if version is not None and version <= user_data.get('version', 0):
+        return False
+
+    if op == 'transaction':
+        append_transaction(user_data, payload)
+    elif op == 'transaction_update':
+        update_transaction(user_data, payload['id'], payload['changes'])
+    elif op == 'transaction_delete':
+        remove_transaction(user_data, payload['id'])
+    elif op == 'goal':
+        user_data.setdefault('goals', []).append(payload)
+        bump_version(user_data, payload)
+    elif op == 'budget':
+        user_data.setdefault('budgets', {})[payload['category']] = payload['budget']
+        bump_version(user_data, payload['budget'])
+    else:
+        logger.warning(f"Неизвестная операция в журнале: {op}")
+    return True
+
+
+class BaseStore:
+    """Общий интерфейс хранилищ"""
+
+    def load(self) -> Dict:
+        """Данные, загружаемые при старте"""
+        raise NotImplementedError
+
+    def load_user(self, user_id: str) -> Optional[Dict]:
+        """Данные пользователя, которых нет в памяти (None - пользователь новый)"""
+        return None
+
+    # Пользователя можно выгрузить из памяти и подгрузить через load_user
+    lazy_loading = False
+
+    def append(self, user_id: str, op: str, payload) -> None:
+        """Сохранить одно изменение"""
+        raise NotImplementedError
+
+    def append_many(self, changes: List[Tuple[str, str, Any]]) -> None:
+        """Сохранить пачку изменений (user_id, op, payload)"""
+        for user_id, op, payload in changes:
+            self.append(user_id, op, payload)
+
+    def save(self, data: Dict) -> None:
+        """Сохранить данные целиком"""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class JsonStore(BaseStore):
+    """Снимок в JSON-файле и журнал изменений рядом с ним.
+
+    Каждое изменение дописывается в конец журнала одной строкой, поэтому
+    запись стоит O(1) и не зависит от объема данных. При загрузке журнал
+    воспроизводится поверх снимка. Когда журнал разрастается, он
+    сворачивается в новый снимок в фоновом потоке.
+    """
+
+    def __init__(self, data_file: str, compact_threshold: Optional[int] = None):
+        self.data_file = data_file
+        self.log_file = f"{data_file}.log"
+        # Журнал, который сейчас сворачивается в снимок
+        self.compacting_file = f"{data_file}.log.compacting"
+        if compact_threshold is None:
+            compact_threshold = int(os.getenv('STORAGE_COMPACT_THRESHOLD', '1000'))
+        self.compact_threshold = compact_threshold
+
+        self._lock = threading.Lock()
+        self._log = None
+        self._log_entries = 0
+        self._compactor: Optional[threading.Thread] = None
+
+    def load(self) -> Dict:
+        """Загрузка снимка и воспроизведение журнала"""
+        data = self._read_snapshot()
+        self._replay(self.compacting_file, data)
+        self._log_entries = self._replay(self.log_file, data)
+        # Порядок и итоги старых снимков, сохраненных без них
+        for user_data in data.values():
+            ensure_sorted(user_data)
+            ensure_totals(user_data)
+            ensure_rollups(user_data)
+            ensure_version(user_data)
+            ensure_next_id(user_data)
+        return data
+
+    def append(self, user_id: str, op: str, payload) -> None:
+        """Дописать изменение в журнал"""
+        self.append_many([(user_id, op, payload)])
+
+    def append_many(self, changes: List[Tuple[str, str, Any]]) -> None:
+        """Дописать пачку изменений в журнал одной записью"""
+        lines = ''.join(
+            json.dumps({'user_id': user_id, 'op': op, 'data': payload}, ensure_ascii=False) + '\n'
+            for user_id, op, payload in changes
+        )
+        with self._lock:
+            if self._log is None:
+                self._log = open(self.log_file, 'a', encoding='utf-8')
+            self._log.write(lines)
+            self._log.flush()
+            self._log_entries += len(changes)
+            need_compact = self._log_entries >= self.compact_threshold
+
+        if need_compact:
+            self.compact()
+
+    def compact(self) -> None:
+        """Запустить сворачивание журнала в снимок в фоновом потоке"""
+        with self._lock:
+            if self._compactor is not None and self._compactor.is_alive():
+                return
+
+            # Незавершенное сворачивание (например, после падения) доделываем
+            # до того, как отложить текущий журнал
+            if not os.path.exists(self.compacting_file):
+                if not os.path.exists(self.log_file):
+                    return
+                if self._log is not None:
+                    self._log.close()
+                    self._log = None
+                os.replace(self.log_file, self.compacting_file)
+                self._log_entries = 0
+
+            self._compactor = threading.Thread(
+                target=self._compact_worker,
+                name=f"compact-{os.path.basename(self.data_file)}"
+            )
+            self._compactor.start()
+
+    def save(self, data: Dict) -> None:
+        """Полная запись снимка, журнал после этого не нужен"""
+        self._wait_compactor()
+        with self._lock:
+            self._write_snapshot(data)
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+            for path in (self.compacting_file, self.log_file):
+                if os.path.exists(path):
+                    os.remove(path)
+            self._log_entries = 0
+
+    def close(self) -> None:
+        """Дождаться фонового сворачивания и закрыть журнал"""
+        self._wait_compactor()
+        with self._lock:
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+
+    def _wait_compactor(self) -> None:
+        compactor = self._compactor
+        if compactor is not None:
+            compactor.join()
+
+    def _compact_worker(self) -> None:
+        """Снимок + отложенный журнал -> новый снимок"""
+        try:
+            data = self._read_snapshot()
+            self._replay(self.compacting_file, data)
+            self._write_snapshot(data)
+            os.remove(self.compacting_file)
+            logger.info(f"Журнал {self.log_file} свернут в снимок")
+        except Exception as e:
+            logger.error(f"Ошибка сворачивания журнала {self.log_file}: {e}")
+
+    def _read_snapshot(self) -> Dict:
+        if os.path.exists(self.data_file):
+            try:
+                with open(self.data_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                # Версия нужна до воспроизведения журнала: по ней
+                # отбрасываются записи, уже вошедшие в снимок
+                for user_data in data.values():
+                    ensure_version(user_data)
+                return data
+            except Exception as e:
+                logger.error(f"Ошибка чтения {self.data_file}: {e}")
+        return {}
+
+    def _write_snapshot(self, data: Dict) -> None:
+        # Пишем во временный файл и атомарно подменяем снимок
+        tmp_file = f"{self.data_file}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_file, self.data_file)
+
+    def _replay(self, path: str, data: Dict) -> int:
+        """Воспроизвести журнал, вернуть число записей в нем"""
+        if not os.path.exists(path):
+            return 0
+
+        count = 0
+        skipped = 0
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # Оборванная последняя строка после аварийной остановки
+                    logger.warning(f"Пропущена поврежденная запись журнала {path}")
+                    continue
+                if not apply_change(data, entry['user_id'], entry['op'], entry['data']):
+                    skipped += 1
+                count += 1
+        if skipped:
+            logger.info(f"Журнал {path}: {skipped} записей уже были в снимке")
+        return count
+
+
+class SQLiteStore(BaseStore):
+    """Хранилище в SQLite (режим WAL).
+
+    Пользователи подгружаются по требованию; транзакции пользователя
+    читаются по индексу (user_id, timestamp) уже в порядке времени.
+    """
+
+    lazy_loading = True
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS settings (
+            user_id TEXT PRIMARY KEY,
+            currency TEXT NOT NULL,
+            data TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS transactions (
+            row_id INTEGER PRIMARY KEY,
+            user_id TEXT NOT NULL,
+            type TEXT NOT NULL,
+            category TEXT NOT NULL,
+            amount REAL NOT NULL,
+            timestamp REAL NOT NULL,
+            data TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_transactions_user_time
+            ON transactions (user_id, timestamp);
+        CREATE TABLE IF NOT EXISTS budgets (
+            user_id TEXT NOT NULL,
+            category TEXT NOT NULL,
+            data TEXT NOT NULL,
+            PRIMARY KEY (user_id, category)
+        );
+        CREATE TABLE IF NOT EXISTS goals (
+            row_id INTEGER PRIMARY KEY,
+            user_id TEXT NOT NULL,
+            data TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_goals_user ON goals (user_id);
+        CREATE TABLE IF NOT EXISTS deleted (
+            user_id TEXT NOT NULL,
+            transaction_id INTEGER,
+            version INTEGER NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_deleted_user ON deleted (user_id);
+    """
+
+    def __init__(self, db_file: str):
+        self.db_file = db_file
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_file, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(self.SCHEMA)
+        self._conn.commit()
+
+    def load(self) -> Dict:
+        """Пользователи загружаются по требованию через load_user"""
+        return {}
+
+    def is_empty(self) -> bool:
+        with self._lock:
+            return self._conn.execute('SELECT 1 FROM settings LIMIT 1').fetchone() is None
+
+    def load_user(self, user_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT currency, data FROM settings WHERE user_id = ?', (user_id,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            user_data = new_user_data()
+            user_data['currency'] = row[0]
+            user_data['settings'] = json.loads(row[1])
+            user_data['transactions'] = [
+                json.loads(data) for (data,) in self._conn.execute(
+                    'SELECT data FROM transactions WHERE user_id = ? ORDER BY timestamp, row_id', (user_id,)
+                )
+            ]
+            user_data['budgets'] = {
+                category: json.loads(data) for category, data in self._conn.execute(
+                    'SELECT category, data FROM budgets WHERE user_id = ?', (user_id,)
+                )
+            }
+            user_data['goals'] = [
+                json.loads(data) for (data,) in self._conn.execute(
+                    'SELECT data FROM goals WHERE user_id = ? ORDER BY row_id', (user_id,)
+                )
+            ]
+            user_data['deleted'] = [
+                {'id': transaction_id, 'version': version} for transaction_id, version in self._conn.execute(
+                    'SELECT transaction_id, version FROM deleted WHERE user_id = ? ORDER BY version', (user_id,)
+                )
+            ]
+            user_data['totals'] = build_totals(user_data['transactions'])
+            user_data['rollups'] = build_rollups(user_data['transactions'])
+            # Номер версии и счетчик id восстанавливаются по записям
+            ensure_version(user_data)
+            ensure_next_id(user_data)
+            return user_data
+
+    def append(self, user_id: str, op: str, payload) -> None:
+        self.append_many([(user_id, op, payload)])
+
+    def append_many(self, changes: List[Tuple[str, str, Any]]) -> None:
+        """Пачка изменений в одной транзакции"""
+        with self._lock:
+            with self._conn:
+                for user_id, op, payload in changes:
+                    self._ensure_user(user_id)
+                    self._apply(user_id, op, payload)
+
+    def save(self, data: Dict) -> None:
+        """Полная перезапись данных переданных пользователей"""
+        with self._lock:
+            with self._conn:
+                for user_id, user_data in data.items():
+                    for table in ('settings', 'transactions', 'budgets', 'goals', 'deleted'):
+                        self._conn.execute(f'DELETE FROM {table} WHERE user_id = ?', (user_id,))
+                    self._conn.execute(
+                        'INSERT INTO settings (user_id, currency, data) VALUES (?, ?, ?)',
+                        (user_id, user_data.get('currency', 'RUB'),
+                         json.dumps(user_data.get('settings', {}), ensure_ascii=False))
+                    )
+                    for transaction in user_data.get('transactions', []):
+                        self._apply(user_id, 'transaction', transaction)
+                    for goal in user_data.get('goals', []):
+                        self._apply(user_id, 'goal', goal)
+                    for category, budget in user_data.get('budgets', {}).items():
+                        self._apply(user_id, 'budget', {'category': category, 'budget': budget})
+                    for tombstone in user_data.get('deleted', []):
+                        self._conn.execute(
+                            'INSERT INTO deleted (user_id, transaction_id, version) VALUES (?, ?, ?)',
+                            (user_id, tombstone['id'], tombstone['version'])
+                        )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _ensure_user(self, user_id: str) -> None:
+        defaults = new_user_data()
+        self._conn.execute(
+            'INSERT OR IGNORE INTO settings (user_id, currency, data) VALUES (?, ?, ?)',
+            (user_id, defaults['currency'], json.dumps(defaults['settings'], ensure_ascii=False))
+        )
+
+    def _apply(self, user_id: str, op: str, payload) -> None:
+        if op == 'transaction':
+            self._conn.execute(
+                'INSERT INTO transactions (user_id, type, category, amount, timestamp, data) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (user_id, payload['type'], payload['category'], payload['amount'],
+                 payload['timestamp'], json.dumps(payload, ensure_ascii=False))
+            )
+        elif op == 'transaction_update':
+            row = self._conn.execute(
+                "SELECT row_id, data FROM transactions WHERE user_id = ? AND json_extract(data, '$.id') = ?",
+                (user_id, payload['id'])
+            ).fetchone()
+            if row is not None:
+                transaction = json.loads(row[1])
+                transaction.update(payload['changes'])
+                self._conn.execute(
+                    'UPDATE transactions SET type = ?, category = ?, amount = ?, timestamp = ?, data = ? '
+                    'WHERE row_id = ?',
+                    (transaction['type'], transaction['category'], transaction['amount'],
+                     transaction['timestamp'], json.dumps(transaction, ensure_ascii=False), row[0])
+                )
+        elif op == 'transaction_delete':
+            deleted = self._conn.execute(
+                "DELETE FROM transactions WHERE user_id = ? AND json_extract(data, '$.id') = ?",
+                (user_id, payload['id'])
+            ).rowcount
+            if deleted and 'version' in payload:
+                # Отметка об удалении для разностной синхронизации
+                self._conn.execute(
+                    'INSERT INTO deleted (user_id, transaction_id, version) VALUES (?, ?, ?)',
+                    (user_id, payload['id'], payload['version'])
+                )
+        elif op == 'goal':
+            self._conn.execute(
+                'INSERT INTO goals (user_id, data) VALUES (?, ?)',
+                (user_id, json.dumps(payload, ensure_ascii=False))
+            )
+        elif op == 'budget':
+            self._conn.execute(
+                'INSERT OR REPLACE INTO budgets (user_id, category, data) VALUES (?, ?, ?)',
+                (user_id, payload['category'], json.dumps(payload['budget'], ensure_ascii=False))
+            )
+        else:
+            logger.warning(f"Неизвестная операция: {op}")
+
+
+class ShardedJsonStore(BaseStore):
+    """Отдельный файл (снимок + журнал) на каждого пользователя.
+
+    При старте читается только индекс пользователей, документ
+    пользователя загружается при первом обращении, а запись затрагивает
+    только его файл. Файлы раскладываются по 256 каталогам по хешу id.
+    """
+
+    lazy_loading = True
+
+    SAFE_NAME = re.compile(r'[\w.-]{1,100}')
+
+    def __init__(self, data_dir: str, max_open_shards: Optional[int] = None):
+        self.data_dir = data_dir
+        self.index_file = os.path.join(data_dir, 'index.jsonl')
+        if max_open_shards is None:
+            max_open_shards = int(os.getenv('STORAGE_OPEN_SHARDS', '256'))
+        self.max_open_shards = max_open_shards
+        os.makedirs(data_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        # user_id -> путь к файлу пользователя относительно data_dir
+        self._index: Dict[str, str] = {}
+        # Открытые файлы пользователей, давно не использованные закрываются
+        self._shards: "OrderedDict[str, JsonStore]" = OrderedDict()
+
+    def load(self) -> Dict:
+        """Чтение индекса, документы загружаются через load_user"""
+        index = {}
+        if os.path.exists(self.index_file):
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        logger.warning(f"Пропущена поврежденная запись индекса {self.index_file}")
+                        continue
+                    index[entry['user_id']] = entry['path']
+        with self._lock:
+            self._index = index
+        logger.info(f"Индекс {self.index_file}: {len(index)} пользователей")
+        return {}
+
+    def is_empty(self) -> bool:
+        return not os.path.exists(self.index_file)
+
+    def users(self) -> List[str]:
+        with self._lock:
+            return list(self._index)
+
+    def load_user(self, user_id: str) -> Optional[Dict]:
+        with self._lock:
+            known = user_id in self._index
+        if not known:
+            return None
+        return self._shard(user_id).load().get(user_id)
+
+    def append(self, user_id: str, op: str, payload) -> None:
+        self.append_many([(user_id, op, payload)])
+
+    def append_many(self, changes: List[Tuple[str, str, Any]]) -> None:
+        by_user: Dict[str, List[Tuple[str, str, Any]]] = {}
+        for change in changes:
+            by_user.setdefault(change[0], []).append(change)
+        for user_id, user_changes in by_user.items():
+            self._shard(user_id).append_many(user_changes)
+
+    def save(self, data: Dict) -> None:
+        """Перезапись файлов переданных пользователей"""
+        for user_id, user_data in data.items():
+            self._shard(user_id).save({user_id: user_data})
+
+    def close(self) -> None:
+        with self._lock:
+            shards = list(self._shards.values())
+            self._shards.clear()
+        for shard in shards:
+            shard.close()
+
+    def _shard(self, user_id: str) -> JsonStore:
+        """Хранилище пользователя (новый пользователь добавляется в индекс)"""
+        evicted = None
+        with self._lock:
+            shard = self._shards.get(user_id)
+            if shard is not None:
+                self._shards.move_to_end(user_id)
+                return shard
+
+            path = self._index.get(user_id)
+            if path is None:
+                path = self._shard_path(user_id)
+                os.makedirs(os.path.join(self.data_dir, os.path.dirname(path)), exist_ok=True)
+                with open(self.index_file, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps({'user_id': user_id, 'path': path}, ensure_ascii=False) + '\n')
+                self._index[user_id] = path
+
+            shard = JsonStore(os.path.join(self.data_dir, path))
+            self._shards[user_id] = shard
+            if len(self._shards) > self.max_open_shards:
+                _, evicted = self._shards.popitem(last=False)
+
+        if evicted is not None:
+            evicted.close()
+        return shard
+
+    def _shard_path(self, user_id: str) -> str:
+        digest = hashlib.sha1(user_id.encode('utf-8')).hexdigest()
+        name = user_id if self.SAFE_NAME.fullmatch(user_id) else digest
+        return os.path.join(digest[:2], f"{name}.json")
+
+
+def create_store(data_file: str) -> BaseStore:
+    """Хранилище, выбранное переменной окружения STORAGE_BACKEND (json/sqlite/sharded)"""
+    backend = os.getenv('STORAGE_BACKEND', 'json').lower()
+    has_json_data = os.path.exists(data_file) or os.path.exists(f"{data_file}.log")
+
+    if backend == 'sqlite':
+        db_file = f"{os.path.splitext(data_file)[0]}.db"
+        store = SQLiteStore(db_file)
+        # Первый запуск на SQLite: переносим накопленные JSON-данные
+        if store.is_empty() and has_json_data:
+            logger.info(f"Перенос данных из {data_file} в {db_file}")
+            store.save(JsonStore(data_file).load())
+        return store
+
+    if backend == 'sharded':
+        data_dir = f"{os.path.splitext(data_file)[0]}_shards"
+        store = ShardedJsonStore(data_dir)
+        # Первый запуск: раскладываем общий файл по пользователям
+        if store.is_empty() and has_json_data:
+            logger.info(f"Перенос данных из {data_file} в {data_dir}")
+            store.save(JsonStore(data_file).load())
+        return store
+
+    if backend != 'json':
+        logger.warning(f"Неизвестное хранилище {backend}, используется json")
+    return JsonStore(data_file)
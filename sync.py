@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Sync - Разностная синхронизация данных пользователя
+Каждая запись (транзакция, цель, бюджет, отметка об удалении) хранит
+версию документа, при которой она изменилась последний раз, поэтому
+клиенту с версией since отдаются только записи новее нее
+"""
+
+import hashlib
+from typing import Dict, Hashable, Optional
+
+from aggregates import ensure_version
+
+
+def changes_since(user_data: Dict, since: Optional[int] = None) -> Dict:
+    """Изменения после версии since.
+
+    Если since не задан или не совпадает с историей сервера (больше
+    текущей версии), возвращаются все данные с full=True.
+    """
+    version = ensure_version(user_data)
+    full = since is None or since <= 0 or since > version
+    if full:
+        transactions = user_data.get('transactions', [])
+        goals = user_data.get('goals', [])
+        budgets = user_data.get('budgets', {})
+        deleted = []
+    else:
+        transactions = [t for t in user_data.get('transactions', []) if t.get('version', 0) > since]
+        goals = [g for g in user_data.get('goals', []) if g.get('version', 0) > since]
+        budgets = {
+            category: budget for category, budget in user_data.get('budgets', {}).items()
+            if budget.get('version', 0) > since
+        }
+        deleted = [d['id'] for d in user_data.get('deleted', []) if d['version'] > since]
+
+    return {
+        'version': version,
+        'full': full,
+        'transactions': transactions,
+        'goals': goals,
+        'budgets': budgets,
+        'deleted': {'transactions': deleted},
+        'currency': user_data['currency'],
+        'settings': user_data.get('settings', {})
+    }
+
+
+def version_etag(version: int, key: Optional[Hashable] = None) -> str:
+    """ETag ответа, который однозначно определяется версией данных и ключом запроса"""
+    if key is None:
+        return f'"v{version}"'
+    digest = hashlib.md5(repr(key).encode()).hexdigest()[:12]
+    return f'"v{version}-{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Заголовок If-None-Match совпадает с текущим ETag"""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(',')]
+    return '*' in candidates or etag in candidates or f'W/{etag}' in candidates
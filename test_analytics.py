@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Тесты аналитики: колонки NumPy совпадают с расчетом на Python и
+обновляются по версии документа
+"""
+
+import copy
+import random
+
+import pytest
+
+from aggregates import append_transaction, new_transaction_id, update_transaction
+from analytics import AnalyticsEngine, python_summary
+from storage import new_user_data
+
+pytest.importorskip('numpy')
+
+CATEGORIES = ('food', 'transport', 'salary', 'gifts')
+
+
+def _user(count: int, seed: int = 1) -> dict:
+    rng = random.Random(seed)
+    user_data = new_user_data()
+    for _ in range(count):
+        _append(user_data, rng)
+    return user_data
+
+
+def _append(user_data: dict, rng: random.Random, timestamp: float = None) -> dict:
+    transaction = {
+        'id': new_transaction_id(user_data),
+        'type': rng.choice(('income', 'expense')),
+        'category': rng.choice(CATEGORIES),
+        'amount': float(rng.randint(1, 1000)),
+        'description': '',
+        'timestamp': timestamp if timestamp is not None else 1700000000 + rng.randint(0, 10 ** 6)
+    }
+    append_transaction(user_data, transaction)
+    return transaction
+
+
+def _rounded(summary: dict) -> dict:
+    summary = copy.deepcopy(summary)
+    for key in ('total_income', 'total_expenses', 'balance'):
+        summary[key] = round(summary[key], 6)
+    for items in summary['categories'].values():
+        for item in items:
+            item[1] = round(item[1], 6)
+    return summary
+
+
+def test_columns_match_python_summary():
+    user_data = _user(300)
+    engine = AnalyticsEngine(threshold=1)
+    start, end = 1700200000, 1700800000
+
+    columnar = engine.summary('u1', user_data, start, end, top=3)
+    window = [t for t in user_data['transactions'] if start <= t['timestamp'] < end]
+    expected = python_summary(window, top=3)
+    assert _rounded(columnar) == _rounded(expected)
+    assert [t['id'] for t in columnar['largest_expenses']] == [t['id'] for t in expected['largest_expenses']]
+
+
+def test_columns_follow_document_version():
+    rng = random.Random(2)
+    user_data = _user(50)
+    engine = AnalyticsEngine(threshold=1)
+    columns = engine.columns('u1', user_data)
+
+    # Перезагрузка из хранилища: новые объекты, та же версия - колонки те же
+    reloaded = copy.deepcopy(user_data)
+    assert engine.columns('u1', reloaded) is columns
+
+    # Добавление в конец после перезагрузки дописывает колонки
+    _append(reloaded, rng, timestamp=1800000000)
+    assert engine.columns('u1', reloaded) is columns
+    assert columns.size == 51
+
+    # Изменение без роста истории - новая версия, колонки перестраиваются
+    first = reloaded['transactions'][0]
+    update_transaction(reloaded, first['id'], {'amount': first['amount'] + 1})
+    rebuilt = engine.columns('u1', reloaded)
+    assert rebuilt is not columns
+    assert _rounded(engine.summary('u1', reloaded)) == _rounded(python_summary(reloaded['transactions']))
+
+    # Вставка в середину истории тоже перестраивает колонки
+    _append(reloaded, rng, timestamp=1600000000)
+    assert engine.columns('u1', reloaded) is not rebuilt
+    assert _rounded(engine.summary('u1', reloaded)) == _rounded(python_summary(reloaded['transactions']))
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Тесты пакетного добавления транзакций: id, atomic и разбор запроса
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from aggregates import remove_transaction
+from batch import add_batch
+from storage import new_user_data
+
+
+def _item(amount=100, **fields) -> dict:
+    return {'type': 'expense', 'category': 'food', 'amount': amount, **fields}
+
+
+def test_batch_assigns_sequential_ids():
+    user_data = new_user_data()
+    transactions, results = add_batch(user_data, [_item(), _item(-5), _item(200, timestamp=1700000000)])
+
+    assert [t['id'] for t in transactions] == [1, 2]
+    assert [r['success'] for r in results] == [True, False, True]
+    assert [r.get('id') for r in results] == [1, None, 2]
+    assert user_data['totals']['expenses'] == 300.0
+
+    transactions, _ = add_batch(user_data, [_item(), _item()])
+    assert [t['id'] for t in transactions] == [3, 4]
+
+
+def test_atomic_batch_adds_nothing_on_error():
+    user_data = new_user_data()
+    add_batch(user_data, [_item()])
+    version = user_data['version']
+
+    transactions, results = add_batch(user_data, [_item(), _item(float('inf')), 'x'], atomic=True)
+    assert transactions == []
+    assert [r['success'] for r in results] == [True, False, False]
+    assert len(user_data['transactions']) == 1
+    assert user_data['totals']['expenses'] == 100.0
+    assert user_data['version'] == version
+
+
+@pytest.fixture(params=['app', 'telegram_app'])
+def client(request, workdir):
+    module = __import__(request.param)
+    app = module.FinanceApp() if request.param == 'app' else module.TelegramFinanceApp()
+    with TestClient(app.app) as client:
+        yield client
+
+
+@pytest.mark.parametrize('body', [b'{', b'[]', b'"x"', b'null', b'\xff'])
+def test_batch_route_rejects_malformed_body(client, body):
+    response = client.post('/api/transactions/batch', content=body,
+                           headers={'Content-Type': 'application/json'})
+    assert response.status_code == 400
+
+
+def test_batch_route_atomic(client):
+    response = client.post('/api/transactions/batch', json={
+        'user_id': 'u1', 'atomic': True, 'transactions': [_item(), _item('nan')]
+    })
+    assert response.status_code == 400
+    assert response.json()['accepted'] == 0
+    assert client.get('/api/user/u1').json()['transactions'] == []
+
+    response = client.post('/api/transactions/batch', json={
+        'user_id': 'u1', 'atomic': True, 'transactions': [_item(), _item(50)]
+    })
+    assert response.status_code == 200
+    assert response.json()['accepted'] == 2
+    assert [t['amount'] for t in client.get('/api/user/u1').json()['transactions']] == [100.0, 50.0]
+
+
+@pytest.mark.parametrize('amount', ['inf', '-inf', 'nan', 0])
+def test_transaction_route_rejects_bad_amount(client, amount):
+    response = client.post('/api/transaction', json={
+        'user_id': 'u1', 'type': 'expense', 'category': 'food', 'amount': amount
+    })
+    assert response.status_code == 400
+
+
+def test_batch_ids_continue_after_delete():
+    user_data = new_user_data()
+    add_batch(user_data, [_item(), _item(), _item()])
+    remove_transaction(user_data, 3)
+
+    transactions, _ = add_batch(user_data, [_item(), _item()])
+    assert [t['id'] for t in transactions] == [4, 5]
+    assert len({t['id'] for t in user_data['transactions']}) == 4
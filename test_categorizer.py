@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Тесты автокатегоризации: автомат ключевых слов, словарь и правила пользователя
+"""
+
+from fastapi.testclient import TestClient
+
+from categories import CATEGORIES
+from categorizer import DEFAULT_CATEGORY, Categorizer, KeywordMatcher
+from storage import new_user_data
+
+
+def test_keywords_match_from_word_start():
+    matcher = KeywordMatcher([('такси', 'transport'), ('кафе', 'food'), ('кафетерий', 'other')])
+    assert matcher.best('такси домой') == 'transport'
+    assert matcher.best('таксист') == 'transport'
+    assert matcher.best('фитакси') is None
+    # Самое длинное слово важнее первого
+    assert matcher.best('кафетерий у метро') == 'other'
+    assert [start for start, _, _ in matcher.find('кафе и кафе')] == [0, 7]
+
+
+def test_overlapping_keywords():
+    matcher = KeywordMatcher([('he', 1), ('she', 2), ('hers', 3)])
+    assert sorted(keyword for _, keyword, _ in matcher.find('ushers')) == []
+    assert sorted(keyword for _, keyword, _ in matcher.find('she hers')) == ['he', 'hers', 'she']
+
+
+def test_dictionary_categories():
+    categorizer = Categorizer(CATEGORIES)
+    assert categorizer.categorize('expense', 'Обед в кафе') == 'food'
+    assert categorizer.categorize('expense', 'ТАКСИ до аэропорта') == 'transport'
+    assert categorizer.categorize('expense', 'Перевод Пете') == DEFAULT_CATEGORY
+    assert categorizer.categorize('income', 'Зарплата за март') == 'salary'
+    # Подпись категории без эмодзи тоже ключевое слово
+    assert categorizer.categorize('expense', 'здоровье') == 'health'
+    assert categorizer.categorize('expense', '') == DEFAULT_CATEGORY
+    assert categorizer.categorize('unknown', 'кафе') == DEFAULT_CATEGORY
+
+
+def test_user_rules_override_dictionary():
+    categorizer = Categorizer(CATEGORIES)
+    user_data = new_user_data()
+    user_data['transactions'] = [
+        {'type': 'expense', 'category': 'business', 'description': 'Кофе для офиса'},
+        # Автоматический выбор и 'other' не становятся правилами
+        {'type': 'expense', 'category': 'gifts', 'description': 'такси', 'auto_category': True},
+        {'type': 'expense', 'category': DEFAULT_CATEGORY, 'description': 'метро'},
+    ]
+    assert categorizer.categorize('expense', 'кофе', 'u1', user_data) == 'business'
+    assert categorizer.categorize('expense', 'такси', 'u1', user_data) == 'transport'
+    assert categorizer.categorize('expense', 'метро', 'u1', user_data) == 'transport'
+    # Правила одного пользователя не влияют на другого
+    assert categorizer.categorize('expense', 'кофе', 'u2', new_user_data()) == 'food'
+
+    categorizer.learn('u1', {'type': 'expense', 'category': 'gifts', 'description': 'Цветы маме'})
+    assert categorizer.categorize('expense', 'маме', 'u1', user_data) == 'gifts'
+
+
+def test_rules_cache_bounded():
+    categorizer = Categorizer(CATEGORIES, max_users=2)
+    for user_id in ('u1', 'u2', 'u3'):
+        categorizer.categorize('expense', 'кофе', user_id, new_user_data())
+    assert list(categorizer._rules) == ['u2', 'u3']
+
+
+def test_route_fills_missing_category(workdir):
+    import app as app_module
+
+    app = app_module.FinanceApp()
+    with TestClient(app.app) as client:
+        response = client.post('/api/transaction', json={
+            'user_id': 'u1', 'type': 'expense', 'amount': 300, 'description': 'Такси домой'
+        })
+        transaction = response.json()['transaction']
+        assert (transaction['category'], transaction['auto_category']) == ('transport', True)
+
+        # Выбранная пользователем категория запоминается для похожих описаний
+        client.post('/api/transaction', json={
+            'user_id': 'u1', 'type': 'expense', 'category': 'business', 'amount': 300,
+            'description': 'Такси к клиенту'
+        })
+        response = client.post('/api/transaction', json={
+            'user_id': 'u1', 'type': 'expense', 'amount': 300, 'description': 'клиенту'
+        })
+        assert response.json()['transaction']['category'] == 'business'
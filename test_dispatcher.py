@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Тесты обработки обновлений: порядок внутри пользователя и лимит принятых
+"""
+
+import asyncio
+
+import pytest
+from telegram import Update
+
+from dispatcher import PerUserUpdateProcessor
+from webhook import FakeTelegramSender
+
+sender = FakeTelegramSender()
+
+
+def _update(user_id: int, text: str = '/start') -> Update:
+    return Update.de_json(sender.build_message(user_id, text), None)
+
+
+def test_per_user_order_and_parallel_users():
+    async def scenario():
+        processor = PerUserUpdateProcessor(max_concurrent=4, max_pending=100)
+        log = []
+
+        async def handle(user_id: int, n: int, delay: float):
+            log.append(('start', user_id, n))
+            await asyncio.sleep(delay)
+            log.append(('end', user_id, n))
+
+        await asyncio.gather(
+            processor.process_update(_update(1), handle(1, 1, 0.05)),
+            processor.process_update(_update(1), handle(1, 2, 0)),
+            processor.process_update(_update(2), handle(2, 1, 0)),
+        )
+        user1 = [entry for entry in log if entry[1] == 1]
+        assert user1 == [('start', 1, 1), ('end', 1, 1), ('start', 1, 2), ('end', 1, 2)]
+        # Второй пользователь не ждал медленное обновление первого
+        assert log.index(('end', 2, 1)) < log.index(('end', 1, 1))
+        assert processor.stats()['processed'] == 3
+        assert processor.stats()['users'] == 0
+
+    asyncio.run(scenario())
+
+
+def test_admission_limit_and_release():
+    async def scenario():
+        processor = PerUserUpdateProcessor(max_concurrent=2, max_pending=2)
+        queue = processor.update_queue()
+        first, second = _update(1), _update(2)
+        queue.put_nowait(first)
+        queue.put_nowait(second)
+        with pytest.raises(asyncio.QueueFull):
+            queue.put_nowait(_update(3))
+        assert processor.stats()['rejected'] == 1
+
+        # Обработка освобождает место, в том числе при ошибке обработчика
+        async def fail():
+            raise RuntimeError("сбой")
+
+        with pytest.raises(RuntimeError):
+            await processor.process_update(queue.get_nowait(), fail())
+        queue.put_nowait(_update(3))
+        assert processor.stats()['admitted'] == 2
+
+        # put ждет места, а не отклоняет обновление
+        waiting = asyncio.create_task(queue.put(_update(4)))
+        await asyncio.sleep(0)
+        assert not waiting.done()
+
+        async def noop():
+            pass
+
+        await processor.process_update(queue.get_nowait(), noop())
+        await asyncio.wait_for(waiting, 1)
+        assert queue.qsize() == 2
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_update_releases_slot():
+    async def scenario():
+        processor = PerUserUpdateProcessor(max_concurrent=2, max_pending=2)
+        queue = processor.update_queue()
+        for _ in range(2):
+            queue.put_nowait(_update(1))
+
+        started = asyncio.Event()
+
+        async def slow():
+            started.set()
+            await asyncio.sleep(10)
+
+        async def noop():
+            pass
+
+        first = asyncio.create_task(processor.process_update(queue.get_nowait(), slow()))
+        await started.wait()
+        # Второе обновление того же пользователя ждет своей очереди
+        second = asyncio.create_task(processor.process_update(queue.get_nowait(), noop()))
+        await asyncio.sleep(0)
+        second.cancel()
+        first.cancel()
+        await asyncio.gather(first, second, return_exceptions=True)
+        assert processor.stats()['admitted'] == 0
+        assert processor.stats()['users'] == 0
+
+    asyncio.run(scenario())
+
+
+def test_shutdown_releases_queued_updates():
+    async def scenario():
+        processor = PerUserUpdateProcessor(max_concurrent=2, max_pending=2)
+        queue = processor.update_queue()
+        queue.put_nowait(_update(1))
+        queue.put_nowait(_update(2))
+        with pytest.raises(asyncio.QueueFull):
+            queue.put_nowait(_update(3))
+
+        # Application остановлен, не забрав обновления из очереди
+        await processor.shutdown()
+        assert queue.empty()
+        assert processor.stats()['admitted'] == 0
+        queue.put_nowait(_update(3))
+        queue.put_nowait(_update(4))
+
+    asyncio.run(scenario())
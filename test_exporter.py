@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Тесты выгрузки: CSV, JSON Lines, колоночный формат и маршрут /api/export
+"""
+
+import csv
+import io
+import json
+import struct
+import sys
+from array import array
+
+import pytest
+from fastapi.testclient import TestClient
+
+from exporter import COLUMNAR_COLUMNS, COLUMNAR_MAGIC, iter_columnar, iter_csv, iter_export, iter_jsonl
+
+TRANSACTIONS = [
+    {'id': 1, 'type': 'expense', 'category': 'food', 'amount': 150.5, 'description': 'Обед, "кафе"',
+     'date': '2024-03-05T12:00:00', 'timestamp': 1709629200.0},
+    {'id': 2, 'type': 'income', 'category': 'salary', 'amount': 50000.0, 'description': '',
+     'date': '2024-03-06T09:00:00', 'timestamp': 1709704800.0},
+    {'id': None, 'type': 'expense', 'category': 'food', 'amount': 99.0, 'description': 'Кофе\nс собой',
+     'date': '2024-03-07T08:00:00', 'timestamp': 1709787600.0},
+]
+
+
+def read_columnar(data: bytes) -> dict:
+    """Разбор колоночного формата по описанию в exporter.py"""
+    assert data.startswith(COLUMNAR_MAGIC)
+    offset = len(COLUMNAR_MAGIC)
+    (header_size,) = struct.unpack_from('<I', data, offset)
+    offset += 4
+    header = json.loads(data[offset:offset + header_size])
+    offset += header_size
+
+    columns = {}
+    for (name, typecode, _), column in zip(COLUMNAR_COLUMNS, header['columns']):
+        assert column['name'] == name
+        values = array(typecode)
+        size = values.itemsize * header['count']
+        values.frombytes(data[offset:offset + size])
+        if sys.byteorder == 'big':
+            values.byteswap()
+        columns[name] = list(values)
+        offset += size
+    assert offset == len(data)
+    return {'header': header, 'columns': columns}
+
+
+def test_csv_chunks():
+    chunks = list(iter_csv(TRANSACTIONS, chunk_rows=2))
+    assert len(chunks) == 2
+    rows = list(csv.DictReader(io.StringIO(b''.join(chunks).decode('utf-8'))))
+    assert [row['id'] for row in rows] == ['1', '2', '']
+    assert rows[0]['description'] == 'Обед, "кафе"'
+    assert rows[2]['description'] == 'Кофе\nс собой'
+    assert float(rows[1]['amount']) == 50000.0
+
+
+def test_jsonl_roundtrip():
+    chunks = list(iter_jsonl(TRANSACTIONS, chunk_rows=2))
+    assert len(chunks) == 2
+    lines = b''.join(chunks).decode('utf-8').splitlines()
+    assert [json.loads(line) for line in lines] == TRANSACTIONS
+    assert list(iter_jsonl([])) == []
+
+
+def test_columnar_layout():
+    exported = read_columnar(b''.join(iter_columnar(TRANSACTIONS, chunk_rows=2)))
+    header, columns = exported['header'], exported['columns']
+    assert header['count'] == 3
+    assert header['categories'] == ['food', 'salary']
+    assert columns['id'] == [1, 2, -1]
+    assert columns['amount'] == [150.5, 50000.0, 99.0]
+    assert columns['timestamp'] == [t['timestamp'] for t in TRANSACTIONS]
+    assert [header['types'][code] for code in columns['type']] == ['expense', 'income', 'expense']
+    assert [header['categories'][code] for code in columns['category']] == ['food', 'salary', 'food']
+
+    empty = read_columnar(b''.join(iter_columnar([])))
+    assert empty['header']['count'] == 0
+
+    with pytest.raises(ValueError):
+        iter_export(TRANSACTIONS, 'xml')
+
+
+def test_export_route(workdir):
+    import app as app_module
+
+    app = app_module.FinanceApp()
+    with TestClient(app.app) as client:
+        for amount in (100, 200, 300):
+            client.post('/api/transaction', json={
+                'user_id': 'u1', 'type': 'expense', 'category': 'food', 'amount': amount
+            })
+
+        response = client.get('/api/export/u1')
+        assert response.status_code == 200
+        assert response.headers['content-type'].startswith('text/csv')
+        assert 'transactions_u1.csv' in response.headers['content-disposition']
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert [float(row['amount']) for row in rows] == [100.0, 200.0, 300.0]
+
+        response = client.get('/api/export/u1?format=columnar')
+        assert read_columnar(response.content)['columns']['id'] == [1, 2, 3]
+
+        lines = client.get('/api/export/u1?format=jsonl&from=0&to=1').text.splitlines()
+        assert lines == []
+
+        assert client.get('/api/export/u1?format=xml').status_code == 400
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Тесты импорта выписок: разбор строк, дат и сумм, пачки и маршрут импорта
+"""
+
+import io
+import json
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+
+from categories import CATEGORIES
+from importer import (
+    ImportReport, category_lookup, import_file, iter_chunks, map_row, parse_amount, parse_timestamp,
+    read_rows
+)
+from storage import JsonStore
+
+LOOKUP = category_lookup(CATEGORIES)
+
+CSV_STATEMENT = (
+    "Дата операции;Сумма;Категория;Описание\n"
+    "05.03.2024 12:30;-1 250,50;🍔 Еда;Обед\n"
+    "2024-03-06;50000;Зарплата;Аванс\n"
+    "вчера;-100;еда;Неверная дата\n"
+    "07.03.2024;-300;Неизвестная;Разное\n"
+)
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('1 234,56', 1234.56), ('-500.00', -500.0), (42, 42.0), ('1\xa0000', 1000.0),
+    ('', None), (None, None), ('abc', None)
+])
+def test_parse_amount(value, expected):
+    assert parse_amount(value) == expected
+
+
+def test_parse_timestamp():
+    assert parse_timestamp(1700000000) == 1700000000.0
+    assert parse_timestamp('1700000000.5') == 1700000000.5
+    assert parse_timestamp('2024-03-05T12:30:00') == datetime(2024, 3, 5, 12, 30).timestamp()
+    assert parse_timestamp('05.03.2024 12:30') == datetime(2024, 3, 5, 12, 30).timestamp()
+    assert parse_timestamp('05.03.2024') == datetime(2024, 3, 5).timestamp()
+    assert parse_timestamp('') is None
+    # Неразобранное время остается строкой - его отклонит проверка пачки
+    assert parse_timestamp('вчера') == 'вчера'
+
+
+def test_map_row():
+    row = {'Дата': '05.03.2024', 'Сумма': '-1 250,50', 'Категория': '🍔 Еда', 'Описание': 'Обед'}
+    assert map_row(row, LOOKUP) == {
+        'type': 'expense', 'category': 'food', 'amount': 1250.5, 'description': 'Обед',
+        'timestamp': datetime(2024, 3, 5).timestamp()
+    }
+
+    # Тип из колонки важнее знака, категория по подписи без эмодзи
+    item = map_row({'type': 'Зачисление', 'amount': '-10', 'category': 'зарплата'}, LOOKUP)
+    assert (item['type'], item['amount'], item['category']) == ('income', 10.0, 'salary')
+
+    item = map_row({'amount': '-10', 'category': 'нет такой', None: 'лишнее'}, LOOKUP)
+    assert (item['type'], item['category'], item['timestamp']) == ('expense', 'other', None)
+
+
+def test_read_rows():
+    rows = list(read_rows(io.StringIO(CSV_STATEMENT), 'csv'))
+    assert len(rows) == 4
+    assert rows[0]['Сумма'] == '-1 250,50'
+
+    lines = ['{"amount": 1}\n', '\n', '{broken\n', '{"amount": 2}\n']
+    assert list(read_rows(lines, 'jsonl')) == [{'amount': 1}, None, {'amount': 2}]
+
+    with pytest.raises(ValueError):
+        list(read_rows([], 'xml'))
+
+
+def test_chunks_and_report():
+    chunks = list(iter_chunks(io.StringIO(CSV_STATEMENT), 'csv', LOOKUP, chunk_size=3))
+    assert [len(chunk) for chunk in chunks] == [3, 1]
+
+    report = ImportReport()
+    report.add([{'index': 0, 'success': True}, {'index': 1, 'success': False, 'error': 'Неверное время'}])
+    report.add([{'index': 0, 'success': False, 'error': 'Неверная сумма'}])
+    assert report.to_dict() == {
+        'rows': 3, 'imported': 1, 'rejected': 2,
+        'errors': [{'row': 2, 'error': 'Неверное время'}, {'row': 3, 'error': 'Неверная сумма'}]
+    }
+
+
+def test_import_file(tmp_path):
+    path = tmp_path / 'statement.csv'
+    path.write_text(CSV_STATEMENT, encoding='utf-8-sig')
+    data_file = str(tmp_path / 'data.json')
+
+    store = JsonStore(data_file)
+    report = import_file(store, 'u1', str(path), 'csv', CATEGORIES, chunk_size=2)
+    store.close()
+    assert report.to_dict() == {
+        'rows': 4, 'imported': 3, 'rejected': 1, 'errors': [{'row': 3, 'error': 'Неверное время'}]
+    }
+
+    user_data = JsonStore(data_file).load()['u1']
+    assert [(t['id'], t['category']) for t in user_data['transactions']] == [
+        (1, 'food'), (2, 'salary'), (3, 'other')
+    ]
+    assert user_data['totals']['expenses'] == 1550.5
+    assert user_data['totals']['income'] == 50000.0
+
+
+def test_import_route(workdir):
+    import telegram_app
+
+    app = telegram_app.TelegramFinanceApp()
+    lines = '\n'.join(json.dumps(item, ensure_ascii=False) for item in (
+        {'date': '2024-03-05', 'amount': -200, 'description': 'Такси', 'category': 'транспорт'},
+        {'date': '2024-03-06', 'type': 'расход', 'amount': 'много'},
+    ))
+    with TestClient(app.app) as client:
+        response = client.post('/api/import/u1', files={'file': ('export.jsonl', lines.encode())})
+        assert response.status_code == 200
+        report = response.json()
+        assert (report['imported'], report['rejected']) == (1, 1)
+        assert report['errors'] == [{'row': 2, 'error': 'Неверная сумма'}]
+
+        transactions = client.get('/api/user/u1').json()['transactions']
+        assert [(t['category'], t['amount']) for t in transactions] == [('transport', 200.0)]
+        assert report['version'] == 1
+
+        response = client.post('/api/import/u1?format=xml', files={'file': ('a.xml', b'')})
+        assert response.status_code == 400
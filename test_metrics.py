@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Тесты метрик: формат Prometheus, метки маршрутов и middleware
+"""
+
+import asyncio
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from metrics import AppMetrics, Counter, Histogram, MetricsMiddleware
+
+
+def _app():
+    metrics = AppMetrics()
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware, metrics=metrics)
+
+    @app.get('/api/user/{user_id}')
+    async def get_user(user_id: str):
+        return {'user_id': user_id}
+
+    @app.get('/fail')
+    async def fail():
+        raise RuntimeError("сбой")
+
+    return app, metrics
+
+
+def test_histogram_render():
+    histogram = Histogram('latency', 'Задержка', ('route',), buckets=(0.1, 1.0))
+    histogram.observe(0.05, ('a',))
+    histogram.observe(0.5, ('a',))
+    histogram.observe(5, ('a',))
+    lines = histogram.render()
+    assert 'latency_bucket{route="a",le="0.1"} 1' in lines
+    assert 'latency_bucket{route="a",le="1.0"} 2' in lines
+    assert 'latency_bucket{route="a",le="+Inf"} 3' in lines
+    assert 'latency_sum{route="a"} 5.55' in lines
+    assert 'latency_count{route="a"} 3' in lines
+
+    counter = Counter('hits', 'Обращения', ('path',))
+    counter.inc(('say "hi"\n',))
+    assert counter.render()[-1] == 'hits{path="say \\"hi\\"\\n"} 1'
+
+
+def test_requests_labelled_by_route_template():
+    app, metrics = _app()
+    client = TestClient(app, raise_server_exceptions=False)
+    client.get('/api/user/1')
+    client.get('/api/user/2')
+    client.get('/missing')
+    assert client.get('/fail').status_code == 500
+
+    text = metrics.render()
+    assert 'http_requests_total{method="GET",route="/api/user/{user_id}",status="200"} 2' in text
+    assert 'http_requests_total{method="GET",route="other",status="404"} 1' in text
+    assert 'http_request_errors_total{method="GET",route="/fail"} 1' in text
+    assert 'http_requests_in_progress{method="GET"} 0' in text
+
+
+class _Routes:
+    """Приложение, считающее обращения к списку маршрутов"""
+
+    def __init__(self):
+        self.scans = 0
+
+    @property
+    def routes(self):
+        self.scans += 1
+        return []
+
+
+def test_unknown_endpoint_cached():
+    middleware = MetricsMiddleware(None, AppMetrics())
+    app = _Routes()
+    static = object()
+    for _ in range(5):
+        assert middleware._route({'endpoint': static, 'app': app}) == 'other'
+    assert app.scans == 1
+
+
+def test_malformed_content_length_ignored():
+    async def endpoint(scope, receive, send):
+        await send({'type': 'http.response.start', 'status': 200, 'headers': []})
+        await send({'type': 'http.response.body', 'body': b'ok'})
+
+    metrics = AppMetrics()
+    middleware = MetricsMiddleware(endpoint, metrics)
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    async def receive():
+        return {'type': 'http.request', 'body': b''}
+
+    scope = {'type': 'http', 'method': 'POST', 'headers': [(b'content-length', b'abc')]}
+    asyncio.run(middleware(scope, receive, send))
+    assert [m['type'] for m in sent] == ['http.response.start', 'http.response.body']
+    assert 'http_requests_total{method="POST",route="other",status="200"} 1' in metrics.render()
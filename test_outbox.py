@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Тесты исходящих сообщений: token bucket, лимиты чатов, приоритет и RetryAfter
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from telegram.error import RetryAfter
+
+import outbox
+from outbox import BULK_ARGS, SendScheduler, TokenBucket
+
+
+class FakeClock:
+    """Время для планировщика: sleep не ждет, а сдвигает часы"""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    async def sleep(self, delay: float) -> None:
+        self.sleeps.append(delay)
+        self.now += delay
+        await asyncio.sleep(0)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(outbox, 'time', SimpleNamespace(monotonic=clock.monotonic))
+    monkeypatch.setattr(outbox, 'asyncio', SimpleNamespace(sleep=clock.sleep))
+    return clock
+
+
+def test_token_bucket():
+    bucket = TokenBucket(rate=2, burst=3, now=0)
+    for _ in range(3):
+        assert bucket.delay(0) == 0
+        bucket.take(0)
+    assert bucket.delay(0) == 0.5
+    assert bucket.available(0.25) == 0.5
+    # Больше burst не накапливается
+    assert bucket.available(100) == 3
+
+
+def _send(scheduler: SendScheduler, chat_id, log: list, rate_limit_args=None, errors=None):
+    async def callback():
+        if errors:
+            raise errors.pop(0)
+        log.append((chat_id, outbox.time.monotonic()))
+        return True
+
+    return scheduler.process_request(callback, (), {}, 'sendMessage', {'chat_id': chat_id}, rate_limit_args)
+
+
+def test_chat_and_global_limits(clock):
+    scheduler = SendScheduler(global_rate=30, chat_rate=1, chat_burst=2, group_rate=1 / 60,
+                              bulk_reserve=0)
+    log = []
+
+    async def scenario():
+        for _ in range(3):
+            await _send(scheduler, 7, log)
+        await _send(scheduler, -100, log)
+        await _send(scheduler, -100, log)
+
+    asyncio.run(scenario())
+    times = [moment - 1000 for _, moment in log]
+    # Личный чат: два сообщения сразу, третье через секунду
+    assert times[:3] == [0, 0, pytest.approx(1.0)]
+    # Группа: одно сообщение в минуту
+    assert times[4] - times[3] == pytest.approx(60.0)
+    assert scheduler.stats()['throttled'] == 2
+    assert scheduler.stats()['sent'] == {'interactive': 5, 'bulk': 0}
+
+
+def test_requests_without_chat_not_limited(clock):
+    scheduler = SendScheduler(global_rate=1, chat_rate=1, chat_burst=1)
+    calls = []
+
+    async def callback():
+        calls.append(True)
+
+    async def scenario():
+        for _ in range(5):
+            await scheduler.process_request(callback, (), {}, 'answerCallbackQuery', {}, None)
+
+    asyncio.run(scenario())
+    assert len(calls) == 5
+    assert clock.sleeps == []
+
+
+def test_bulk_keeps_reserve_for_replies(clock):
+    scheduler = SendScheduler(global_rate=10, chat_rate=100, chat_burst=100, bulk_reserve=5)
+    log = []
+
+    async def scenario():
+        for chat_id in range(1, 6):
+            await _send(scheduler, chat_id, log, BULK_ARGS)
+        # Рассылка дошла до запаса - ждет, ответ проходит сразу
+        start = clock.now
+        await _send(scheduler, 100, log)
+        assert clock.now == start
+        await _send(scheduler, 6, log, BULK_ARGS)
+        assert clock.now > start
+
+    asyncio.run(scenario())
+    assert scheduler.stats()['sent'] == {'interactive': 1, 'bulk': 6}
+
+
+def test_retry_after_pauses_and_retries(clock):
+    scheduler = SendScheduler(global_rate=30, chat_rate=100, chat_burst=100, max_retries=2)
+    log = []
+
+    async def scenario():
+        await _send(scheduler, 7, log, errors=[RetryAfter(5)])
+        with pytest.raises(RetryAfter):
+            await _send(scheduler, 7, log, errors=[RetryAfter(1), RetryAfter(1), RetryAfter(1)])
+
+    asyncio.run(scenario())
+    assert log[0][1] - 1000 == pytest.approx(5.0)
+    stats = scheduler.stats()
+    assert (stats['retry_after'], stats['failed']) == (4, 1)
+    assert stats['sent']['interactive'] == 1
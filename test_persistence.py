@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Тесты объединения записей: порядок изменений и durable-ответы при ошибках
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from persistence import AsyncStorage, CoalescingWriter
+from storage import BaseStore
+
+
+class FlakyStore(BaseStore):
+    """Хранилище в памяти; записи пользователей из failing завершаются ошибкой"""
+
+    def __init__(self, delay: float = 0.0):
+        self.log = []
+        self.failing = set()
+        self.delay = delay
+
+    def append_many(self, changes):
+        time.sleep(self.delay)
+        for user_id, _, _ in changes:
+            if user_id in self.failing:
+                raise IOError(f"Диск недоступен для {user_id}")
+        self.log.extend(changes)
+
+
+def test_durable_error_only_for_failed_user():
+    async def scenario():
+        store = FlakyStore()
+        store.failing.add('bad')
+        writer = CoalescingWriter(AsyncStorage(store), flush_interval_ms=10000, durable=True)
+        writer.start()
+
+        good = asyncio.create_task(writer.write('good', 'transaction', 'g1'))
+        bad = asyncio.create_task(writer.write('bad', 'transaction', 'b1'))
+        await asyncio.sleep(0)
+        await writer.flush()
+
+        await good
+        with pytest.raises(IOError):
+            await bad
+        assert store.log == [('good', 'transaction', 'g1')]
+        assert writer.is_pending('bad') and not writer.is_pending('good')
+
+        # Несохраненное изменение пишется следующим сбросом
+        store.failing.clear()
+        await writer.stop()
+        assert store.log[-1] == ('bad', 'transaction', 'b1')
+
+    asyncio.run(scenario())
+
+
+def test_retry_keeps_user_order():
+    async def scenario():
+        store = FlakyStore(delay=0.05)
+        store.failing.add('u')
+        writer = CoalescingWriter(AsyncStorage(store), flush_interval_ms=10000)
+        writer.start()
+
+        await writer.write('u', 'transaction', 'c1')
+        first = asyncio.create_task(writer.flush())
+        await asyncio.sleep(0.01)
+        # c1 еще пишется (и завершится ошибкой) - c2 должен дождаться его
+        await writer.write('u', 'transaction', 'c2')
+        await writer.flush()
+        await first
+
+        store.failing.clear()
+        await writer.stop()
+        assert [payload for _, _, payload in store.log] == ['c1', 'c2']
+
+    asyncio.run(scenario())
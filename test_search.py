@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Тесты поиска по описаниям: разбор слов, префиксы, страницы и свежесть индекса
+"""
+
+import copy
+
+from aggregates import append_transaction, new_transaction_id, remove_transaction, update_transaction
+from search import SearchEngine, SearchIndex, page_results, tokenize
+from storage import new_user_data
+
+
+def _add(user_data: dict, description: str, timestamp: float) -> dict:
+    transaction = {
+        'id': new_transaction_id(user_data),
+        'type': 'expense',
+        'category': 'food',
+        'amount': 100.0,
+        'description': description,
+        'timestamp': timestamp
+    }
+    append_transaction(user_data, transaction)
+    return transaction
+
+
+def _user() -> dict:
+    user_data = new_user_data()
+    _add(user_data, 'Обед в кафе', 1000)
+    _add(user_data, 'Кофе с собой', 2000)
+    _add(user_data, 'Ёлка и игрушки', 3000)
+    _add(user_data, 'кафе "Кофейня"', 4000)
+    return user_data
+
+
+def test_tokenize():
+    assert tokenize('Ёлка, КОФЕ-брейк!') == ['елка', 'кофе', 'брейк']
+    assert tokenize(None) == []
+
+
+def test_prefix_search_newest_first():
+    index = SearchIndex(_user()['transactions'])
+    assert [t['id'] for t in index.search('коф')] == [4, 2]
+    assert [t['id'] for t in index.search('кафе коф')] == [4]
+    assert [t['id'] for t in index.search('ЕЛКА')] == [3]
+    assert index.search('чай') == []
+    assert index.search('  ') == []
+
+
+def test_page_results_cursor():
+    results = SearchIndex(_user()['transactions']).search('к')
+    assert [t['id'] for t in results] == [4, 2, 1]
+
+    page, cursor = page_results(results, limit=2)
+    assert [t['id'] for t in page] == [4, 2]
+    page, cursor = page_results(results, limit=2, cursor=cursor)
+    assert [t['id'] for t in page] == [1]
+    assert cursor is None
+
+
+def test_index_follows_document_version():
+    user_data = _user()
+    engine = SearchEngine()
+    index = engine.index('u1', user_data)
+
+    # Новая транзакция через add дописывается в индекс
+    transaction = _add(user_data, 'Кофе в зернах', 5000)
+    engine.add('u1', user_data, [transaction])
+    assert engine.index('u1', user_data) is index
+    assert [t['id'] for t in engine.search('u1', user_data, 'кофе')[0]] == [5, 4, 2]
+
+    # Перезагрузка документа с той же версией - индекс остается
+    reloaded = copy.deepcopy(user_data)
+    assert engine.index('u1', reloaded) is index
+
+    # Изменение описания - новая версия, индекс перестраивается
+    update_transaction(reloaded, 2, {'description': 'Чай'})
+    assert engine.index('u1', reloaded) is not index
+    assert [t['id'] for t in engine.search('u1', reloaded, 'кофе')[0]] == [5, 4]
+    assert engine.search('u1', reloaded, 'чай')[2] == 1
+
+    # Удаление в обход add: add замечает пропущенную версию и сбрасывает индекс
+    engine.index('u1', reloaded)
+    remove_transaction(reloaded, 5)
+    transaction = _add(reloaded, 'Кофе', 6000)
+    engine.add('u1', reloaded, [transaction])
+    assert [t['id'] for t in engine.search('u1', reloaded, 'кофе')[0]] == [6, 4]
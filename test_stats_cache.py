@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Тесты кеша статистики: версия, TTL, вытеснение и сброс при записи
+"""
+
+from fastapi.testclient import TestClient
+
+import stats_cache
+from stats_cache import StatisticsCache
+
+
+def _put(cache: StatisticsCache, user_id: str, key, version: int = 1):
+    return cache.put(user_id, key, version, {'key': key}, b'{}')
+
+
+def test_entry_valid_for_its_version():
+    cache = StatisticsCache(max_entries=10, ttl=60)
+    entry = _put(cache, 'u1', 'month', version=3)
+    assert cache.get('u1', 'month', 3) is entry
+    assert cache.get('u1', 'month', 4) is None
+    # Устаревшая запись удаляется
+    assert cache.get('u1', 'month', 3) is None
+    assert cache.stats()['stale'] == 1
+    assert len(cache) == 0
+
+
+def test_entry_expires(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(stats_cache.time, 'monotonic', lambda: now[0])
+    cache = StatisticsCache(max_entries=10, ttl=5)
+    _put(cache, 'u1', 'month')
+    now[0] += 4
+    assert cache.get('u1', 'month', 1) is not None
+    now[0] += 1
+    assert cache.get('u1', 'month', 1) is None
+    assert cache.stats()['expired'] == 1
+
+
+def test_lru_eviction_and_invalidation():
+    cache = StatisticsCache(max_entries=2)
+    _put(cache, 'u1', 'week')
+    _put(cache, 'u1', 'month')
+    cache.get('u1', 'week', 1)
+    _put(cache, 'u2', 'week')
+    # Вытеснена давно не использованная запись
+    assert cache.get('u1', 'month', 1) is None
+    assert cache.get('u1', 'week', 1) is not None
+    assert cache.stats()['evictions'] == 1
+
+    cache.invalidate('u1')
+    assert cache.get('u1', 'week', 1) is None
+    assert cache.get('u2', 'week', 1) is not None
+    assert cache.stats()['invalidations'] == 1
+    cache.invalidate('u1')
+    assert cache.stats()['invalidations'] == 1
+
+
+def test_disabled_cache():
+    cache = StatisticsCache(max_entries=0)
+    entry = _put(cache, 'u1', 'month')
+    assert entry.body == b'{}'
+    assert cache.get('u1', 'month', 1) is None
+    assert len(cache) == 0
+
+
+def test_route_answers_from_cache_until_write(workdir):
+    import app as app_module
+
+    app = app_module.FinanceApp()
+    with TestClient(app.app) as client:
+        def add(amount):
+            client.post('/api/transaction', json={
+                'user_id': 'u1', 'type': 'expense', 'category': 'food', 'amount': amount
+            })
+
+        add(100)
+        first = client.get('/api/statistics/u1?period=year').json()
+        second = client.get('/api/statistics/u1?period=year').json()
+        assert first == second
+        assert app.stats_cache.stats()['hits'] == 1
+
+        add(50)
+        assert app.stats_cache.stats()['entries'] == 0
+        assert client.get('/api/statistics/u1?period=year').json()['total_expenses'] == 150.0
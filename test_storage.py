@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Тесты хранилища: воспроизведение журнала и счетчик id транзакций
+"""
+
+import os
+import time
+
+import pytest
+
+from aggregates import (
+    append_transaction, bump_version, ensure_next_id, new_transaction_id, remove_transaction
+)
+from storage import JsonStore, SQLiteStore, new_user_data
+
+
+def _transaction(transaction_id: int) -> dict:
+    return {
+        'id': transaction_id,
+        'type': 'expense',
+        'category': 'food',
+        'amount': 100.0,
+        'description': f"Покупка {transaction_id}",
+        'timestamp': time.time() + transaction_id
+    }
+
+
+def _write(store: JsonStore, user_data: dict, transaction_id: int) -> None:
+    """Изменение так же, как в приложении: сначала документ, затем журнал"""
+    transaction = _transaction(transaction_id)
+    append_transaction(user_data, transaction)
+    store.append('u1', 'transaction', transaction)
+
+
+def _crash_after_snapshot(store: JsonStore) -> None:
+    """Сворачивание, прерванное между записью снимка и удалением .compacting"""
+    store.close()
+    os.replace(store.log_file, store.compacting_file)
+    data = store._read_snapshot()
+    store._replay(store.compacting_file, data)
+    store._write_snapshot(data)
+
+
+def test_compacting_log_replayed_once(tmp_path):
+    data_file = str(tmp_path / 'data.json')
+    store = JsonStore(data_file, compact_threshold=1000)
+    user_data = new_user_data()
+    for transaction_id in (1, 2, 3):
+        _write(store, user_data, transaction_id)
+    goal = {'id': 1, 'name': 'Отпуск', 'target': 1000}
+    user_data['goals'].append(goal)
+    bump_version(user_data, goal)
+    store.append('u1', 'goal', goal)
+
+    _crash_after_snapshot(store)
+    assert os.path.exists(store.compacting_file)
+
+    # Перезапуск: снимок уже содержит .compacting
+    store = JsonStore(data_file, compact_threshold=1000)
+    user_data = store.load()['u1']
+    assert [t['id'] for t in user_data['transactions']] == [1, 2, 3]
+    assert len(user_data['goals']) == 1
+    assert user_data['totals']['expenses'] == 300.0
+
+    # Новые записи после перезапуска и досворачивание старого журнала
+    _write(store, user_data, 4)
+    store.compact()
+    store.close()
+    assert not os.path.exists(store.compacting_file)
+
+    user_data = JsonStore(data_file).load()['u1']
+    assert [t['id'] for t in user_data['transactions']] == [1, 2, 3, 4]
+    assert len(user_data['goals']) == 1
+    assert user_data['version'] == 5
+
+
+def _journal_user(store, transaction_ids) -> dict:
+    """Транзакции с выданными id и удаление последней, все через журнал"""
+    user_data = new_user_data()
+    for _ in transaction_ids:
+        _write(store, user_data, new_transaction_id(user_data))
+    removed = remove_transaction(user_data, transaction_ids[-1])
+    assert removed is not None
+    store.append('u1', 'transaction_delete', user_data['deleted'][-1])
+    return user_data
+
+
+def test_transaction_ids_not_reused_after_delete():
+    user_data = new_user_data()
+    for transaction_id in (1, 2, 3):
+        assert new_transaction_id(user_data) == transaction_id
+        append_transaction(user_data, _transaction(transaction_id))
+    remove_transaction(user_data, 3)
+    remove_transaction(user_data, 1)
+    assert new_transaction_id(user_data) == 4
+
+    # Документ без счетчика (старый снимок): max(id) с учетом удаленных + 1
+    del user_data['next_id']
+    remove_transaction(user_data, 2)
+    assert ensure_next_id(user_data) == 4
+
+
+@pytest.mark.parametrize('backend', ['json', 'sqlite'])
+def test_next_id_restored_on_load(tmp_path, backend):
+    if backend == 'json':
+        path = str(tmp_path / 'data.json')
+        store = JsonStore(path, compact_threshold=1000)
+    else:
+        path = str(tmp_path / 'data.db')
+        store = SQLiteStore(path)
+    _journal_user(store, [1, 2, 3])
+    store.close()
+
+    store = JsonStore(path) if backend == 'json' else SQLiteStore(path)
+    user_data = store.load().get('u1') or store.load_user('u1')
+    assert [t['id'] for t in user_data['transactions']] == [1, 2]
+    assert new_transaction_id(user_data) == 4
+    store.close()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Тесты разностной синхронизации: изменения после версии, удаления и ETag
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from aggregates import append_transaction, bump_version, new_transaction_id, remove_transaction
+from storage import new_user_data
+from sync import changes_since, etag_matches, version_etag
+
+
+def _transaction(user_data: dict, amount: float) -> dict:
+    transaction = {
+        'id': new_transaction_id(user_data), 'type': 'expense', 'category': 'food',
+        'amount': amount, 'description': '', 'timestamp': 1700000000 + amount
+    }
+    append_transaction(user_data, transaction)
+    return transaction
+
+
+def test_changes_since_version():
+    user_data = new_user_data()
+    _transaction(user_data, 1)
+    _transaction(user_data, 2)
+    since = user_data['version']
+
+    _transaction(user_data, 3)
+    goal = {'id': 1, 'name': 'Отпуск', 'target': 1000}
+    user_data['goals'].append(goal)
+    bump_version(user_data, goal)
+    budget = {'amount': 500}
+    user_data['budgets']['food'] = budget
+    bump_version(user_data, budget)
+    remove_transaction(user_data, 1)
+
+    changes = changes_since(user_data, since)
+    assert changes['version'] == 6
+    assert changes['full'] is False
+    assert [t['id'] for t in changes['transactions']] == [3]
+    assert changes['goals'] == [goal]
+    assert changes['budgets'] == {'food': budget}
+    assert changes['deleted'] == {'transactions': [1]}
+
+    assert changes_since(user_data, 6)['transactions'] == []
+
+
+@pytest.mark.parametrize('since', [None, 0, 100])
+def test_full_snapshot_when_history_unknown(since):
+    user_data = new_user_data()
+    _transaction(user_data, 1)
+    remove_transaction(user_data, 1)
+    _transaction(user_data, 2)
+
+    changes = changes_since(user_data, since)
+    assert changes['full'] is True
+    assert [t['id'] for t in changes['transactions']] == [2]
+    assert changes['deleted'] == {'transactions': []}
+
+
+def test_etags():
+    assert version_etag(3) == '"v3"'
+    keyed = version_etag(3, ('statistics', 'month'))
+    assert keyed.startswith('"v3-') and keyed != version_etag(3, ('statistics', 'year'))
+
+    assert etag_matches('"v3"', '"v3"')
+    assert etag_matches('"v1", W/"v3"', '"v3"')
+    assert etag_matches('*', '"v3"')
+    assert not etag_matches('"v2"', '"v3"')
+    assert not etag_matches(None, '"v3"')
+
+
+@pytest.mark.parametrize('module_name', ['app', 'telegram_app'])
+def test_sync_routes(workdir, module_name):
+    module = __import__(module_name)
+    app = module.FinanceApp() if module_name == 'app' else module.TelegramFinanceApp()
+    with TestClient(app.app) as client:
+        client.post('/api/transaction', json={'user_id': 'u1', 'type': 'expense', 'category': 'food', 'amount': 10})
+        response = client.get('/api/user/u1')
+        etag = response.headers['etag']
+        assert client.get('/api/user/u1', headers={'If-None-Match': etag}).status_code == 304
+
+        client.post('/api/transaction', json={'user_id': 'u1', 'type': 'expense', 'category': 'food', 'amount': 20})
+        response = client.get('/api/user/u1', headers={'If-None-Match': etag})
+        assert response.status_code == 200
+        assert response.headers['etag'] != etag
+
+        changes = client.get('/api/sync/u1?since=1').json()
+        assert (changes['version'], changes['full']) == (2, False)
+        assert [t['amount'] for t in changes['transactions']] == [20.0]
+
+        # Статистика с тем же ETag не пересчитывается
+        response = client.get('/api/statistics/u1?period=year')
+        etag = response.headers['etag']
+        assert client.get('/api/statistics/u1?period=year',
+                          headers={'If-None-Match': etag}).status_code == 304
+        assert client.get('/api/statistics/u1?period=week',
+                          headers={'If-None-Match': etag}).status_code == 200
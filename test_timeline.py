@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Тесты упорядоченной истории: вставка, окна по времени и постраничный вывод
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from timeline import (
+    decode_cursor, encode_cursor, extend_transactions, insert_transaction, page_transactions,
+    transactions_between
+)
+
+
+def _t(transaction_id: int, timestamp: float, t_type: str = 'expense', category: str = 'food') -> dict:
+    return {'id': transaction_id, 'timestamp': timestamp, 'type': t_type, 'category': category}
+
+
+def _ids(transactions) -> list:
+    return [t['id'] for t in transactions]
+
+
+def test_insert_and_extend_keep_order():
+    transactions = []
+    for transaction in (_t(1, 10), _t(2, 30), _t(3, 20), _t(4, 30)):
+        insert_transaction(transactions, transaction)
+    assert _ids(transactions) == [1, 3, 2, 4]
+
+    extend_transactions(transactions, [_t(5, 40), _t(6, 50)])
+    assert _ids(transactions) == [1, 3, 2, 4, 5, 6]
+    # Пачка задним числом: равные по времени остаются в порядке добавления
+    extend_transactions(transactions, [_t(7, 30), _t(8, 5)])
+    assert _ids(transactions) == [8, 1, 3, 2, 4, 7, 5, 6]
+
+
+def test_window():
+    user_data = {'transactions': [_t(i, i * 10) for i in range(1, 6)]}
+    assert _ids(transactions_between(user_data, 20, 40)) == [2, 3]
+    assert _ids(transactions_between(user_data, None, 20)) == [1]
+    assert _ids(transactions_between(user_data, 45)) == [5]
+    assert transactions_between({}, 0, 100) == []
+
+
+def test_cursor_walk_over_equal_timestamps():
+    # Несколько транзакций с одним временем - курсор различает их по id
+    transactions = [_t(i, 100 + i // 3) for i in range(1, 11)]
+    user_data = {'transactions': transactions}
+
+    seen = []
+    cursor = None
+    while True:
+        page, cursor = page_transactions(user_data, limit=3, cursor=cursor)
+        seen.extend(_ids(page))
+        if cursor is None:
+            break
+    assert seen == list(range(10, 0, -1))
+
+
+def test_filters_and_window():
+    transactions = [
+        _t(1, 10), _t(2, 20, 'income', 'salary'), _t(3, 30), _t(4, 40, category='transport'), _t(5, 50)
+    ]
+    user_data = {'transactions': transactions}
+    page, cursor = page_transactions(user_data, limit=1, t_type='expense', category='food')
+    assert (_ids(page), cursor is not None) == ([5], True)
+    page, cursor = page_transactions(user_data, limit=5, cursor=cursor, t_type='expense', category='food')
+    assert (_ids(page), cursor) == ([3, 1], None)
+
+    page, _ = page_transactions(user_data, limit=10, start_ts=20, end_ts=50)
+    assert _ids(page) == [4, 3, 2]
+    # Ровно limit подходящих - следующей страницы нет
+    page, cursor = page_transactions(user_data, limit=5)
+    assert (len(page), cursor) == (5, None)
+
+
+def test_cursor_roundtrip():
+    cursor = encode_cursor(_t(7, 1700000000.25))
+    assert decode_cursor(cursor) == (1700000000.25, 7)
+    for broken in ('!!!', 'bm90IGpzb24', encode_cursor(_t(1, 1))[:-3]):
+        with pytest.raises(ValueError):
+            decode_cursor(broken)
+
+
+def test_transactions_route(workdir):
+    import telegram_app
+
+    app = telegram_app.TelegramFinanceApp()
+    with TestClient(app.app) as client:
+        response = client.post('/api/transactions/batch', json={'user_id': 'u1', 'transactions': [
+            {'type': 'expense', 'category': 'food', 'amount': i + 1, 'timestamp': 1700000000 + i}
+            for i in range(5)
+        ] + [{'type': 'income', 'category': 'salary', 'amount': 1000, 'timestamp': 1700000100}]})
+        assert response.json()['accepted'] == 6
+
+        amounts = []
+        cursor = None
+        while True:
+            params = {'limit': 2, 'type': 'expense'}
+            if cursor:
+                params['cursor'] = cursor
+            body = client.get('/api/transactions/u1', params=params).json()
+            amounts.extend(t['amount'] for t in body['transactions'])
+            cursor = body['next_cursor']
+            if cursor is None:
+                break
+        assert amounts == [5.0, 4.0, 3.0, 2.0, 1.0]
+
+        assert client.get('/api/transactions/u1?cursor=!!!').status_code == 400
+        assert client.get('/api/transactions/u1?limit=0').status_code == 422
+
+        summary = client.get('/api/user/u1/summary').json()
+        assert 'transactions' not in summary
+        assert (summary['totals']['count'], summary['totals']['income']) == (6, 1000.0)
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Тесты LRU-кеша пользователей: бюджет, несохраненные записи и подгрузка
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from user_cache import UserCache, create_user_cache
+
+
+def _doc(transactions: int = 0) -> dict:
+    return {'transactions': [{}] * transactions}
+
+
+def test_evicts_least_recently_used():
+    cache = UserCache(max_entries=2)
+    cache['u1'] = _doc()
+    cache['u2'] = _doc()
+    assert cache.get('u1') is not None
+    cache['u3'] = _doc()
+    assert list(cache) == ['u1', 'u3']
+    assert cache.get('u2') is None
+    assert cache.stats()['evictions'] == 1
+    with pytest.raises(KeyError):
+        cache['u2']
+
+
+def test_transaction_budget_counts_growth():
+    cache = UserCache(max_transactions=10)
+    cache['u1'] = _doc(4)
+    cache['u2'] = _doc(4)
+    # Документ вырос с прошлого обращения - вес пересчитывается при get
+    cache.peek('u2')['transactions'] = [{}] * 8
+    cache.get('u2')
+    assert list(cache) == ['u2']
+    assert cache.stats()['transactions'] == 8
+
+    # Текущий документ не вытесняется, даже если один превышает бюджет
+    cache['u3'] = _doc(20)
+    assert list(cache) == ['u3']
+
+
+def test_dirty_entries_wait_for_writeback():
+    dirty = {'u1'}
+    writebacks = []
+    cache = UserCache(max_entries=1, is_dirty=lambda user_id: user_id in dirty,
+                      writeback=lambda: writebacks.append(True))
+    cache['u1'] = _doc()
+    cache['u2'] = _doc()
+    # u1 не сохранен - остается в памяти, запрошен сброс
+    assert list(cache) == ['u1', 'u2']
+    assert writebacks == [True]
+    assert cache.stats()['writebacks'] == 1
+
+    dirty.clear()
+    cache.get('u2')
+    assert list(cache) == ['u2']
+    assert cache.stats()['evictions'] == 1
+
+
+def test_unbounded_without_lazy_loading(monkeypatch):
+    monkeypatch.setenv('USER_CACHE_MAX_ENTRIES', '1')
+    assert create_user_cache(lazy_loading=True).max_entries == 1
+    cache = create_user_cache(lazy_loading=False)
+    assert (cache.max_entries, cache.max_transactions) == (0, 0)
+
+
+def test_evicted_user_reloaded_from_storage(workdir, monkeypatch):
+    monkeypatch.setenv('STORAGE_BACKEND', 'sharded')
+    monkeypatch.setenv('USER_CACHE_MAX_ENTRIES', '1')
+    import app as app_module
+
+    app = app_module.FinanceApp()
+    with TestClient(app.app) as client:
+        for user_id, amount in (('u1', 100), ('u2', 200), ('u1', 50)):
+            response = client.post('/api/transaction', json={
+                'user_id': user_id, 'type': 'expense', 'category': 'food', 'amount': amount
+            })
+            assert response.status_code == 200
+        client.get('/api/user/u2')
+
+        transactions = client.get('/api/user/u1').json()['transactions']
+        assert [(t['id'], t['amount']) for t in transactions] == [(1, 100.0), (2, 50.0)]
+        assert app.data.stats()['evictions'] >= 1
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Тесты webhook: проверка секрета Telegram и обработка обновлений ботом
+"""
+
+import time
+
+from fastapi.testclient import TestClient
+
+from webhook import SECRET_HEADER, WEBHOOK_PATH, FakeTelegramSender, mount_bot
+
+
+def _bot_app(monkeypatch, calls=None):
+    """Мини-приложение с ботом; запросы бота к Bot API не уходят в сеть"""
+    monkeypatch.setenv('BOT_TOKEN', '123:abc')
+    monkeypatch.delenv('WEBHOOK_SECRET', raising=False)
+    import telegram_app
+    from integrated_bot import IntegratedFinanceBot
+
+    app = telegram_app.TelegramFinanceApp()
+    bot = IntegratedFinanceBot(app)
+
+    async def fake_post(endpoint, data=None, *args, **kwargs):
+        if calls is not None:
+            calls.append((endpoint, data))
+        if endpoint == 'getMe':
+            return {'id': 1, 'is_bot': True, 'first_name': 'bot', 'username': 'bot'}
+        if endpoint == 'sendMessage':
+            return {'message_id': 1, 'date': 0, 'chat': {'id': int(data['chat_id']), 'type': 'private'},
+                    'text': data.get('text', '')}
+        return True
+
+    object.__setattr__(bot.application.bot, '_post', fake_post)
+    return app, bot
+
+
+def test_webhook_requires_secret_without_config(workdir, monkeypatch):
+    app, bot = _bot_app(monkeypatch)
+    mount_bot(app.app, bot)
+    sender = FakeTelegramSender()
+    client = TestClient(app.app)
+
+    update = sender.build_message(7, '+500 кофе')
+    assert client.post(WEBHOOK_PATH, json=update).status_code == 403
+    assert client.post(WEBHOOK_PATH, json=update, headers={SECRET_HEADER: ''}).status_code == 403
+    assert client.post(WEBHOOK_PATH, json=update, headers={SECRET_HEADER: 'wrong'}).status_code == 403
+    assert client.get(WEBHOOK_PATH + '/stats').json()['received'] == 0
+    assert bot.application.update_queue.qsize() == 0
+    app.store.close()
+
+
+def test_webhook_registers_generated_secret(workdir, monkeypatch):
+    calls = []
+    app, bot = _bot_app(monkeypatch, calls)
+    mount_bot(app.app, bot, url='https://example.com' + WEBHOOK_PATH)
+
+    with TestClient(app.app) as client:
+        registered = [data for endpoint, data in calls if endpoint == 'setWebhook']
+        assert len(registered) == 1
+        secret = registered[0]['secret_token']
+        assert secret
+
+        sender = FakeTelegramSender(secret=secret)
+        response = client.post(WEBHOOK_PATH, json=sender.build_message(7, '+500 кофе'), headers=sender.headers)
+        assert response.status_code == 200
+
+        deadline = time.time() + 5
+        while time.time() < deadline and not client.get('/api/user/7').json()['transactions']:
+            time.sleep(0.05)
+        transactions = client.get('/api/user/7').json()['transactions']
+        assert [t['amount'] for t in transactions] == [500.0]
+        assert client.get(WEBHOOK_PATH + '/stats').json()['received'] == 1
+
+
+def test_webhook_rejects_malformed_update(workdir, monkeypatch):
+    app, bot = _bot_app(monkeypatch)
+    mount_bot(app.app, bot, secret='s3')
+    client = TestClient(app.app)
+
+    response = client.post(WEBHOOK_PATH, content=b'{', headers={SECRET_HEADER: 's3',
+                                                                  'Content-Type': 'application/json'})
+    assert response.status_code == 400
+    app.store.close()
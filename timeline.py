@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Timeline - Транзакции пользователя, упорядоченные по времени
+Список transactions хранится отсортированным по timestamp, поэтому
+выборка за период - это бинарный поиск границ, а не просмотр истории
+"""
+
+import base64
+import json
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Optional, Tuple
+
+
+def _timestamp(transaction: Dict) -> float:
+    return transaction['timestamp']
+
+
+def insert_transaction(transactions: List[Dict], transaction: Dict) -> None:
+    """Вставить транзакцию с сохранением порядка (новые - за O(1) в конец)"""
+    if not transactions or transactions[-1]['timestamp'] <= transaction['timestamp']:
+        transactions.append(transaction)
+        return
+    # Импорт задним числом или правка даты
+    position = bisect_right(transactions, transaction['timestamp'], key=_timestamp)
+    transactions.insert(position, transaction)
+
+
+def extend_transactions(transactions: List[Dict], new: List[Dict]) -> None:
+    """Добавить пачку транзакций с сохранением порядка.
+
+    Пачка дописывается в конец, и если она не продолжает историю по
+    времени, список упорядочивается один раз (Timsort сливает два
+    упорядоченных участка за линейное время).
+    """
+    previous = transactions[-1]['timestamp'] if transactions else float('-inf')
+    in_order = True
+    for transaction in new:
+        if transaction['timestamp'] < previous:
+            in_order = False
+            break
+        previous = transaction['timestamp']
+    transactions.extend(new)
+    if not in_order:
+        # Сортировка устойчивая: равные по времени остаются в порядке добавления
+        transactions.sort(key=_timestamp)
+
+
+def ensure_sorted(user_data: Dict) -> None:
+    """Упорядочить историю, сохраненную до появления индекса"""
+    transactions = user_data.get('transactions', [])
+    if any(transactions[i]['timestamp'] > transactions[i + 1]['timestamp']
+           for i in range(len(transactions) - 1)):
+        transactions.sort(key=_timestamp)
+
+
+def window_bounds(transactions: List[Dict], start_ts: Optional[float] = None,
+                  end_ts: Optional[float] = None) -> Tuple[int, int]:
+    """Индексы [lo, hi) транзакций из окна [start_ts, end_ts)"""
+    lo = 0 if start_ts is None else bisect_left(transactions, start_ts, key=_timestamp)
+    hi = len(transactions) if end_ts is None else bisect_left(transactions, end_ts, key=_timestamp)
+    return lo, hi
+
+
+def transactions_between(user_data: Dict, start_ts: Optional[float] = None,
+                         end_ts: Optional[float] = None) -> List[Dict]:
+    """Транзакции из [start_ts, end_ts), по возрастанию времени"""
+    transactions = user_data.get('transactions', [])
+    lo, hi = window_bounds(transactions, start_ts, end_ts)
+    return transactions[lo:hi]
+
+
+def encode_cursor(transaction: Dict) -> str:
+    """Непрозрачный курсор: позиция транзакции в истории"""
+    raw = json.dumps([transaction['timestamp'], transaction.get('id')], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[float, Optional[int]]:
+    """Позиция из курсора (ValueError, если курсор поврежден)"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        timestamp, transaction_id = json.loads(raw)
+        return float(timestamp), transaction_id
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Неверный курсор: {cursor}") from e
+
+
+def _cursor_index(transactions: List[Dict], cursor: str) -> int:
+    """Индекс транзакции курсора (следующая страница - все, что раньше нее)"""
+    timestamp, transaction_id = decode_cursor(cursor)
+    lo = bisect_left(transactions, timestamp, key=_timestamp)
+    hi = bisect_right(transactions, timestamp, key=_timestamp)
+    # Среди транзакций с тем же временем ищем саму транзакцию курсора
+    for i in range(lo, hi):
+        if transactions[i].get('id') == transaction_id:
+            return i
+    return lo
+
+
+def page_transactions(user_data: Dict, limit: int = 50, cursor: Optional[str] = None,
+                      start_ts: Optional[float] = None, end_ts: Optional[float] = None,
+                      t_type: Optional[str] = None,
+                      category: Optional[str] = None) -> Tuple[List[Dict], Optional[str]]:
+    """Страница транзакций от новых к старым и курсор следующей страницы.
+
+    Просматривается только нужный участок истории: от позиции курсора
+    назад, пока не наберется limit транзакций, подходящих под фильтры.
+    """
+    transactions = user_data.get('transactions', [])
+    lo, hi = window_bounds(transactions, start_ts, end_ts)
+    if cursor:
+        hi = min(hi, _cursor_index(transactions, cursor))
+
+    page = []
+    i = hi - 1
+    while i >= lo and len(page) <= limit:
+        transaction = transactions[i]
+        if (t_type is None or transaction['type'] == t_type) and \
+                (category is None or transaction['category'] == category):
+            page.append(transaction)
+        i -= 1
+
+    if len(page) > limit:
+        page = page[:limit]
+        return page, encode_cursor(page[-1])
+    return page, None
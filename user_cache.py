@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+User Cache - LRU-кеш документов пользователей
+Ограничивает число пользователей, которые держатся в памяти
+"""
+
+import logging
+import os
+from collections import OrderedDict
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class UserCache:
+    """Документы пользователей с вытеснением давно не использованных.
+
+    Бюджет задается числом пользователей (max_entries) и/или суммарным
+    числом транзакций в памяти (max_transactions), 0 - без ограничения.
+    Пользователь с несохраненными изменениями (is_dirty) не вытесняется:
+    вместо этого запрашивается сброс изменений (writeback), и запись
+    вытесняется на следующем проходе.
+    """
+
+    def __init__(self, max_entries: int = 0, max_transactions: int = 0,
+                 is_dirty: Optional[Callable[[str], bool]] = None,
+                 writeback: Optional[Callable[[], None]] = None):
+        self.max_entries = max_entries
+        self.max_transactions = max_transactions
+        self._is_dirty = is_dirty or (lambda user_id: False)
+        self._writeback = writeback
+
+        self._entries: "OrderedDict[str, Dict]" = OrderedDict()
+        self._weights: Dict[str, int] = {}
+        self._total_weight = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.writebacks = 0
+
+    def __contains__(self, user_id: str) -> bool:
+        return user_id in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._entries)
+
+    def __getitem__(self, user_id: str) -> Dict:
+        user_data = self.get(user_id)
+        if user_data is None:
+            raise KeyError(user_id)
+        return user_data
+
+    def __setitem__(self, user_id: str, user_data: Dict) -> None:
+        self._entries[user_id] = user_data
+        self._entries.move_to_end(user_id)
+        self._reweigh(user_id)
+        self._evict(keep=user_id)
+
+    def get(self, user_id: str, default=None):
+        """Документ пользователя (обновляет порядок LRU и счетчики)"""
+        user_data = self._entries.get(user_id)
+        if user_data is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        self._entries.move_to_end(user_id)
+        # Документ мог вырасти с прошлого обращения
+        self._reweigh(user_id)
+        self._evict(keep=user_id)
+        return user_data
+
+    def peek(self, user_id: str) -> Optional[Dict]:
+        """Документ пользователя без учета в счетчиках и порядке LRU"""
+        return self._entries.get(user_id)
+
+    def items(self) -> Iterator[Tuple[str, Dict]]:
+        """Все документы в памяти (без влияния на порядок LRU)"""
+        return iter(list(self._entries.items()))
+
+    def update(self, data: Dict) -> None:
+        for user_id, user_data in data.items():
+            self[user_id] = user_data
+
+    def stats(self) -> Dict:
+        """Счетчики для мониторинга"""
+        requests = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'transactions': self._total_weight - len(self._entries),
+            'max_entries': self.max_entries,
+            'max_transactions': self.max_transactions,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / requests, 4) if requests else 0.0,
+            'evictions': self.evictions,
+            'writebacks': self.writebacks
+        }
+
+    def _reweigh(self, user_id: str) -> None:
+        weight = 1 + len(self._entries[user_id].get('transactions', ()))
+        self._total_weight += weight - self._weights.get(user_id, 0)
+        self._weights[user_id] = weight
+
+    def _over_budget(self) -> bool:
+        if self.max_entries and len(self._entries) > self.max_entries:
+            return True
+        if self.max_transactions and self._total_weight - len(self._entries) > self.max_transactions:
+            return True
+        return False
+
+    def _evict(self, keep: str) -> None:
+        if not self._over_budget():
+            return
+
+        # Идем от самых старых записей; текущую и грязные откладываем
+        skipped = []
+        dirty_skipped = False
+        while self._entries and self._over_budget():
+            user_id, user_data = self._entries.popitem(last=False)
+            if user_id == keep:
+                skipped.append((user_id, user_data))
+                continue
+            if self._is_dirty(user_id):
+                skipped.append((user_id, user_data))
+                dirty_skipped = True
+                continue
+            self._total_weight -= self._weights.pop(user_id)
+            self.evictions += 1
+
+        for user_id, user_data in reversed(skipped):
+            self._entries[user_id] = user_data
+            self._entries.move_to_end(user_id, last=False)
+
+        if dirty_skipped and self._writeback is not None:
+            # Бюджет держат несохраненные записи - ускоряем их запись
+            self.writebacks += 1
+            self._writeback()
+
+
+def create_user_cache(lazy_loading: bool, is_dirty: Optional[Callable[[str], bool]] = None,
+                      writeback: Optional[Callable[[], None]] = None) -> UserCache:
+    """Кеш с бюджетом из USER_CACHE_MAX_ENTRIES / USER_CACHE_MAX_TRANSACTIONS.
+
+    Вытеснять можно только если хранилище умеет подгружать пользователя
+    по требованию, иначе кеш не ограничивается.
+    """
+    max_entries = int(os.getenv('USER_CACHE_MAX_ENTRIES', '10000'))
+    max_transactions = int(os.getenv('USER_CACHE_MAX_TRANSACTIONS', '0'))
+    if not lazy_loading:
+        if os.getenv('USER_CACHE_MAX_ENTRIES') or max_transactions:
+            logger.warning("Хранилище не поддерживает подгрузку пользователей, кеш не ограничен")
+        max_entries = max_transactions = 0
+    return UserCache(max_entries, max_transactions, is_dirty, writeback)
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Webhook - Бот и мини-приложение в одном процессе uvicorn
+Telegram присылает обновления POST-запросом на WEBHOOK_PATH приложения.
+Обновление кладется в очередь Application и обрабатывается обычными
+обработчиками бота; если необработанных обновлений уже UPDATE_MAX_PENDING
+(см. dispatcher.py), Telegram получает 503 и повторит доставку позже
+
+Запуск: задать WEBHOOK_URL (публичный адрес приложения) и BOT_TOKEN,
+затем python telegram_app.py
+
+Проверка без Telegram - FakeTelegramSender шлет обновления в webhook:
+    python webhook.py http://localhost:3000 --user 123456789 "/start" "+500 кофе"
+"""
+
+import argparse
+import asyncio
+import hmac
+import itertools
+import logging
+import os
+import secrets
+import time
+from typing import Dict, Optional
+
+from fastapi import FastAPI, HTTPException, Request, Response
+from telegram import Update
+
+logger = logging.getLogger(__name__)
+
+WEBHOOK_PATH = os.getenv('WEBHOOK_PATH', '/telegram/webhook')
+SECRET_HEADER = 'X-Telegram-Bot-Api-Secret-Token'
+
+
+def update_queue(maxsize: Optional[int] = None) -> asyncio.Queue:
+    """Ограниченная очередь обновлений для Application.builder().update_queue.
+
+    Подходит для Application без concurrent_updates (main.py): там
+    обновления берутся из очереди по одному. Ботам с PerUserUpdateProcessor
+    нужна его очередь - processor.update_queue().
+    """
+    if maxsize is None:
+        maxsize = int(os.getenv('UPDATE_QUEUE_SIZE', '1000'))
+    return asyncio.Queue(maxsize=maxsize)
+
+
+def webhook_url() -> Optional[str]:
+    """Полный адрес webhook из WEBHOOK_URL (None - режим webhook выключен)"""
+    base = os.getenv('WEBHOOK_URL')
+    if not base:
+        return None
+    return base.rstrip('/') + WEBHOOK_PATH
+
+
+def mount_bot(app: FastAPI, bot, url: Optional[str] = None, path: str = WEBHOOK_PATH,
+              secret: Optional[str] = None) -> None:
+    """Подключить бота к приложению FastAPI.
+
+    bot - SimpleFinanceBot или IntegratedFinanceBot: при старте приложения
+    запускается его Application и регистрируется webhook (если передан
+    url), при остановке бот останавливается раньше записи данных.
+
+    Маршрут всегда проверяет секрет Telegram: если WEBHOOK_SECRET не
+    задан, секрет генерируется при подключении и передается в set_webhook.
+    """
+    application = bot.application
+    if secret is None:
+        secret = os.getenv('WEBHOOK_SECRET') or None
+    if not secret:
+        secret = secrets.token_urlsafe(32)
+        logger.info("WEBHOOK_SECRET не задан - секрет webhook сгенерирован")
+    stats = {'received': 0, 'rejected': 0}
+
+    @app.post(path, include_in_schema=False)
+    async def telegram_webhook(request: Request):
+        """Обновление от Telegram"""
+        if not hmac.compare_digest(request.headers.get(SECRET_HEADER, '').encode(), secret.encode()):
+            raise HTTPException(status_code=403, detail="Неверный секрет")
+        try:
+            update = Update.de_json(await request.json(), application.bot)
+        except Exception as e:
+            logger.warning(f"Некорректное обновление: {e}")
+            raise HTTPException(status_code=400, detail="Некорректное обновление")
+
+        try:
+            application.update_queue.put_nowait(update)
+        except asyncio.QueueFull:
+            # Не успеваем обработать (лимит очереди или dispatcher) -
+            # Telegram повторит доставку
+            stats['rejected'] += 1
+            return Response(status_code=503)
+        stats['received'] += 1
+        return Response(status_code=200)
+
+    @app.get(path + '/stats', include_in_schema=False)
+    async def telegram_webhook_stats():
+        """Состояние очереди обновлений"""
+        result = {**stats, 'queued': application.update_queue.qsize()}
+        if application.update_queue.maxsize:
+            result['max_queue'] = application.update_queue.maxsize
+        for name in ('dispatcher', 'send_scheduler'):
+            component = getattr(bot, name, None)
+            if component is not None:
+                result[name] = component.stats()
+        return result
+
+    async def start_bot():
+        await bot.start()
+        if url:
+            await application.bot.set_webhook(url, secret_token=secret, allowed_updates=Update.ALL_TYPES)
+            logger.info(f"🔗 Webhook зарегистрирован: {url}")
+
+    async def stop_bot():
+        await bot.stop()
+
+    app.router.on_startup.append(start_bot)
+    # Бот останавливается первым, чтобы его последние записи попали в хранилище
+    app.router.on_shutdown.insert(0, stop_bot)
+
+
+class FakeTelegramSender:
+    """Локальная замена Telegram: отправляет обновления в webhook.
+
+    build_* возвращают JSON обновления (его можно отправить и через
+    TestClient), send_* отправляют его по HTTP.
+    """
+
+    def __init__(self, url: str = '', secret: Optional[str] = None):
+        self.url = url
+        self.secret = secret
+        self._update_ids = itertools.count(1)
+        self._message_ids = itertools.count(1)
+
+    @staticmethod
+    def _user(user_id: int, first_name: str) -> Dict:
+        return {'id': user_id, 'is_bot': False, 'first_name': first_name}
+
+    def build_message(self, user_id: int, text: str, first_name: str = 'Тест') -> Dict:
+        """Обновление с текстовым сообщением (команда, если начинается с /)"""
+        message = {
+            'message_id': next(self._message_ids),
+            'date': int(time.time()),
+            'chat': {'id': user_id, 'type': 'private'},
+            'from': self._user(user_id, first_name),
+            'text': text
+        }
+        if text.startswith('/'):
+            message['entities'] = [{'type': 'bot_command', 'offset': 0, 'length': len(text.split()[0])}]
+        return {'update_id': next(self._update_ids), 'message': message}
+
+    def build_callback(self, user_id: int, data: str, message_id: Optional[int] = None,
+                       first_name: str = 'Тест') -> Dict:
+        """Обновление с нажатием inline-кнопки"""
+        return {
+            'update_id': next(self._update_ids),
+            'callback_query': {
+                'id': str(next(self._update_ids)),
+                'from': self._user(user_id, first_name),
+                'chat_instance': str(user_id),
+                'data': data,
+                'message': {
+                    'message_id': message_id or next(self._message_ids),
+                    'date': int(time.time()),
+                    'chat': {'id': user_id, 'type': 'private'},
+                    'text': ''
+                }
+            }
+        }
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {SECRET_HEADER: self.secret} if self.secret else {}
+
+    async def send(self, update: Dict) -> int:
+        """Отправить обновление, вернуть HTTP-статус"""
+        import aiohttp
+
+        async with aiohttp.ClientSession() as session:
+            async with session.post(self.url, json=update, headers=self.headers) as response:
+                return response.status
+
+    async def send_message(self, user_id: int, text: str) -> int:
+        return await self.send(self.build_message(user_id, text))
+
+    async def send_callback(self, user_id: int, data: str, message_id: Optional[int] = None) -> int:
+        return await self.send(self.build_callback(user_id, data, message_id))
+
+
+async def _send_all(sender: FakeTelegramSender, user_id: int, texts) -> None:
+    for text in texts:
+        if text.startswith('callback:'):
+            status = await sender.send_callback(user_id, text[len('callback:'):])
+        else:
+            status = await sender.send_message(user_id, text)
+        print(f"{status} {text}")
+
+
+def main():
+    """Отправка тестовых обновлений в webhook из командной строки"""
+    parser = argparse.ArgumentParser(description="Отправка тестовых обновлений в webhook бота")
+    parser.add_argument('url', help="Адрес приложения, например http://localhost:3000")
+    parser.add_argument('texts', nargs='+', help="Сообщения; callback:<data> - нажатие кнопки")
+    parser.add_argument('--user', type=int, default=1, help="ID пользователя Telegram")
+    parser.add_argument('--secret', default=os.getenv('WEBHOOK_SECRET'), help="Секрет webhook")
+    args = parser.parse_args()
+
+    sender = FakeTelegramSender(args.url.rstrip('/') + WEBHOOK_PATH, args.secret)
+    asyncio.run(_send_all(sender, args.user, args.texts))
+
+
+if __name__ == "__main__":
+    main()